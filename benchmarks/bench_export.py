@@ -0,0 +1,72 @@
+"""Benchmark save_formats against a plain savefig loop on a heavy figure.
+
+Run with ``uv run python benchmarks/bench_export.py``. The figure has four
+axes, each with a 20k point scatter and a 50k point line, and is written as
+svg, png, pdf and eps. The table reports wall time of a ``savefig`` loop,
+of ``save_formats`` in a single process and of ``save_formats`` with one
+worker process per vector format, with and without ``bbox_inches="tight"``.
+Worker processes only help when several CPUs are available; the CPU count
+is printed with the table.
+"""
+
+import os
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+import dartwork_mpl as dm
+
+FORMATS = ("svg", "png", "pdf", "eps")
+
+
+def _heavy_figure():
+    """Create a figure with about two million drawn vertices."""
+    rng = np.random.default_rng(0)
+    fig, axs = plt.subplots(2, 2, figsize=(8, 6), dpi=100)
+    for ax in axs.flat:
+        ax.scatter(*rng.random((2, 20000)), s=2)
+        ax.plot(np.linspace(0, 1, 50000), rng.random(50000).cumsum() / 25000)
+        ax.set_title("Random walk $x_t$")
+    return fig
+
+
+def _loop(fig, stem: str, bbox_inches) -> None:
+    """Save every format with one savefig call each."""
+    for fmt in FORMATS:
+        fig.savefig(f"{stem}.{fmt}", bbox_inches=bbox_inches)
+
+
+def _timed(func, *args, **kwargs) -> float:
+    """Return the wall time of one call."""
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Print the benchmark table."""
+    fig = _heavy_figure()
+    print(f"cpus: {os.cpu_count()}")
+    print(f"{'bbox':>6} {'loop [s]':>9} {'single [s]':>11} {'workers [s]':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        stem = os.path.join(tmp, "figure")
+        for bbox in (None, "tight"):
+            loop = _timed(_loop, fig, stem, bbox)
+            single = _timed(
+                dm.save_formats, fig, stem, FORMATS, bbox, max_workers=0
+            )
+            workers = _timed(
+                dm.save_formats, fig, stem, FORMATS, bbox, max_workers=3
+            )
+            print(f"{str(bbox):>6} {loop:9.2f} {single:11.2f} {workers:12.2f}")
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Benchmark simple_layout against fast_layout, and chained against joint.
+
+Run with ``uv run python benchmarks/bench_layout.py``. For each figure the
+script reports wall time, the number of figure measurement passes (scipy
+function evaluations for simple_layout) and the largest remaining edge
+residual in pixels. The second table lays out side-by-side GridSpecs with
+one ``simple_layout`` call per GridSpec (the usual way before
+``joint_layout``), one ``fast_layout`` call per GridSpec, or a single
+``joint_layout``.
+The third table compares tightening a dense grid with ``fast_layout``
+followed by ``GridSpec.tight_layout`` against ``fast_layout(spacing=...)``,
+which solves margins and spacing together. The last table aligns a batch
+of report figures with ``align_layout``, measured in one thread or in
+parallel, next to laying out each figure on its own with ``fast_layout``
+(which does not align them).
+"""
+
+import time
+
+import matplotlib
+
+matplotlib.use("agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+import dartwork_mpl as dm
+from dartwork_mpl.layout import _layout_axes, _measure, _residuals
+
+
+def _grid_figure(nrows: int, ncols: int):
+    """Create a figure with labeled panels on one GridSpec."""
+    fig = plt.figure(figsize=(dm.DW, dm.DW * nrows / ncols), dpi=200)
+    gs = fig.add_gridspec(nrows, ncols)
+    rng = np.random.default_rng(0)
+    for i in range(nrows):
+        for j in range(ncols):
+            ax = fig.add_subplot(gs[i, j])
+            ax.plot(rng.random(20) * 1000)
+            ax.set_title(f"Panel {i}-{j}")
+            ax.set_xlabel("Time [s]")
+            ax.set_ylabel("Value [a.u.]")
+    return fig, gs
+
+
+def _max_residual(fig, gs, margin: float = 0.05) -> float:
+    """Return the largest edge residual after a layout, in pixels."""
+    axes, _ = _layout_axes(fig, gs, use_all_axes=True)
+    _, tight = _measure(fig, axes)
+    pad = margin * fig.dpi
+    targets = np.array([pad, fig.bbox.width - pad, pad, fig.bbox.height - pad])
+    return float(np.abs(_residuals(tight, targets)).max())
+
+
+def _dense_figure(n: int):
+    """Create an n x n grid of small panels with tick labels and titles."""
+    fig = plt.figure(figsize=(dm.DW, dm.DW), dpi=200)
+    gs = fig.add_gridspec(n, n)
+    rng = np.random.default_rng(0)
+    for i in range(n):
+        for j in range(n):
+            ax = fig.add_subplot(gs[i, j])
+            ax.plot(rng.random(20))
+            ax.set_title(f"{i}{j}", fontsize=5)
+            ax.tick_params(labelsize=4)
+    return fig, gs
+
+
+def _multi_figure(n_grids: int):
+    """Create a figure with ``n_grids`` side-by-side 2x2 GridSpecs."""
+    fig = plt.figure(figsize=(dm.DW * n_grids / 2, dm.DW / 2), dpi=200)
+    width = 1 / n_grids
+    gridspecs = []
+    rng = np.random.default_rng(0)
+    for k in range(n_grids):
+        gs = fig.add_gridspec(
+            2, 2, left=k * width + 0.02, right=(k + 1) * width - 0.02
+        )
+        for i in range(2):
+            for j in range(2):
+                ax = fig.add_subplot(gs[i, j])
+                ax.plot(rng.random(20) * 1000)
+                ax.set_title(f"Panel {k}-{i}-{j}")
+                ax.set_ylabel("Value")
+        gridspecs.append(gs)
+    return fig, gridspecs
+
+
+def _chained(fig, gridspecs, engine):
+    """Lay out each GridSpec inside its own slot with one engine call each."""
+    width = 1 / len(gridspecs)
+    nfev = 0
+    for k, gs in enumerate(gridspecs):
+        result = engine(
+            fig, gs, bbox=(k * width, (k + 1) * width, 0, 1), use_all_axes=False
+        )
+        nfev += result.nfev
+    return nfev
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    print(
+        f"{'figure':<8} {'engine':<14} {'time [s]':>9} {'nfev':>5} "
+        f"{'resid [px]':>11}"
+    )
+    for nrows, ncols in [(1, 1), (2, 3), (4, 4)]:
+        for engine in (dm.simple_layout, dm.fast_layout):
+            fig, gs = _grid_figure(nrows, ncols)
+            start = time.perf_counter()
+            result = engine(fig, gs)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{nrows}x{ncols:<6} {engine.__name__:<14} {elapsed:9.3f} "
+                f"{result.nfev:5d} {_max_residual(fig, gs):11.2f}"
+            )
+            plt.close(fig)
+
+    print()
+    print(f"{'grids':<8} {'engine':<18} {'time [s]':>9} {'nfev':>5}")
+    for n_grids in (2, 3, 4):
+        for name in ("simple_layout x n", "fast_layout x n", "joint_layout"):
+            fig, gridspecs = _multi_figure(n_grids)
+            start = time.perf_counter()
+            if name == "simple_layout x n":
+                nfev = _chained(fig, gridspecs, dm.simple_layout)
+            elif name == "fast_layout x n":
+                nfev = _chained(fig, gridspecs, dm.fast_layout)
+            else:
+                nfev = dm.joint_layout(fig).nfev
+            elapsed = time.perf_counter() - start
+            print(f"{n_grids:<8} {name:<18} {elapsed:9.3f} {nfev:5d}")
+            plt.close(fig)
+
+    print()
+    print(f"{'figure':<8} {'engine':<22} {'time [s]':>9} {'nfev':>5}")
+    for n in (4, 10):
+        for name in ("fast_layout+tight", "fast_layout(spacing)"):
+            fig, gs = _dense_figure(n)
+            start = time.perf_counter()
+            if name == "fast_layout+tight":
+                nfev = dm.fast_layout(fig, gs).nfev
+                gs.tight_layout(
+                    fig, rect=(gs.left, gs.bottom, gs.right, gs.top)
+                )
+                nfev += 1
+            else:
+                nfev = dm.fast_layout(fig, gs, spacing=0.05).nfev
+            elapsed = time.perf_counter() - start
+            print(f"{n}x{n:<6} {name:<22} {elapsed:9.3f} {nfev:5d}")
+            plt.close(fig)
+
+    print()
+    print(f"{'figures':<8} {'engine':<22} {'time [s]':>9} {'nfev':>5}")
+    for n_figs in (4, 16):
+        for name in ("fast_layout each", "align_layout(1)", "align_layout"):
+            figs = [
+                _grid_figure(2, 2 if i % 2 else 3)[0] for i in range(n_figs)
+            ]
+            start = time.perf_counter()
+            if name == "fast_layout each":
+                nfev = sum(dm.fast_layout(fig).nfev for fig in figs)
+            else:
+                workers = 1 if name == "align_layout(1)" else None
+                nfev = dm.align_layout(figs, max_workers=workers).nfev
+            elapsed = time.perf_counter() - start
+            print(f"{n_figs:<8} {name:<22} {elapsed:9.3f} {nfev:5d}")
+            for fig in figs:
+                plt.close(fig)
+
+
+if __name__ == "__main__":
+    main()
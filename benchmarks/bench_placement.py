@@ -0,0 +1,90 @@
+"""Benchmark place_labels on dense scatter annotations, and place_legend.
+
+Run with ``uv run python benchmarks/bench_placement.py``. The figure grows
+with the number of labels so that labels cover about a third of the axes.
+For each size the script reports wall time, the number of labels left on
+their preferred position above the point and the number of overlapping
+label pairs, counted by brute force from the returned offsets. The second
+table compares ``place_legend`` with a draw using ``loc="best"`` on lines
+of growing length.
+"""
+
+import time
+
+import matplotlib
+
+matplotlib.use("agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.font_manager import FontProperties
+
+import dartwork_mpl as dm
+from dartwork_mpl.placement import _text_extents
+
+
+def _scatter_figure(n: int):
+    """Create a scatter of n random points at constant label density."""
+    size = 24 * np.sqrt(n / 5000)
+    fig, ax = plt.subplots(figsize=(size, size), dpi=100)
+    x, y = np.random.default_rng(0).random((2, n))
+    ax.scatter(x, y, s=1)
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    return fig, ax, x, y
+
+
+def _count_overlaps(ax, x, y, labels, offsets, fontsize: float) -> int:
+    """Return the number of overlapping label pairs."""
+    fig = ax.get_figure()
+    half = _text_extents(
+        labels, FontProperties(size=fontsize), fig._get_renderer()
+    )
+    half /= 2
+    centers = ax.transData.transform(np.column_stack([x, y]))
+    centers += offsets * fig.dpi / 72
+    count = 0
+    for i in range(len(labels) - 1):
+        gap = np.abs(centers[i + 1 :] - centers[i]) - half[i + 1 :] - half[i]
+        count += int(((gap < -0.5).all(axis=1)).sum())
+    return count
+
+
+def main() -> None:
+    """Print the benchmark table."""
+    print(f"{'labels':>7} {'time [s]':>9} {'above':>7} {'overlaps':>9}")
+    for n in (500, 2000, 5000):
+        fig, ax, x, y = _scatter_figure(n)
+        labels = [f"P{i}" for i in range(n)]
+        start = time.perf_counter()
+        offsets = dm.place_labels(ax, x, y, labels, fontsize=4)
+        elapsed = time.perf_counter() - start
+        above = int(((offsets[:, 0] == 0) & (offsets[:, 1] > 0)).sum())
+        overlaps = _count_overlaps(ax, x, y, labels, offsets, 4)
+        print(f"{n:>7} {elapsed:9.3f} {above:>7} {overlaps:>9}")
+        plt.close(fig)
+
+    print()
+    print(f"{'points':>9} {'place_legend [s]':>17} {'loc=best [s]':>13}")
+    for n in (10_000, 1_000_000, 5_000_000):
+        times = []
+        for engine in ("place_legend", "best"):
+            fig, ax = plt.subplots(figsize=(dm.SW, dm.SW * 0.75), dpi=200)
+            x = np.linspace(0, 10, n)
+            ax.plot(x, np.sin(x), label="sin")
+            ax.plot(x, np.cos(x), label="cos")
+            fig.canvas.draw()
+            start = time.perf_counter()
+            if engine == "place_legend":
+                dm.place_legend(ax)
+            else:
+                ax.legend(loc="best")
+            # Both draws include the lines; only "best" scans them again.
+            fig.canvas.draw()
+            times.append(time.perf_counter() - start)
+            plt.close(fig)
+        print(f"{n:>9} {times[0]:17.3f} {times[1]:13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark optimize_svg on Matplotlib SVG output.
+
+Run with ``uv run python benchmarks/bench_svg.py``. Two figures (a dense
+scatter and a grid of small panels with markers and text) are exported to
+SVG in memory and optimized at several precisions. The table reports the
+original and optimized sizes, the fraction saved and the optimization
+time.
+"""
+
+import time
+
+import matplotlib
+
+matplotlib.use("agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+import dartwork_mpl as dm
+
+PRECISIONS = (1, 2, 3)
+
+
+def _figures():
+    """Yield named figures with different kinds of content."""
+    rng = np.random.default_rng(0)
+
+    fig, ax = plt.subplots()
+    ax.scatter(*rng.random((2, 200_000)), s=2)
+    yield "scatter 200k", fig
+
+    fig, axs = plt.subplots(6, 6, figsize=(10, 10))
+    for ax in axs.flat:
+        ax.plot(rng.random(50), "o-", ms=2)
+        ax.set_title("Panel $x_t$")
+    yield "6x6 panels", fig
+
+
+def main() -> None:
+    """Print the benchmark table."""
+    print(
+        f"{'figure':>12} {'prec':>4} {'before [MB]':>11} {'after [MB]':>10} "
+        f"{'saved':>6} {'time [s]':>8}"
+    )
+    for name, fig in _figures():
+        svg = dm.export_bytes(fig, ("svg",))["svg"]
+        plt.close(fig)
+        for precision in PRECISIONS:
+            start = time.perf_counter()
+            _, report = dm.optimize_svg(svg, precision)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:>12} {precision:>4} {report['before'] / 1e6:11.2f} "
+                f"{report['after'] / 1e6:10.2f} {report['saved']:6.0%} "
+                f"{elapsed:8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -85,8 +85,7 @@ def _collect_colormaps() -> dict[str, list[mpl.colors.Colormap]]:
     categories: dict[str, list[mpl.colors.Colormap]] = {
         category: [] for category in CATEGORY_ORDER
     }
-    for cmap in cmaps:
-        category = dm.classify_colormap(cmap)
+    for cmap, category in zip(cmaps, dm.classify_colormaps(cmaps), strict=True):
         if category in categories:
             categories[category].append(cmap)
 
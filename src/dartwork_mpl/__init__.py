@@ -7,7 +7,7 @@ functions for matplotlib visualizations.
 __version__ = "0.1.0"
 
 # Import font module to register fonts (no public exports)
-# Import cmap module to register colormaps (no public exports)
+# Import cmap module to register colormaps
 from . import (
     cmap,  # noqa: F401
     font,  # noqa: F401
@@ -16,23 +16,89 @@ from . import (
 # Import asset_viz module exports
 from .asset_viz import *  # noqa: F403
 
+# Import bivariate module exports
+from .bivariate import BivariateColormap
+
+# Import cmap module exports
+from .cmap import (
+    ControlPointColormap,
+    CyclicNorm,
+    apply_cmap,
+    cmap_lut,
+    discrete_cmap,
+    fit_control_points,
+    map_angles,
+    save_control_points,
+)
+
+# Import cmap_analysis module exports
+from .cmap_analysis import (
+    ColormapIndex,
+    analyze_uniformity,
+    colormap_index,
+    uniform_cmap,
+)
+
 # Import color module exports
 from .color import Color, cspace, hex, named, oklab, oklch, rgb
 
 # Import constant module exports
 from .constant import DW, SW
 
+# Import export module exports
+from .export import RasterizeReport, export_bytes
+
+# Import figure cache module exports
+from .figure_cache import FigureCache
+
 # Import install module exports
 from .install import install_llm_txt, uninstall_llm_txt
 
+# Import layout module exports
+from .layout import (
+    LayoutStats,
+    LayoutTemplate,
+    TextExtentCache,
+    add_layout_hook,
+    align_layout,
+    fast_layout,
+    joint_layout,
+    layout_fingerprint,
+    remove_layout_hook,
+    template_layout,
+    text_extent_cache,
+)
+
+# Import placement module exports
+from .placement import place_labels, place_legend, repel_labels
+
 # Import style module exports
 from .style import Style, list_styles, load_style_dict, style, style_path
 
+# Import svg module exports
+from .svg import optimize_svg
+
 # Import util module exports
 from .util import *  # noqa: F403
 
 # Define __all__ for explicit exports
 __all__ = [
+    # Bivariate colormap module
+    "BivariateColormap",
+    # Colormap module
+    "apply_cmap",
+    "ControlPointColormap",
+    "CyclicNorm",
+    "cmap_lut",
+    "discrete_cmap",
+    "fit_control_points",
+    "map_angles",
+    "save_control_points",
+    # Colormap analysis module
+    "ColormapIndex",
+    "colormap_index",
+    "analyze_uniformity",
+    "uniform_cmap",
     # Color module
     "Color",
     "cspace",
@@ -44,12 +110,35 @@ __all__ = [
     # Constant module
     "DW",
     "SW",
+    # Export module
+    "export_bytes",
+    "RasterizeReport",
+    # Figure cache module
+    "FigureCache",
+    # Layout module
+    "fast_layout",
+    "joint_layout",
+    "align_layout",
+    "TextExtentCache",
+    "text_extent_cache",
+    "LayoutTemplate",
+    "layout_fingerprint",
+    "template_layout",
+    "LayoutStats",
+    "add_layout_hook",
+    "remove_layout_hook",
+    # Placement module
+    "place_labels",
+    "repel_labels",
+    "place_legend",
     # Style module
     "Style",
     "list_styles",
     "load_style_dict",
     "style",
     "style_path",
+    # SVG module
+    "optimize_svg",
     # Install module
     "install_llm_txt",
     "uninstall_llm_txt",
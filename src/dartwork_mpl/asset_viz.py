@@ -4,9 +4,12 @@ This module provides functions to visualize available colormaps, colors,
 and fonts in the matplotlib/dartwork-mpl ecosystem.
 """
 
+import hashlib
+import json
 import math
 import os
 import re
+import types
 from collections import defaultdict
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -16,6 +19,7 @@ import matplotlib.colors as mcolors
 import matplotlib.font_manager as fm
 import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.collections import PatchCollection
 from matplotlib.figure import Figure
 from matplotlib.patches import Rectangle
 
@@ -23,42 +27,10 @@ if TYPE_CHECKING:
     from matplotlib.colors import Colormap
 
 
-def classify_colormap(cmap: "Colormap") -> str:
-    """
-    Classify a colormap into one of the following categories:
-    - Categorical
-    - Sequential Single-Hue
-    - Sequential Multi-Hue
-    - Diverging
-    - Cyclical
-
-    Parameters
-    ----------
-    cmap : matplotlib.colors.Colormap
-        Colormap to classify.
-
-    Returns
-    -------
-    str
-        Category of the colormap.
-    """
-    # Get colormap samples
-    n_samples = 256
-    samples = cmap(np.linspace(0, 1, n_samples))[:, :3]  # Ignore alpha
-
-    # Convert to HSV for easier analysis
-    hsv_samples = np.array([mcolors.rgb_to_hsv(rgb) for rgb in samples])
-    hues = hsv_samples[:, 0]
-    saturations = hsv_samples[:, 1]
-    values = hsv_samples[:, 2]
-
-    # Calculate differences between consecutive samples
-    hue_diffs = np.abs(np.diff(hues))
-    # Handle circular nature of hue
-    hue_diffs = np.minimum(hue_diffs, 1 - hue_diffs)
-
-    # Known categorical colormaps (hardcoded for better accuracy)
-    categorical_cmaps = [
+# Colormaps that are classified as categorical by name regardless of their
+# sampled colors (hardcoded for better accuracy).
+_CATEGORICAL_CMAPS = frozenset(
+    [
         "Accent",
         "Dark2",
         "Paired",
@@ -78,9 +50,152 @@ def classify_colormap(cmap: "Colormap") -> str:
         "rainbow",
         "nipy_spectral",
     ]
+)
+
+# Number of samples used to classify a colormap.
+_CLASSIFY_N_SAMPLES = 256
+
+# Category cache keyed by the hash of the sampled LUT, so that identical
+# colormaps (including re-registered copies) are only classified once. It
+# is stored in the user cache directory and loaded on first use, so later
+# runs skip the analysis too.
+_CLASSIFY_CACHE: dict[str, str] | None = None
+
+# Maximum number of categories kept on disk.
+_CLASSIFY_CACHE_SIZE = 4096
+
+
+def _classify_cache_path() -> Path:
+    """Return the file holding the categories of previous runs."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "dartwork_mpl" / "colormap_categories.json"
+
+
+def _classifier_version() -> str:
+    """Return a hash of the classifier code, including its thresholds."""
+    h = hashlib.blake2b(digest_size=8)
+    codes = [_classify_samples.__code__]
+    while codes:
+        code = codes.pop()
+        h.update(code.co_code)
+        for const in code.co_consts:
+            # Nested code objects (comprehensions) are hashed by content;
+            # their repr holds an address.
+            if isinstance(const, types.CodeType):
+                codes.append(const)
+            elif isinstance(const, frozenset):
+                h.update(repr(sorted(const, key=repr)).encode())
+            else:
+                h.update(repr(const).encode())
+    return h.hexdigest()
+
+
+def _classify_cache() -> dict[str, str]:
+    """Return the category cache, loading it from disk on first use."""
+    global _CLASSIFY_CACHE
+    if _CLASSIFY_CACHE is None:
+        _CLASSIFY_CACHE = {}
+        try:
+            data = json.loads(_classify_cache_path().read_text())
+        except (OSError, ValueError):
+            data = None
+        # Categories of another classifier version are stale.
+        if isinstance(data, dict) and data.get("version") == (
+            _classifier_version()
+        ):
+            _CLASSIFY_CACHE.update(data.get("categories", {}))
+    return _CLASSIFY_CACHE
+
+
+def _save_classify_cache() -> None:
+    """Write the most recent categories to disk, if the cache is writable."""
+    path = _classify_cache_path()
+    entries = list(_classify_cache().items())[-_CLASSIFY_CACHE_SIZE:]
+    data = {"version": _classifier_version(), "categories": dict(entries)}
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(data))
+        # Replace atomically; concurrent runs keep the last complete file.
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def _sample_colormaps(
+    cmaps: "list[Colormap]", n_samples: int = _CLASSIFY_N_SAMPLES
+) -> np.ndarray:
+    """
+    Sample colormaps into a single RGB array.
 
-    if hasattr(cmap, "name") and cmap.name in categorical_cmaps:
-        return "Categorical"
+    Parameters
+    ----------
+    cmaps : list of matplotlib.colors.Colormap
+        Colormaps to sample.
+    n_samples : int, optional
+        Number of evenly spaced samples per colormap. Default is 256.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (n_cmaps, n_samples, 3) with RGB values in [0, 1].
+    """
+    x = np.linspace(0, 1, n_samples)
+    samples = np.empty((len(cmaps), n_samples, 3))
+    for i, cmap in enumerate(cmaps):
+        samples[i] = cmap(x)[:, :3]  # Ignore alpha
+    return samples
+
+
+def _lut_hash(samples: np.ndarray) -> str:
+    """
+    Return a stable hash of a sampled colormap LUT.
+
+    Parameters
+    ----------
+    samples : numpy.ndarray
+        Array of shape (n_samples, 3) with RGB values.
+
+    Returns
+    -------
+    str
+        Hex digest identifying the LUT.
+    """
+    return hashlib.blake2b(
+        np.ascontiguousarray(samples, dtype=np.float64).tobytes(),
+        digest_size=16,
+    ).hexdigest()
+
+
+def _classify_samples(
+    samples: np.ndarray,
+    hsv: np.ndarray,
+    color_diffs: np.ndarray,
+    hue_diffs: np.ndarray,
+) -> str:
+    """
+    Classify one colormap from its precomputed features.
+
+    Parameters
+    ----------
+    samples : numpy.ndarray
+        RGB samples of shape (n_samples, 3).
+    hsv : numpy.ndarray
+        HSV samples of shape (n_samples, 3).
+    color_diffs : numpy.ndarray
+        Euclidean RGB distance between consecutive samples.
+    hue_diffs : numpy.ndarray
+        Circular hue distance between consecutive samples.
+
+    Returns
+    -------
+    str
+        Category of the colormap.
+    """
+    n_samples = len(samples)
+    hues = hsv[:, 0]
+    saturations = hsv[:, 1]
+    values = hsv[:, 2]
 
     # 1. Check if colormap is cyclical - stricter criteria
     # Cyclical maps start and end with almost identical colors
@@ -93,9 +208,6 @@ def classify_colormap(cmap: "Colormap") -> str:
             return "Cyclical"
 
     # 2. Improved check for categorical colormaps based on repeated colors
-    # Calculate color differences (Euclidean distance in RGB space)
-    color_diffs = np.sqrt(np.sum(np.diff(samples, axis=0) ** 2, axis=1))
-
     # Find regions where colors are very similar (plateaus)
     plateau_mask = color_diffs < 0.001
     plateau_indices = np.where(plateau_mask)[0]
@@ -199,11 +311,232 @@ def classify_colormap(cmap: "Colormap") -> str:
             return "Sequential Multi-Hue"
 
 
+def classify_colormaps(cmaps: "list[Colormap] | list[str]") -> list[str]:
+    """
+    Classify several colormaps at once.
+
+    All colormaps are sampled into a single (n_cmaps, 256, 3) array and the
+    HSV conversion and per-sample differences are computed in one
+    vectorized pass. Results are cached by the hash of the sampled LUT, in
+    memory and in ``~/.cache/dartwork_mpl/colormap_categories.json`` (under
+    ``$XDG_CACHE_HOME`` if set), so repeated calls and later runs (e.g.
+    gallery rendering) skip the analysis.
+
+    Parameters
+    ----------
+    cmaps : list of matplotlib.colors.Colormap or str
+        Colormaps (or registered colormap names) to classify.
+
+    Returns
+    -------
+    list[str]
+        Category of each colormap, in input order. See
+        :func:`classify_colormap` for the possible categories.
+    """
+    cmaps = [mpl.colormaps[c] if isinstance(c, str) else c for c in cmaps]
+    categories: list[str | None] = [None] * len(cmaps)
+    if not cmaps:
+        return []
+
+    samples = _sample_colormaps(cmaps)
+    keys = [_lut_hash(s) for s in samples]
+
+    cache = _classify_cache()
+    pending = []
+    for i, (cmap, key) in enumerate(zip(cmaps, keys, strict=True)):
+        if getattr(cmap, "name", None) in _CATEGORICAL_CMAPS:
+            categories[i] = "Categorical"
+        elif key in cache:
+            categories[i] = cache[key]
+        else:
+            pending.append(i)
+
+    if pending:
+        # Vectorized feature extraction across all uncached colormaps.
+        stack = samples[pending]
+        hsv = mcolors.rgb_to_hsv(stack)
+        color_diffs = np.sqrt(np.sum(np.diff(stack, axis=1) ** 2, axis=2))
+        hue_diffs = np.abs(np.diff(hsv[:, :, 0], axis=1))
+        # Handle circular nature of hue
+        hue_diffs = np.minimum(hue_diffs, 1 - hue_diffs)
+
+        for j, i in enumerate(pending):
+            category = _classify_samples(
+                stack[j], hsv[j], color_diffs[j], hue_diffs[j]
+            )
+            cache[keys[i]] = category
+            categories[i] = category
+        _save_classify_cache()
+
+    return categories
+
+
+def classify_colormap(cmap: "Colormap") -> str:
+    """
+    Classify a colormap into one of the following categories:
+    - Categorical
+    - Sequential Single-Hue
+    - Sequential Multi-Hue
+    - Diverging
+    - Cyclical
+
+    Parameters
+    ----------
+    cmap : matplotlib.colors.Colormap
+        Colormap to classify.
+
+    Returns
+    -------
+    str
+        Category of the colormap.
+    """
+    return classify_colormaps([cmap])[0]
+
+
+# Atlas geometry in image pixels: each cell holds a label area followed by
+# a gradient bar.
+_ATLAS_BAR_WIDTH = 256
+_ATLAS_LABEL_WIDTH = 144
+_ATLAS_PAD = 16
+_ATLAS_ROW_HEIGHT = 11
+_ATLAS_BAR_HEIGHT = 10
+
+# Composed atlas images keyed by the hash of the sampled gradients and the
+# grid shape, least recently used first.
+_ATLAS_CACHE: dict[tuple[str, int, int], np.ndarray] = {}
+
+# Maximum number of atlas images kept in _ATLAS_CACHE.
+_ATLAS_CACHE_SIZE = 8
+
+
+def _colormap_atlas(
+    cmaps: "list[Colormap]", nrows: int, ncols: int
+) -> np.ndarray:
+    """
+    Compose the gradients of several colormaps into one RGBA image.
+
+    Colormaps are placed in column-major order (top to bottom, then left
+    to right). Label areas and gaps are fully transparent. Images are
+    cached by the hash of the sampled gradients and the grid shape, so a
+    colormap re-registered under the same name is drawn again.
+
+    Parameters
+    ----------
+    cmaps : list of matplotlib.colors.Colormap
+        Colormaps to compose.
+    nrows, ncols : int
+        Grid shape.
+
+    Returns
+    -------
+    numpy.ndarray
+        RGBA image of shape (nrows * row_height, ncols * cell_width, 4).
+    """
+    samples = _sample_colormaps(cmaps, _ATLAS_BAR_WIDTH)
+    key = (_lut_hash(samples), nrows, ncols)
+    atlas = _ATLAS_CACHE.pop(key, None)
+    if atlas is not None:
+        _ATLAS_CACHE[key] = atlas
+        return atlas
+
+    # (ncols * nrows, width, 3) gradients in column-major slot order.
+    grid = np.zeros((ncols * nrows, _ATLAS_BAR_WIDTH, 4))
+    grid[: len(cmaps), :, :3] = samples
+    grid[: len(cmaps), :, 3] = 1.0
+    grid = grid.reshape(ncols, nrows, _ATLAS_BAR_WIDTH, 4).transpose(1, 0, 2, 3)
+
+    cell_width = _ATLAS_LABEL_WIDTH + _ATLAS_BAR_WIDTH + _ATLAS_PAD
+    top = _ATLAS_ROW_HEIGHT - _ATLAS_BAR_HEIGHT
+    left = _ATLAS_LABEL_WIDTH
+    atlas = np.zeros((nrows, _ATLAS_ROW_HEIGHT, ncols, cell_width, 4))
+    atlas[:, top:, :, left : left + _ATLAS_BAR_WIDTH] = grid[:, np.newaxis]
+    atlas = atlas.reshape(nrows * _ATLAS_ROW_HEIGHT, ncols * cell_width, 4)
+
+    _ATLAS_CACHE[key] = atlas
+    if len(_ATLAS_CACHE) > _ATLAS_CACHE_SIZE:
+        del _ATLAS_CACHE[next(iter(_ATLAS_CACHE))]
+    return atlas
+
+
+def _plot_colormap_atlas(
+    cmaps: "list[Colormap]", ncols: int, title: str | None = None
+) -> tuple[Figure, np.ndarray]:
+    """
+    Plot colormaps as a single atlas image with one axes.
+
+    Parameters
+    ----------
+    cmaps : list of matplotlib.colors.Colormap
+        Colormaps to plot, in display order.
+    ncols : int
+        Number of columns.
+    title : str, optional
+        Title drawn above the atlas.
+
+    Returns
+    -------
+    fig : matplotlib.figure.Figure
+        Figure object.
+    axs : numpy.ndarray of matplotlib.axes.Axes
+        Array holding the single atlas axes.
+    """
+    nrows = (len(cmaps) + ncols - 1) // ncols
+    atlas = _colormap_atlas(cmaps, nrows, ncols)
+    height, width = atlas.shape[:2]
+
+    # Same physical size as the per-axes gallery.
+    title_rows = 1 if title else 0
+    figw = 6.4 * ncols / 1.5
+    figh = (
+        0.35
+        + 0.15
+        + (nrows + title_rows + (nrows + title_rows - 1) * 0.1) * 0.44
+    )
+    fig = plt.figure(figsize=(figw, figh))
+    top = 1 - (0.35 + 0.44 * 0.6 * title_rows) / figh
+    ax = fig.add_axes((0.01, 0.15 / figh, 0.98, top - 0.15 / figh))
+    ax.imshow(
+        atlas,
+        aspect="auto",
+        interpolation="nearest",
+        extent=(0, width, height, 0),
+    )
+    ax.set_axis_off()
+
+    if title:
+        fig.text(
+            0.5,
+            1 - 0.35 / figh,
+            title,
+            fontsize=14,
+            fontweight="bold",
+            ha="center",
+            va="center",
+        )
+
+    # Place all labels in one pass.
+    cell_width = width // ncols
+    for i, cmap in enumerate(cmaps):
+        row = i % nrows
+        col = i // nrows
+        ax.text(
+            col * cell_width + _ATLAS_LABEL_WIDTH - 4,
+            (row + 1) * _ATLAS_ROW_HEIGHT - _ATLAS_BAR_HEIGHT / 2,
+            cmap.name,
+            va="center",
+            ha="right",
+            fontsize=10,
+        )
+
+    return fig, np.array([ax])
+
+
 def plot_colormaps(
     cmap_list: list[str] | list["Colormap"] | None = None,
     ncols: int = 3,
     group_by_type: bool = True,
     group_spacing: float = 0.5,
+    atlas: bool = False,
 ) -> tuple[Figure, np.ndarray]:
     """Plot a list of colormaps.
     When group_by_type=True, creates separate figures for each category and
@@ -222,6 +555,10 @@ def plot_colormaps(
         for each category. Each figure is automatically displayed.
     group_spacing : float, optional(default=0.5)
         Spacing between groups in inches (unused when group_by_type=True).
+    atlas : bool, optional(default=False)
+        If True, compose all gradients of a figure into one cached RGBA
+        image drawn with a single ``imshow`` instead of one axes per
+        colormap. Much faster for large galleries.
 
     Returns
     -------
@@ -230,7 +567,7 @@ def plot_colormaps(
         figure.
     axs : numpy.ndarray of matplotlib.axes.Axes
         Array of Axes objects. When group_by_type=True, returns the last
-        category's axes.
+        category's axes. In atlas mode, holds the single atlas axes.
 
     Examples
     --------
@@ -238,6 +575,8 @@ def plot_colormaps(
     >>> plt.show()
     >>> # Group by type - creates separate figures for each category
     >>> fig, axs = plot_colormaps(ncols=3, group_by_type=True)
+    >>> # Atlas mode - one image per figure
+    >>> fig, axs = plot_colormaps(ncols=4, atlas=True)
     """
     if cmap_list is None:
         cmap_list = list(mpl.colormaps.keys())
@@ -245,7 +584,7 @@ def plot_colormaps(
 
     # Convert colormaps to matplotlib colormaps if cmap is a string.
     cmap_list = [
-        mpl.cm.get_cmap(c) if isinstance(c, str) else c for c in cmap_list
+        mpl.colormaps[c] if isinstance(c, str) else c for c in cmap_list
     ]
 
     if group_by_type:
@@ -261,8 +600,9 @@ def plot_colormaps(
         # Classify colormaps by type
         categories = {category: [] for category in category_order}
 
-        for cmap in cmap_list:
-            category = classify_colormap(cmap)
+        for cmap, category in zip(
+            cmap_list, classify_colormaps(cmap_list), strict=True
+        ):
             categories[category].append(cmap)
 
         # Remove empty categories
@@ -290,6 +630,11 @@ def plot_colormaps(
                 )
             )
 
+            if atlas:
+                fig, axs = _plot_colormap_atlas(cmaps, ncols, title=category)
+                plt.show()
+                continue
+
             # Calculate number of rows needed for this category
             nrows = (len(cmaps) + ncols - 1) // ncols
 
@@ -369,6 +714,9 @@ def plot_colormaps(
             )
         )
 
+        if atlas:
+            return _plot_colormap_atlas(cmap_list, ncols)
+
         # Calculate number of rows based on number of colormaps and columns
         nrows = (len(cmap_list) + ncols - 1) // ncols
 
@@ -1122,6 +1470,7 @@ def _plot_single_library(
     # Draw the grid using the group-aware placement
     # Colors start after title margin
     title_margin_offset = title_margin * cell_height
+    swatches = []
     for col, row, name, color_spec in color_grid:
         y = title_margin_offset + (row + 0.5) * cell_height
         swatch_start_x = cell_width * col
@@ -1136,7 +1485,7 @@ def _plot_single_library(
             verticalalignment="center",
         )
 
-        ax.add_patch(
+        swatches.append(
             Rectangle(
                 xy=(swatch_start_x, y - 9),
                 width=swatch_width,
@@ -1146,6 +1495,9 @@ def _plot_single_library(
             )
         )
 
+    # Draw all swatches as a single collection instead of one artist each.
+    ax.add_collection(PatchCollection(swatches, match_original=True))
+
     return fig
 
 
@@ -0,0 +1,266 @@
+"""Bivariate colormaps built in OKLab.
+
+This module provides two-dimensional colormaps for mapping pairs of
+variables (e.g. value and uncertainty) to colors. Grids are constructed
+in OKLab from corner colors or from two registered colormaps, applied to
+paired arrays with a vectorized lookup into a uint8 RGBA table, and
+explained with a square legend.
+"""
+
+import matplotlib as mpl
+import matplotlib.colors as mcolors
+import numpy as np
+from matplotlib.axes import Axes
+
+from .cmap import _finite_range, _lut_index
+from .color import _oklab_to_srgb_array, _srgb_to_oklab_array
+
+
+def _autoscale(values: np.ndarray) -> tuple[float, float]:
+    """Return the finite (min, max) of an array, or (0, 0) if none."""
+    limits = _finite_range(values)
+    return (0.0, 0.0) if limits is None else limits
+
+
+class BivariateColormap:
+    """
+    Two-dimensional colormap stored as an (n, m) grid of colors.
+
+    The first axis of the grid follows the x variable and the second axis
+    the y variable. Use the classmethods ``from_corners()`` and
+    ``from_cmaps()`` to create instances.
+
+    Parameters
+    ----------
+    colors : array-like
+        sRGB colors of shape (n, m, 3) or (n, m, 4) in range [0, 1].
+    name : str, optional
+        Colormap name. Default is 'bivariate'.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import dartwork_mpl as dm
+    >>> bcmap = dm.BivariateColormap.from_cmaps("dm.Blues", "dm.Reds")
+    >>> x, y = np.random.rand(2, 1000, 1000)
+    >>> rgba = bcmap.apply(x, y)
+    >>> rgba.shape, rgba.dtype
+    ((1000, 1000, 4), dtype('uint8'))
+    """
+
+    def __init__(self, colors: np.ndarray, name: str = "bivariate") -> None:
+        # Copy, so freezing the grid below leaves the caller's array alone.
+        colors = np.array(colors, dtype=float)
+        if colors.ndim != 3 or colors.shape[-1] not in (3, 4):
+            raise ValueError(
+                "colors must have shape (n, m, 3) or (n, m, 4), got "
+                f"{colors.shape}"
+            )
+        if colors.shape[-1] == 3:
+            alpha = np.ones(colors.shape[:2] + (1,))
+            colors = np.concatenate([colors, alpha], axis=-1)
+
+        self.name: str = name
+        self.colors: np.ndarray = colors
+        self.colors.flags.writeable = False
+
+        # Flattened uint8 table with a transparent bad entry at the end.
+        lut = np.zeros((colors.shape[0] * colors.shape[1] + 1, 4), np.uint8)
+        lut[:-1] = (colors.reshape(-1, 4) * 255).astype(np.uint8)
+        self._lut: np.ndarray = lut
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Return the (n, m) grid size."""
+        return self.colors.shape[0], self.colors.shape[1]
+
+    @classmethod
+    def from_corners(
+        cls,
+        corners: list,
+        n: int = 16,
+        m: int | None = None,
+        name: str = "bivariate",
+    ) -> "BivariateColormap":
+        """
+        Create a colormap by bilinear interpolation between corner colors.
+
+        Parameters
+        ----------
+        corners : sequence of 4 colors
+            Colors at (x low, y low), (x high, y low), (x low, y high) and
+            (x high, y high). Any matplotlib color spec is accepted,
+            including dartwork-mpl names like 'oc.blue5'.
+        n, m : int, optional
+            Grid size along x and y. ``m`` defaults to ``n``.
+        name : str, optional
+            Colormap name.
+
+        Returns
+        -------
+        BivariateColormap
+            Colormap interpolated in OKLab.
+        """
+        if len(corners) != 4:
+            raise ValueError(f"Expected 4 corner colors, got {len(corners)}")
+        m = n if m is None else m
+
+        lab = _srgb_to_oklab_array(mcolors.to_rgba_array(corners)[:, :3])
+        u = np.linspace(0.0, 1.0, n)[:, None, None]
+        v = np.linspace(0.0, 1.0, m)[None, :, None]
+        grid = (
+            (1 - u) * (1 - v) * lab[0]
+            + u * (1 - v) * lab[1]
+            + (1 - u) * v * lab[2]
+            + u * v * lab[3]
+        )
+        return cls(_oklab_to_srgb_array(grid), name=name)
+
+    @classmethod
+    def from_cmaps(
+        cls,
+        cmap_x: str | mcolors.Colormap,
+        cmap_y: str | mcolors.Colormap,
+        n: int = 16,
+        m: int | None = None,
+        name: str | None = None,
+    ) -> "BivariateColormap":
+        """
+        Create a colormap by combining two colormaps in OKLab.
+
+        Each colormap contributes its OKLab offset from its own start
+        color, added to the average of both start colors. The x edge of
+        the grid therefore follows ``cmap_x`` and the y edge ``cmap_y``,
+        and the far corner blends both. Sequential maps sharing a light
+        start color work best.
+
+        Parameters
+        ----------
+        cmap_x, cmap_y : str or matplotlib.colors.Colormap
+            Colormaps for the x and y variables (e.g. 'dm.Blues').
+        n, m : int, optional
+            Grid size along x and y. ``m`` defaults to ``n``.
+        name : str, optional
+            Colormap name. Defaults to '{cmap_x}+{cmap_y}'.
+
+        Returns
+        -------
+        BivariateColormap
+            Combined colormap.
+        """
+        cmap_x = mpl.colormaps[cmap_x] if isinstance(cmap_x, str) else cmap_x
+        cmap_y = mpl.colormaps[cmap_y] if isinstance(cmap_y, str) else cmap_y
+        m = n if m is None else m
+
+        lab_x = _srgb_to_oklab_array(cmap_x(np.linspace(0, 1, n))[:, :3])
+        lab_y = _srgb_to_oklab_array(cmap_y(np.linspace(0, 1, m))[:, :3])
+        origin = (lab_x[0] + lab_y[0]) / 2
+        grid = (
+            origin
+            + (lab_x - lab_x[0])[:, None, :]
+            + (lab_y - lab_y[0])[None, :, :]
+        )
+        grid[..., 0] = np.clip(grid[..., 0], 0.0, 1.0)
+
+        if name is None:
+            name = f"{cmap_x.name}+{cmap_y.name}"
+        return cls(_oklab_to_srgb_array(grid), name=name)
+
+    def apply(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        xlim: tuple[float, float] | None = None,
+        ylim: tuple[float, float] | None = None,
+    ) -> np.ndarray:
+        """
+        Map paired arrays to uint8 RGBA colors.
+
+        Both arrays are quantized like ``Colormap.__call__`` and combined
+        into a flat index into the color table, so the whole mapping is a
+        few array operations regardless of size.
+
+        Parameters
+        ----------
+        x, y : array-like
+            Paired data of the same shape. Values outside the limits use
+            the edge colors; NaN or masked values in either array become
+            transparent.
+        xlim, ylim : tuple of float, optional
+            Data ranges mapped to the grid. Default is the finite data
+            range.
+
+        Returns
+        -------
+        numpy.ndarray
+            Array of shape ``x.shape + (4,)`` and dtype uint8.
+        """
+        x = x if isinstance(x, np.ndarray) else np.asarray(x)
+        y = y if isinstance(y, np.ndarray) else np.asarray(y)
+        if x.shape != y.shape:
+            raise ValueError(
+                f"x and y must have the same shape, got {x.shape} and {y.shape}"
+            )
+
+        n, m = self.shape
+        xlim = _autoscale(x) if xlim is None else xlim
+        ylim = _autoscale(y) if ylim is None else ylim
+        ix = _lut_index(x, xlim[0], xlim[1], n)
+        iy = _lut_index(y, ylim[0], ylim[1], m)
+
+        # _lut_index yields 0 (under), 1..n, n + 1 (over) and n + 2 (bad).
+        bad = (ix == n + 2) | (iy == m + 2)
+        idx = np.clip(ix - 1, 0, n - 1) * m + np.clip(iy - 1, 0, m - 1)
+        idx[bad] = n * m
+        return self._lut.take(idx, axis=0)
+
+    def legend(
+        self,
+        ax: Axes,
+        bounds: tuple[float, float, float, float] = (1.05, 0.0, 0.3, 0.3),
+        xlabel: str | None = None,
+        ylabel: str | None = None,
+        xlim: tuple[float, float] = (0.0, 1.0),
+        ylim: tuple[float, float] = (0.0, 1.0),
+    ) -> Axes:
+        """
+        Draw the color grid as a square legend next to an axes.
+
+        Parameters
+        ----------
+        ax : matplotlib.axes.Axes
+            Axes the legend belongs to.
+        bounds : tuple of float, optional
+            Inset position (x0, y0, width, height) in axes coordinates.
+            Default places the legend to the right of ``ax``.
+        xlabel, ylabel : str, optional
+            Labels of the two variables.
+        xlim, ylim : tuple of float, optional
+            Data ranges shown on the legend axes.
+
+        Returns
+        -------
+        matplotlib.axes.Axes
+            The inset axes holding the legend.
+        """
+        lax = ax.inset_axes(bounds)
+        lax.imshow(
+            self.colors.transpose(1, 0, 2),
+            origin="lower",
+            extent=(*xlim, *ylim),
+            aspect="auto",
+            interpolation="nearest",
+        )
+        lax.set_box_aspect(1)
+        lax.set_xticks(xlim)
+        lax.set_yticks(ylim)
+        if xlabel is not None:
+            lax.set_xlabel(xlabel)
+        if ylabel is not None:
+            lax.set_ylabel(ylabel)
+        return lax
+
+    def __repr__(self) -> str:
+        """Return string representation."""
+        n, m = self.shape
+        return f"BivariateColormap({self.name!r}, shape=({n}, {m}))"
@@ -1,13 +1,21 @@
 """Colormap management utilities for matplotlib.
 
 This module handles loading and registration of custom colormaps from
-text files in the package's asset directory.
+text files in the package's asset directory, supports compact colormaps
+defined by OKLab/OKLCH control points, caches discretized colormaps,
+maps wrapped angles through cyclic colormaps, and provides fast helpers
+for applying colormaps to large arrays.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 import matplotlib as mpl
 import matplotlib.colors as mcolors
+import numpy as np
+
+from .color import _oklab_to_srgb_array, _srgb_to_oklab_array
 
 
 def _parse_colormap(
@@ -51,13 +59,422 @@ def _parse_colormap(
     return mcolors.ListedColormap(colors, name=name)
 
 
+# ============================================================================
+# Control-Point Colormaps
+# ============================================================================
+
+# Maximum number of synthesized LUTs kept, enough for every bundled map,
+# its reversal and a few resamplings.
+_LUT_CACHE_SIZE = 512
+
+_SPACES = ("oklab", "oklch")
+
+
+def _synthesize_lut(
+    positions: np.ndarray, values: np.ndarray, space: str, n: int
+) -> np.ndarray:
+    """
+    Interpolate control points into an sRGB lookup table.
+
+    Parameters
+    ----------
+    positions : numpy.ndarray
+        Non-decreasing control point positions in [0, 1], shape (k,).
+    values : numpy.ndarray
+        Control point colors with shape (k, 3): (L, a, b) for 'oklab' or
+        (L, C, h) with h in degrees for 'oklch'.
+    space : str
+        Interpolation space, 'oklab' or 'oklch'.
+    n : int
+        Number of LUT entries.
+
+    Returns
+    -------
+    numpy.ndarray
+        Read-only sRGB array of shape (n, 3). Results are memoized.
+    """
+    return _cached_lut(positions.tobytes(), values.tobytes(), space, n)
+
+
+@lru_cache(maxsize=_LUT_CACHE_SIZE)
+def _cached_lut(
+    positions: bytes, values: bytes, space: str, n: int
+) -> np.ndarray:
+    """Build the LUT returned by ``_synthesize_lut``."""
+    positions = np.frombuffer(positions)
+    values = np.frombuffer(values).reshape(-1, 3)
+    t = np.linspace(0.0, 1.0, n)
+    if space == "oklch":
+        # Interpolate hue along the shortest arc between control points.
+        values = values.copy()
+        values[:, 2] = np.unwrap(values[:, 2], period=360.0)
+    coords = np.stack(
+        [np.interp(t, positions, values[:, i]) for i in range(3)], axis=-1
+    )
+    if space == "oklch":
+        h = np.deg2rad(coords[:, 2])
+        coords = np.stack(
+            [coords[:, 0], coords[:, 1] * np.cos(h), coords[:, 1] * np.sin(h)],
+            axis=-1,
+        )
+
+    lut = _oklab_to_srgb_array(coords)
+    lut.flags.writeable = False
+    return lut
+
+
+class ControlPointColormap(mcolors.ListedColormap):
+    """
+    Colormap defined by OKLab or OKLCH control points.
+
+    The lookup table is synthesized from the control points on first use
+    and memoized, so the colormap can be resampled to any resolution
+    without interpolating between stored LUT entries. It is a
+    ``ListedColormap`` whose ``colors`` are that table.
+
+    Parameters
+    ----------
+    name : str
+        Colormap name.
+    positions : array-like
+        Non-decreasing control point positions from 0 to 1. A repeated
+        position creates a hard step.
+    values : array-like
+        Control point colors with shape (k, 3): (L, a, b) in OKLab or
+        (L, C, h) in OKLCH with h in degrees.
+    space : str, optional
+        Color space of ``values`` and of the interpolation, 'oklab' or
+        'oklch'. Default is 'oklab'.
+    N : int, optional
+        Number of LUT entries. Default is 256.
+
+    Raises
+    ------
+    ValueError
+        If the control points are malformed or ``space`` is unknown.
+
+    Examples
+    --------
+    >>> import dartwork_mpl as dm
+    >>> cmap = dm.ControlPointColormap(
+    ...     "ramp", [0, 1], [[0.3, 0.05, 260], [0.9, 0.1, 80]], space="oklch"
+    ... )
+    >>> cmap.resampled(4096).N
+    4096
+    """
+
+    def __init__(
+        self,
+        name: str,
+        positions: np.ndarray,
+        values: np.ndarray,
+        space: str = "oklab",
+        N: int = 256,
+    ) -> None:
+        positions = np.asarray(positions, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if space not in _SPACES:
+            raise ValueError(f"space must be one of {_SPACES}, got {space!r}")
+        if (
+            positions.ndim != 1
+            or len(positions) < 2
+            or values.shape != (len(positions), 3)
+        ):
+            raise ValueError(
+                "Expected at least two control points with positions of "
+                f"shape (k,) and values of shape (k, 3), got "
+                f"{positions.shape} and {values.shape}"
+            )
+        if (
+            positions[0] != 0
+            or positions[-1] != 1
+            or np.any(np.diff(positions) < 0)
+        ):
+            raise ValueError(
+                "Control point positions must be non-decreasing from 0 to 1"
+            )
+
+        # ListedColormap.__init__ needs the colors, which are synthesized
+        # lazily instead.
+        mcolors.Colormap.__init__(self, name, N)
+        self.monochrome = False
+        self._positions = positions
+        self._values = values
+        self._space = space
+
+    @property
+    def colors(self) -> np.ndarray:
+        """Return the read-only sRGB table of shape (N, 3)."""
+        return _synthesize_lut(
+            self._positions, self._values, self._space, self.N
+        )
+
+    @property
+    def control_points(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return copies of the (positions, values) control points."""
+        return self._positions.copy(), self._values.copy()
+
+    @property
+    def space(self) -> str:
+        """Return the color space of the control points."""
+        return self._space
+
+    def _init(self) -> None:
+        self._lut = np.ones((self.N + 3, 4), float)
+        self._lut[:-3, :3] = self.colors
+        self._isinit = True
+        self._set_extremes()
+
+    def resampled(self, lutsize: int) -> "ControlPointColormap":
+        """Return a new colormap synthesized with *lutsize* entries."""
+        new_cmap = ControlPointColormap(
+            self.name, self._positions, self._values, self._space, lutsize
+        )
+        new_cmap._rgba_over = self._rgba_over
+        new_cmap._rgba_under = self._rgba_under
+        new_cmap._rgba_bad = self._rgba_bad
+        return new_cmap
+
+    def reversed(self, name: str | None = None) -> "ControlPointColormap":
+        """Return a reversed instance of the colormap."""
+        if name is None:
+            name = self.name + "_r"
+
+        new_cmap = ControlPointColormap(
+            name,
+            1.0 - self._positions[::-1],
+            self._values[::-1],
+            self._space,
+            self.N,
+        )
+        new_cmap._rgba_over = self._rgba_under
+        new_cmap._rgba_under = self._rgba_over
+        new_cmap._rgba_bad = self._rgba_bad
+        return new_cmap
+
+
+def _parse_control_points(
+    path: str | Path, reverse: bool = False
+) -> ControlPointColormap:
+    """
+    Parse a control-point colormap from an ``.okl`` file.
+
+    Each non-comment line holds a position in [0, 1] followed by three
+    color coordinates. Coordinates are OKLab (L, a, b) unless the file
+    contains a ``# space: oklch`` line, in which case they are OKLCH
+    (L, C, h) with h in degrees.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to the control point file.
+    reverse : bool, optional
+        If True, reverse the colormap order. Default is False.
+
+    Returns
+    -------
+    ControlPointColormap
+        The colormap named 'dm.{filename}' or 'dm.{filename}_r' if
+        reversed.
+    """
+    path_obj: Path = Path(path)
+
+    space: str = "oklab"
+    rows: list[list[float]] = []
+    with open(path_obj) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("#"):
+                key, _, value = line[1:].partition(":")
+                if key.strip() == "space":
+                    space = value.strip().lower()
+                continue
+
+            rows.append([float(v) for v in line.split()])
+
+    points: np.ndarray = np.array(rows, dtype=float)
+    cmap = ControlPointColormap(
+        f"dm.{path_obj.stem}", points[:, 0], points[:, 1:], space
+    )
+    return cmap.reversed() if reverse else cmap
+
+
+def _douglas_peucker(t: np.ndarray, lab: np.ndarray, tol: float) -> np.ndarray:
+    """
+    Select samples whose piecewise-linear interpolation stays within *tol*.
+
+    Parameters
+    ----------
+    t : numpy.ndarray
+        Sample positions, shape (n,).
+    lab : numpy.ndarray
+        OKLab samples, shape (n, 3).
+    tol : float
+        Maximum OKLab distance between a sample and the interpolation.
+
+    Returns
+    -------
+    numpy.ndarray
+        Sorted indices of the retained samples, always including the
+        first and last.
+    """
+    keep = np.zeros(len(t), dtype=bool)
+    keep[[0, -1]] = True
+    stack: list[tuple[int, int]] = [(0, len(t) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        span = t[end] - t[start]
+        w = (t[start + 1 : end] - t[start]) / span if span > 0 else 0.5
+        line = lab[start] + np.multiply.outer(w, lab[end] - lab[start])
+        err = np.linalg.norm(lab[start + 1 : end] - line, axis=-1)
+        i = int(np.argmax(err))
+        if err[i] > tol:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.extend([(start, mid), (mid, end)])
+    return np.flatnonzero(keep)
+
+
+def fit_control_points(
+    cmap: str | mcolors.Colormap, tol: float = 2e-3
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fit OKLab control points to an existing colormap.
+
+    The colormap's LUT is simplified with the Douglas-Peucker algorithm
+    in OKLab, keeping the fewest entries whose linear interpolation
+    stays within ``tol`` of every original entry.
+
+    Parameters
+    ----------
+    cmap : str or matplotlib.colors.Colormap
+        Registered colormap name (e.g. 'dm.vik') or colormap instance.
+    tol : float, optional
+        Maximum OKLab distance between the fit and the colormap.
+        Default is 2e-3, well below a just noticeable difference.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        Positions of shape (k,) and OKLab values of shape (k, 3), ready
+        for ``ControlPointColormap`` or ``save_control_points``.
+
+    Examples
+    --------
+    >>> import dartwork_mpl as dm
+    >>> positions, values = dm.fit_control_points("dm.vik")
+    >>> len(positions) < 256
+    True
+    """
+    cmap = mpl.colormaps[cmap] if isinstance(cmap, str) else cmap
+    t = np.linspace(0.0, 1.0, cmap.N)
+    lab = _srgb_to_oklab_array(cmap(t)[:, :3])
+    idx = _douglas_peucker(t, lab, tol)
+    return t[idx], lab[idx]
+
+
+def save_control_points(
+    cmap: str | mcolors.Colormap, path: str | Path, tol: float = 2e-3
+) -> Path:
+    """
+    Write a colormap as an ``.okl`` control point file.
+
+    Files placed in the package's ``asset/cmap`` directory are registered
+    as ``dm.{filename}`` on import.
+
+    Parameters
+    ----------
+    cmap : str or matplotlib.colors.Colormap
+        Colormap name or instance. ``ControlPointColormap`` instances are
+        written as-is; other colormaps are fitted with
+        ``fit_control_points``.
+    path : str or Path
+        Output file path.
+    tol : float, optional
+        Fit tolerance passed to ``fit_control_points``.
+
+    Returns
+    -------
+    Path
+        The written file path.
+    """
+    cmap = mpl.colormaps[cmap] if isinstance(cmap, str) else cmap
+    if isinstance(cmap, ControlPointColormap):
+        positions, values = cmap.control_points
+        space = cmap.space
+    else:
+        positions, values = fit_control_points(cmap, tol)
+        space = "oklab"
+
+    path_obj: Path = Path(path)
+    lines: list[str] = [f"# space: {space}"]
+    lines += [
+        f"{p:.6f} {v[0]:.6f} {v[1]:.6f} {v[2]:.6f}"
+        for p, v in zip(positions, values, strict=True)
+    ]
+    path_obj.write_text("\n".join(lines) + "\n")
+    return path_obj
+
+
+def cmap_lut(
+    cmap: str | mcolors.Colormap,
+    n: int = 256,
+    dtype: np.dtype | type = np.float64,
+) -> np.ndarray:
+    """
+    Return an RGB lookup table of a colormap at any resolution.
+
+    Control-point colormaps are synthesized directly at ``n`` entries
+    (memoized); other colormaps are resampled.
+
+    Parameters
+    ----------
+    cmap : str or matplotlib.colors.Colormap
+        Registered colormap name (e.g. 'dm.vik') or colormap instance.
+    n : int, optional
+        Number of entries. Default is 256.
+    dtype : numpy dtype, optional
+        Floating dtypes give values in [0, 1]; unsigned integer dtypes
+        (e.g. ``numpy.uint16``) are scaled to their full range.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (n, 3).
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import dartwork_mpl as dm
+    >>> dm.cmap_lut("dm.vik", 4096, dtype=np.uint16).shape
+    (4096, 3)
+    """
+    cmap = mpl.colormaps[cmap] if isinstance(cmap, str) else cmap
+    if isinstance(cmap, ControlPointColormap):
+        lut = _synthesize_lut(cmap._positions, cmap._values, cmap._space, n)
+    else:
+        lut = cmap.resampled(n)(np.arange(n))[:, :3]
+
+    dtype = np.dtype(dtype)
+    if dtype.kind == "u":
+        return np.rint(lut * np.iinfo(dtype).max).astype(dtype)
+    return lut.astype(dtype)
+
+
 def _load_colormaps() -> None:
     """
     Load all colormap files from the asset/cmap directory and register them.
 
-    This function automatically discovers all .txt files in the
-    asset/cmap directory, parses them as colormaps, and registers both
-    normal and reversed versions with matplotlib's colormap registry.
+    This function automatically discovers all .txt LUT files and .okl
+    control point files in the asset/cmap directory, parses them as
+    colormaps, and registers both normal and reversed versions with
+    matplotlib's colormap registry. Most continuous colormaps are stored
+    as control points; qualitative lists and maps with hard steps are
+    stored as LUTs.
 
     Notes
     -----
@@ -65,11 +482,504 @@ def _load_colormaps() -> None:
     """
     root_dir: Path = Path(__file__).parent / "asset/cmap"
     for path in root_dir.glob("*.txt"):
-        cmap: mcolors.ListedColormap = _parse_colormap(path)
+        cmap: mcolors.Colormap = _parse_colormap(path)
         mpl.colormaps.register(cmap=cmap)
 
-        cmap_r: mcolors.ListedColormap = _parse_colormap(path, reverse=True)
+        cmap_r: mcolors.Colormap = _parse_colormap(path, reverse=True)
         mpl.colormaps.register(cmap=cmap_r)
 
+    for path in root_dir.glob("*.okl"):
+        mpl.colormaps.register(cmap=_parse_control_points(path))
+        mpl.colormaps.register(cmap=_parse_control_points(path, reverse=True))
+
 
 _load_colormaps()
+
+
+# ============================================================================
+# Discrete Colormaps
+# ============================================================================
+
+# Maximum number of (cmap, norm) pairs kept by discrete_cmap.
+_DISCRETE_CACHE_SIZE = 128
+
+
+@lru_cache(maxsize=_DISCRETE_CACHE_SIZE)
+def _discrete_cmap(
+    name: str, n: int, boundaries: tuple[float, ...] | None, extend: str
+) -> tuple[mcolors.ListedColormap, mcolors.Normalize | None]:
+    """Build the cached pair returned by ``discrete_cmap``."""
+    base = mpl.colormaps[name]
+    colors = base(np.linspace(0.0, 1.0, n))
+    colors.flags.writeable = False
+
+    cmap = mcolors.ListedColormap(colors, name=f"{name}_{n}")
+    cmap.set_bad(base.get_bad())
+    # Build the LUT now and freeze it; the pair is shared between callers.
+    cmap._init()
+    cmap._lut.flags.writeable = False
+
+    norm = None
+    if boundaries is not None:
+        norm = mcolors.BoundaryNorm(boundaries, n, extend=extend)
+    return cmap, norm
+
+
+def discrete_cmap(
+    name: str,
+    n: int | None = None,
+    *,
+    boundaries: list[float] | np.ndarray | None = None,
+    extend: str = "neither",
+) -> tuple[mcolors.ListedColormap, mcolors.Normalize | None]:
+    """
+    Return a cached discrete colormap and matching norm.
+
+    Identical requests return the same objects, so small multiples that
+    ask for the same discretization share one colormap and one LUT
+    instead of rebuilding them for every axes. The least recently used
+    pairs are evicted once more than 128 are cached.
+
+    Parameters
+    ----------
+    name : str
+        Registered colormap name (e.g. 'dm.vik').
+    n : int, optional
+        Number of discrete colors, sampled evenly from the colormap.
+        Required without ``boundaries``; otherwise defaults to the number
+        of bins plus one color per extension.
+    boundaries : array-like, optional
+        Monotonically increasing bin edges. If given, a ``BoundaryNorm``
+        is returned as the norm.
+    extend : {'neither', 'both', 'min', 'max'}, optional
+        Extensions passed to ``BoundaryNorm``. Default is 'neither'.
+
+    Returns
+    -------
+    tuple[matplotlib.colors.ListedColormap, matplotlib.colors.Normalize or None]
+        The colormap named '{name}_{n}' and the ``BoundaryNorm``, or None
+        without ``boundaries``. The colormap's color arrays are read-only;
+        use ``cmap.copy()`` or ``cmap.with_extremes()`` to modify it.
+
+    Raises
+    ------
+    ValueError
+        If neither ``n`` nor ``boundaries`` is given, or ``n`` is too
+        small for ``boundaries`` and ``extend``.
+
+    Notes
+    -----
+    The cache is keyed by colormap name. Call
+    ``discrete_cmap.cache_clear()`` after re-registering a colormap under
+    an existing name; ``discrete_cmap.cache_info()`` reports hits and
+    misses.
+
+    Examples
+    --------
+    >>> import dartwork_mpl as dm
+    >>> cmap, norm = dm.discrete_cmap("dm.vik", boundaries=[-2, -1, 0, 1, 2])
+    >>> cmap.N
+    4
+    >>> dm.discrete_cmap("dm.vik", boundaries=[-2, -1, 0, 1, 2])[0] is cmap
+    True
+    """
+    if boundaries is not None:
+        boundaries = tuple(float(b) for b in np.ravel(boundaries))
+        if n is None:
+            n = len(boundaries) - 1
+            n += extend in ("both", "min")
+            n += extend in ("both", "max")
+    elif n is None:
+        raise ValueError("Either n or boundaries must be given")
+
+    return _discrete_cmap(name, int(n), boundaries, extend)
+
+
+discrete_cmap.cache_info = _discrete_cmap.cache_info
+discrete_cmap.cache_clear = _discrete_cmap.cache_clear
+
+
+# ============================================================================
+# Cyclic Colormaps
+# ============================================================================
+
+# First and last LUT entries closer than this are treated as one color.
+_SEAM_TOL = 1e-3
+
+
+def _angle_period(degrees: bool) -> float:
+    """Return the period of an angle unit."""
+    return 360.0 if degrees else 2 * np.pi
+
+
+class CyclicNorm(mcolors.Normalize):
+    """
+    Normalize wrapped angles to [0, 1] for cyclic colormaps.
+
+    Angles are reduced modulo one period after subtracting ``offset``, so
+    data in any range (e.g. -180..180 or 0..720 degrees) maps to the same
+    colors without manual wrapping.
+
+    Parameters
+    ----------
+    degrees : bool, optional
+        If True, angles are in degrees; otherwise radians. Default is
+        False.
+    offset : float, optional
+        Angle mapped to the start of the colormap, in the same unit.
+        Default is 0.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import matplotlib.pyplot as plt
+    >>> import dartwork_mpl as dm
+    >>> angle = np.arctan2(v, u)
+    >>> plt.quiver(x, y, u, v, angle, cmap="dm.romaO", norm=dm.CyclicNorm())
+    """
+
+    def __init__(self, degrees: bool = False, offset: float = 0.0) -> None:
+        self.period: float = _angle_period(degrees)
+        self.offset: float = offset
+        super().__init__(vmin=offset, vmax=offset + self.period, clip=False)
+        # Colorbars show one period on a linear axis instead of deriving a
+        # (wrapping) scale from this norm.
+        self._scale = "linear"
+
+    def __call__(
+        self, value: np.ndarray, clip: bool | None = None
+    ) -> np.ma.MaskedArray:
+        """Map angles to [0, 1], masking non-finite values."""
+        data = np.ma.masked_invalid(np.ma.asarray(value, dtype=float))
+        shifted = data.filled(self.offset) - self.offset
+        wrapped = np.mod(shifted, self.period) / self.period
+        # Whole positive periods map to 1 so that vmax stays at the end of
+        # the range (e.g. for colorbars); the color is the same as at 0.
+        wrapped = np.where((wrapped == 0) & (shifted > 0), 1.0, wrapped)
+        result = np.ma.array(wrapped, mask=np.ma.getmaskarray(data))
+        return result[()] if np.ndim(value) == 0 else result
+
+    def inverse(self, value: np.ndarray) -> np.ndarray:
+        """Map [0, 1) back to angles starting at ``offset``."""
+        return self.offset + np.asarray(value, dtype=float) * self.period
+
+    def autoscale(self, A: np.ndarray) -> None:
+        """Keep the fixed one-period range."""
+
+    def autoscale_None(self, A: np.ndarray) -> None:
+        """Keep the fixed one-period range."""
+
+
+def map_angles(
+    angles: np.ndarray,
+    cmap: str | mcolors.Colormap = "dm.romaO",
+    *,
+    degrees: bool = False,
+    offset: float = 0.0,
+    bytes: bool = False,
+) -> np.ndarray:
+    """
+    Map angles through a cyclic colormap with seam-correct interpolation.
+
+    Angles are wrapped modulo one period and interpolated linearly between
+    neighbouring LUT entries, with the last entry interpolating back into
+    the first. Colors are therefore continuous across the seam, and no
+    precision is lost to quantization. If the colormap repeats its first
+    color at the end, the duplicate is dropped so the seam is not counted
+    twice.
+
+    Parameters
+    ----------
+    angles : array-like
+        Angles of any shape. NaN, infinite and masked values use the
+        colormap's bad color.
+    cmap : str or matplotlib.colors.Colormap, optional
+        Cyclic colormap name or instance. Default is 'dm.romaO'.
+    degrees : bool, optional
+        If True, angles are in degrees; otherwise radians. Default is
+        False.
+    offset : float, optional
+        Angle mapped to the start of the colormap, in the same unit.
+        Default is 0.
+    bytes : bool, optional
+        If True, return rounded uint8 RGBA; otherwise float RGBA in
+        [0, 1]. Default is False.
+
+    Returns
+    -------
+    numpy.ndarray
+        RGBA colors of shape ``angles.shape + (4,)``.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import dartwork_mpl as dm
+    >>> u, v = np.random.randn(2, 1000, 1000)
+    >>> colors = dm.map_angles(np.arctan2(v, u), "dm.romaO")
+    >>> colors.shape
+    (1000, 1000, 4)
+    """
+    cmap = mpl.colormaps[cmap] if isinstance(cmap, str) else cmap
+    lut = cmap(np.arange(cmap.N))
+    if np.abs(lut[0] - lut[-1]).max() < _SEAM_TOL:
+        lut = lut[:-1]
+    k = len(lut)
+
+    data = np.ma.masked_invalid(np.ma.asarray(angles, dtype=np.float64))
+    bad = np.ma.getmaskarray(data)
+    period = _angle_period(degrees)
+
+    pos = np.mod(data.filled(offset) - offset, period)
+    pos *= k / period
+    i0 = np.floor(pos)
+    weight = (pos - i0)[..., None]
+    # Rounding can put pos at exactly k; wrap it back to entry 0.
+    i0 = i0.astype(np.intp) % k
+    i1 = (i0 + 1) % k
+
+    rgba = lut[i0]
+    rgba *= 1 - weight
+    rgba += lut[i1] * weight
+    rgba[bad] = cmap.get_bad()
+
+    if bytes:
+        return np.rint(rgba * 255).astype(np.uint8)
+    return rgba
+
+
+# ============================================================================
+# Colormap Application
+# ============================================================================
+
+# Default number of elements processed per chunk by apply_cmap.
+_CHUNK_SIZE = 1 << 22
+
+
+def _finite_range(values: np.ndarray) -> tuple[float, float] | None:
+    """
+    Return the minimum and maximum of the finite values of an array.
+
+    Parameters
+    ----------
+    values : numpy.ndarray or numpy.ma.MaskedArray
+        Data values. NaN, ±inf and masked values are ignored.
+
+    Returns
+    -------
+    tuple[float, float] or None
+        ``(min, max)``, or None if no value is finite.
+    """
+    values = np.ma.filled(np.ma.asarray(values, dtype=np.float64), np.nan)
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return None
+    return float(finite.min()), float(finite.max())
+
+
+def _lut_bytes(cmap: mcolors.Colormap) -> np.ndarray:
+    """
+    Return the uint8 RGBA lookup table of a colormap for ``_lut_index``.
+
+    Parameters
+    ----------
+    cmap : matplotlib.colors.Colormap
+        Colormap to convert.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (N + 3, 4) holding the under color, the N colormap
+        entries, the over color and the bad color, quantized like
+        ``cmap(x, bytes=True)``.
+    """
+    colors = np.vstack(
+        [
+            [cmap.get_under()],
+            cmap(np.arange(cmap.N)),
+            [cmap.get_over(), cmap.get_bad()],
+        ]
+    )
+    return (colors * 255).astype(np.uint8)
+
+
+def _lut_index(
+    block: np.ndarray, vmin: float, vmax: float, n: int
+) -> np.ndarray:
+    """
+    Quantize a block of data into indices of a ``_lut_bytes`` table.
+
+    Parameters
+    ----------
+    block : numpy.ndarray or numpy.ma.MaskedArray
+        Data values. NaN and masked values map to the bad color.
+    vmin, vmax : float
+        Data range mapped to the colormap.
+    n : int
+        Number of colormap entries.
+
+    Returns
+    -------
+    numpy.ndarray
+        Integer indices with the same shape as ``block``: 0 for under,
+        1..n for colormap entries, n + 1 for over and n + 2 for bad.
+    """
+    data = np.ma.getdata(block)
+    # Keep float32 inputs in float32, like Normalize does.
+    dtype = data.dtype if data.dtype.kind == "f" else np.float64
+    values = np.array(data, dtype=np.promote_types(dtype, np.float32))
+
+    # Same arithmetic as Normalize followed by Colormap.__call__.
+    if vmax == vmin:
+        values *= 0
+    else:
+        values -= vmin
+        values /= vmax - vmin
+    values *= n
+    values[values == n] = n - 1
+
+    # Under -> -1, over -> n, then shift everything by one. NaN survives
+    # clip and floor and is routed to the bad entry below.
+    np.clip(values, -1, n, out=values)
+    np.floor(values, out=values)
+    bad = np.isnan(values)
+    if np.ma.is_masked(block):
+        bad |= np.ma.getmaskarray(block)
+    values[bad] = n + 1
+    values += 1
+    return values.astype(np.intp)
+
+
+def _row_blocks(n_rows: int, row_size: int, chunk_size: int) -> list[slice]:
+    """
+    Split the leading axis into blocks of about ``chunk_size`` elements.
+
+    Parameters
+    ----------
+    n_rows : int
+        Length of the leading axis.
+    row_size : int
+        Number of elements per row.
+    chunk_size : int
+        Target number of elements per block.
+
+    Returns
+    -------
+    list[slice]
+        Slices covering the leading axis.
+    """
+    step = max(1, chunk_size // max(row_size, 1))
+    return [
+        slice(start, min(start + step, n_rows))
+        for start in range(0, n_rows, step)
+    ]
+
+
+def apply_cmap(
+    data: np.ndarray,
+    name: str | mcolors.Colormap,
+    vmin: float | None = None,
+    vmax: float | None = None,
+    out: np.ndarray | None = None,
+    *,
+    channels: int = 4,
+    chunk_size: int = _CHUNK_SIZE,
+    workers: int | None = None,
+) -> np.ndarray:
+    """
+    Map data through a colormap directly into uint8 RGBA or RGB.
+
+    Equivalent to ``cmap(Normalize(vmin, vmax)(data), bytes=True)`` but
+    without allocating a float64 RGBA array. Data are quantized into LUT
+    indices block by block along the first axis, so memory stays bounded
+    for memory-mapped inputs and outputs.
+
+    Parameters
+    ----------
+    data : array-like
+        Data to map. NaN and masked values use the colormap's bad color;
+        values below ``vmin`` or above ``vmax`` use its under/over colors.
+    name : str or matplotlib.colors.Colormap
+        Registered colormap name (e.g. 'dm.vik') or colormap instance.
+    vmin, vmax : float, optional
+        Data range mapped to the colormap. If None, the finite minimum or
+        maximum of ``data`` is used.
+    out : numpy.ndarray, optional
+        Preallocated uint8 output of shape ``data.shape + (channels,)``,
+        e.g. a ``numpy.memmap``.
+    channels : int, optional
+        4 for RGBA output, 3 for RGB. Default is 4.
+    chunk_size : int, optional
+        Approximate number of elements processed per block.
+    workers : int, optional
+        Number of threads used to process blocks. NumPy releases the GIL
+        during the heavy operations, so threads scale on large arrays.
+        Default is None (single-threaded).
+
+    Returns
+    -------
+    numpy.ndarray
+        The uint8 output array (``out`` if given).
+
+    Raises
+    ------
+    ValueError
+        If ``channels`` is not 3 or 4, or ``out`` has the wrong shape or
+        dtype.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import dartwork_mpl as dm
+    >>> raster = np.random.rand(2000, 2000)
+    >>> rgba = dm.apply_cmap(raster, "dm.vik", 0, 1, workers=4)
+    >>> rgba.shape, rgba.dtype
+    ((2000, 2000, 4), dtype('uint8'))
+    """
+    if channels not in (3, 4):
+        raise ValueError(f"channels must be 3 or 4, got {channels}")
+
+    cmap = mpl.colormaps[name] if isinstance(name, str) else name
+    lut = _lut_bytes(cmap)[:, :channels]
+
+    if not isinstance(data, np.ndarray):
+        data = np.asarray(data)
+    scalar = data.ndim == 0
+    if scalar:
+        data = data.reshape(1)
+
+    row_size = int(np.prod(data.shape[1:], dtype=np.int64))
+    blocks = _row_blocks(data.shape[0], row_size, chunk_size)
+
+    if vmin is None or vmax is None:
+        lo, hi = np.inf, -np.inf
+        for block in blocks:
+            limits = _finite_range(data[block])
+            if limits is not None:
+                lo = min(lo, limits[0])
+                hi = max(hi, limits[1])
+        if not np.isfinite(lo):
+            lo = hi = 0.0
+        vmin = lo if vmin is None else vmin
+        vmax = hi if vmax is None else vmax
+
+    shape = data.shape + (channels,)
+    if out is None:
+        out = np.empty(shape, dtype=np.uint8)
+    elif out.shape != shape or out.dtype != np.uint8:
+        raise ValueError(
+            f"out must be a uint8 array of shape {shape}, got "
+            f"{out.dtype} array of shape {out.shape}"
+        )
+
+    def _apply_block(block: slice) -> None:
+        idx = _lut_index(data[block], vmin, vmax, cmap.N)
+        out[block] = lut.take(idx, axis=0)
+
+    if workers is not None and workers > 1 and len(blocks) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_apply_block, blocks))
+    else:
+        for block in blocks:
+            _apply_block(block)
+
+    return out[0] if scalar else out
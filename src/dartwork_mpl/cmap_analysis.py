@@ -0,0 +1,644 @@
+"""Perceptual analysis of colormaps.
+
+This module computes perceptual features of colormaps in OKLab (lightness
+profile, monotonicity, uniformity, hue span and color-vision-deficiency
+distinctness), stores them in a compact, queryable index, and corrects
+non-uniform colormaps by resampling them to equal perceptual steps.
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import matplotlib as mpl
+import matplotlib.colors as mcolors
+import numpy as np
+
+from .asset_viz import _lut_hash, _sample_colormaps, classify_colormaps
+from .color import (
+    _linear_to_srgb,
+    _oklab_to_srgb_array,
+    _srgb_to_linear,
+    _srgb_to_oklab_array,
+)
+
+if TYPE_CHECKING:
+    from matplotlib.colors import Colormap
+
+
+# Number of LUT samples used for feature extraction.
+_N_SAMPLES = 256
+
+# Number of points stored per lightness profile in the index.
+_N_PROFILE = 32
+
+# Tolerance in OKLab lightness for monotonicity checks.
+_MONOTONIC_TOL = 1e-3
+
+# Minimum OKLCH chroma for a step to count toward the hue span.
+_HUE_MIN_CHROMA = 0.02
+
+# Color vision deficiency simulation matrices (Machado et al. 2009,
+# severity 1.0), applied to linear RGB.
+_CVD_MATRICES: dict[str, np.ndarray] = {
+    "protanopia": np.array(
+        [
+            [0.152286, 1.052583, -0.204868],
+            [0.114503, 0.786281, 0.099216],
+            [-0.003882, -0.048116, 1.051998],
+        ]
+    ),
+    "deuteranopia": np.array(
+        [
+            [0.367322, 0.860646, -0.227968],
+            [0.280085, 0.672501, 0.047413],
+            [-0.011820, 0.042940, 0.968881],
+        ]
+    ),
+    "tritanopia": np.array(
+        [
+            [1.255528, -0.076749, -0.178779],
+            [-0.078411, 0.930809, 0.147602],
+            [0.004733, 0.691367, 0.303900],
+        ]
+    ),
+}
+
+
+def _delta_e(lab: np.ndarray) -> np.ndarray:
+    """
+    Compute ΔE_OK between consecutive colors.
+
+    Parameters
+    ----------
+    lab : numpy.ndarray
+        OKLab colors with shape (..., n, 3).
+
+    Returns
+    -------
+    numpy.ndarray
+        Euclidean OKLab distances with shape (..., n - 1).
+    """
+    return np.sqrt(np.sum(np.diff(lab, axis=-2) ** 2, axis=-1))
+
+
+def _is_monotonic(lightness: np.ndarray) -> np.ndarray:
+    """
+    Check whether lightness profiles are monotonic.
+
+    Parameters
+    ----------
+    lightness : numpy.ndarray
+        Lightness profiles with shape (n_cmaps, n).
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean array of shape (n_cmaps,).
+    """
+    steps = np.diff(lightness, axis=-1)
+    return np.all(steps >= -_MONOTONIC_TOL, axis=-1) | np.all(
+        steps <= _MONOTONIC_TOL, axis=-1
+    )
+
+
+def _is_monotonic_halves(lightness: np.ndarray) -> np.ndarray:
+    """
+    Check whether lightness is monotonic on each side of a central pivot.
+
+    The pivot is the lightness extremum closest to the midpoint, which
+    must lie in the central half of the colormap.
+
+    Parameters
+    ----------
+    lightness : numpy.ndarray
+        Lightness profiles with shape (n_cmaps, n).
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean array of shape (n_cmaps,).
+    """
+    n = lightness.shape[-1]
+    mid = n // 2
+    peak = np.argmax(lightness, axis=-1)
+    trough = np.argmin(lightness, axis=-1)
+    pivot = np.where(np.abs(peak - mid) <= np.abs(trough - mid), peak, trough)
+
+    steps = np.diff(lightness, axis=-1)
+    before = np.arange(n - 1) < pivot[:, np.newaxis]
+    rising = steps >= -_MONOTONIC_TOL
+    falling = steps <= _MONOTONIC_TOL
+
+    left = np.all(rising | ~before, axis=-1) | np.all(
+        falling | ~before, axis=-1
+    )
+    right = np.all(rising | before, axis=-1) | np.all(falling | before, axis=-1)
+    return left & right & (np.abs(pivot - mid) <= n // 4)
+
+
+def _uniformity(delta_e: np.ndarray) -> np.ndarray:
+    """
+    Score perceptual uniformity from consecutive ΔE_OK steps.
+
+    The score is ``1 / (1 + cv)`` where ``cv`` is the coefficient of
+    variation of the step sizes, so a perfectly uniform colormap scores 1.
+
+    Parameters
+    ----------
+    delta_e : numpy.ndarray
+        Consecutive ΔE_OK with shape (n_cmaps, n - 1).
+
+    Returns
+    -------
+    numpy.ndarray
+        Uniformity scores in (0, 1] with shape (n_cmaps,).
+    """
+    mean = delta_e.mean(axis=-1)
+    cv = np.divide(
+        delta_e.std(axis=-1), mean, out=np.zeros_like(mean), where=mean > 0
+    )
+    return 1.0 / (1.0 + cv)
+
+
+def _hue_span(lab: np.ndarray) -> np.ndarray:
+    """
+    Compute the total OKLCH hue traversed by each colormap.
+
+    Steps where either color is close to achromatic are ignored, since
+    their hue is not perceptually meaningful.
+
+    Parameters
+    ----------
+    lab : numpy.ndarray
+        OKLab colors with shape (n_cmaps, n, 3).
+
+    Returns
+    -------
+    numpy.ndarray
+        Hue span in degrees with shape (n_cmaps,).
+    """
+    chroma = np.hypot(lab[..., 1], lab[..., 2])
+    hue = np.degrees(np.arctan2(lab[..., 2], lab[..., 1]))
+    steps = np.abs(np.diff(hue, axis=-1)) % 360.0
+    steps = np.minimum(steps, 360.0 - steps)
+    chromatic = (chroma[..., 1:] > _HUE_MIN_CHROMA) & (
+        chroma[..., :-1] > _HUE_MIN_CHROMA
+    )
+    return np.sum(np.where(chromatic, steps, 0.0), axis=-1)
+
+
+def _cvd_distinctness(rgb: np.ndarray, lab: np.ndarray) -> np.ndarray:
+    """
+    Score how much of a colormap's perceptual length survives CVD.
+
+    Each colormap is simulated for protanopia, deuteranopia and
+    tritanopia. The score is the smallest ratio of simulated to original
+    OKLab path length, so 1 means fully preserved contrast.
+
+    Parameters
+    ----------
+    rgb : numpy.ndarray
+        sRGB colors with shape (n_cmaps, n, 3).
+    lab : numpy.ndarray
+        OKLab colors of ``rgb`` with shape (n_cmaps, n, 3).
+
+    Returns
+    -------
+    numpy.ndarray
+        Distinctness scores in [0, 1] with shape (n_cmaps,).
+    """
+    length = _delta_e(lab).sum(axis=-1)
+    linear = _srgb_to_linear(rgb)
+    ratios = []
+    for matrix in _CVD_MATRICES.values():
+        simulated = _linear_to_srgb(np.clip(linear @ matrix.T, 0.0, 1.0))
+        sim_length = _delta_e(_srgb_to_oklab_array(simulated)).sum(axis=-1)
+        ratios.append(
+            np.divide(
+                sim_length, length, out=np.ones_like(length), where=length > 0
+            )
+        )
+    return np.clip(np.min(ratios, axis=0), 0.0, 1.0)
+
+
+class ColormapIndex:
+    """
+    Compact table of perceptual colormap features with a query API.
+
+    Features are computed once, vectorized across all colormaps, and kept
+    as NumPy columns so that queries are boolean masks and never sample a
+    colormap again.
+
+    Attributes
+    ----------
+    names : numpy.ndarray
+        Colormap names.
+    category : numpy.ndarray
+        Category from :func:`dartwork_mpl.classify_colormap`.
+    lightness : numpy.ndarray
+        OKLab lightness profile with shape (n_cmaps, 32).
+    monotonic : numpy.ndarray
+        True if lightness is monotonic over the whole colormap.
+    monotonic_halves : numpy.ndarray
+        True if lightness is monotonic on each side of a central turning
+        point, as expected from diverging colormaps.
+    uniformity : numpy.ndarray
+        Perceptual uniformity score in (0, 1], 1 being perfectly uniform.
+    hue_span : numpy.ndarray
+        Total OKLCH hue traversed, in degrees.
+    cvd_distinctness : numpy.ndarray
+        Fraction of perceptual contrast preserved under the worst color
+        vision deficiency, in [0, 1].
+
+    Examples
+    --------
+    >>> import dartwork_mpl as dm
+    >>> index = dm.colormap_index()
+    >>> index.query("Diverging", monotonic_halves=True, cvd_safe=True)
+    ['dm.vik', ...]
+    """
+
+    _COLUMNS = (
+        "names",
+        "category",
+        "lightness",
+        "monotonic",
+        "monotonic_halves",
+        "uniformity",
+        "hue_span",
+        "cvd_distinctness",
+    )
+
+    def __init__(self, **columns: np.ndarray) -> None:
+        """
+        Initialize the index from precomputed columns.
+
+        Parameters
+        ----------
+        **columns : numpy.ndarray
+            One array per feature column. Use :meth:`build` to compute
+            them from colormaps.
+        """
+        for name in self._COLUMNS:
+            setattr(self, name, np.asarray(columns[name]))
+
+    @classmethod
+    def build(
+        cls, cmaps: "list[Colormap] | list[str] | None" = None
+    ) -> "ColormapIndex":
+        """
+        Compute the feature index for a set of colormaps.
+
+        Parameters
+        ----------
+        cmaps : list of matplotlib.colors.Colormap or str, optional
+            Colormaps to index. If None, all registered ``dm.*`` colormaps
+            (including reversed versions) are used.
+
+        Returns
+        -------
+        ColormapIndex
+            Index holding one row per colormap.
+        """
+        if cmaps is None:
+            cmaps = sorted(
+                name for name in mpl.colormaps if name.startswith("dm.")
+            )
+        cmaps = [mpl.colormaps[c] if isinstance(c, str) else c for c in cmaps]
+
+        rgb = _sample_colormaps(cmaps, _N_SAMPLES)
+        lab = _srgb_to_oklab_array(rgb)
+        lightness = lab[..., 0]
+        profile_idx = np.linspace(0, _N_SAMPLES - 1, _N_PROFILE).round()
+
+        return cls(
+            names=np.array([cmap.name for cmap in cmaps]),
+            category=np.array(classify_colormaps(cmaps)),
+            lightness=lightness[:, profile_idx.astype(int)].astype(np.float32),
+            monotonic=_is_monotonic(lightness),
+            monotonic_halves=_is_monotonic_halves(lightness),
+            uniformity=_uniformity(_delta_e(lab)).astype(np.float32),
+            hue_span=_hue_span(lab).astype(np.float32),
+            cvd_distinctness=_cvd_distinctness(rgb, lab).astype(np.float32),
+        )
+
+    def __len__(self) -> int:
+        """Return the number of indexed colormaps."""
+        return len(self.names)
+
+    def __repr__(self) -> str:
+        """Return string representation."""
+        return f"ColormapIndex({len(self)} colormaps)"
+
+    def query(
+        self,
+        category: str | None = None,
+        *,
+        monotonic: bool | None = None,
+        monotonic_halves: bool | None = None,
+        starts: str | None = None,
+        cvd_safe: bool | None = None,
+        min_cvd_distinctness: float = 0.5,
+        min_uniformity: float | None = None,
+        hue_span: tuple[float, float] | None = None,
+    ) -> list[str]:
+        """
+        Select colormaps matching perceptual criteria.
+
+        Parameters
+        ----------
+        category : str, optional
+            Required category, e.g. 'Diverging' or 'Sequential Multi-Hue'.
+        monotonic : bool, optional
+            Require (or exclude) monotonic lightness over the whole map.
+        monotonic_halves : bool, optional
+            Require (or exclude) monotonic lightness on each side of the
+            midpoint, as expected from diverging colormaps.
+        starts : {'dark', 'light'}, optional
+            Require the first color to be dark (L < 0.5) or light.
+        cvd_safe : bool, optional
+            Require (or exclude) ``cvd_distinctness`` of at least
+            ``min_cvd_distinctness``.
+        min_cvd_distinctness : float, optional
+            Threshold used by ``cvd_safe``. Default is 0.5.
+        min_uniformity : float, optional
+            Minimum perceptual uniformity score.
+        hue_span : tuple(float, float), optional
+            Allowed (min, max) hue span in degrees.
+
+        Returns
+        -------
+        list[str]
+            Matching colormap names, most uniform first.
+
+        Raises
+        ------
+        ValueError
+            If ``starts`` is not 'dark' or 'light'.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if category is not None:
+            mask &= self.category == category
+        if monotonic is not None:
+            mask &= self.monotonic == monotonic
+        if monotonic_halves is not None:
+            mask &= self.monotonic_halves == monotonic_halves
+        if starts is not None:
+            if starts not in ("dark", "light"):
+                raise ValueError(
+                    f"starts must be 'dark' or 'light', got {starts!r}"
+                )
+            mask &= (self.lightness[:, 0] < 0.5) == (starts == "dark")
+        if cvd_safe is not None:
+            mask &= (self.cvd_distinctness >= min_cvd_distinctness) == cvd_safe
+        if min_uniformity is not None:
+            mask &= self.uniformity >= min_uniformity
+        if hue_span is not None:
+            mask &= (self.hue_span >= hue_span[0]) & (
+                self.hue_span <= hue_span[1]
+            )
+
+        idx = np.flatnonzero(mask)
+        idx = idx[np.argsort(-self.uniformity[idx], kind="stable")]
+        return self.names[idx].tolist()
+
+    def features(self, name: str) -> dict[str, object]:
+        """
+        Return the stored features of one colormap.
+
+        Parameters
+        ----------
+        name : str
+            Colormap name.
+
+        Returns
+        -------
+        dict
+            Mapping of feature column to value.
+
+        Raises
+        ------
+        KeyError
+            If the colormap is not in the index.
+        """
+        matches = np.flatnonzero(self.names == name)
+        if len(matches) == 0:
+            raise KeyError(f"Colormap not in index: {name}")
+        return {
+            column: getattr(self, column)[matches[0]]
+            for column in self._COLUMNS
+        }
+
+    def save(self, path: str | Path) -> None:
+        """
+        Save the index to a compressed ``.npz`` file.
+
+        Parameters
+        ----------
+        path : str or Path
+            Destination file.
+        """
+        np.savez_compressed(
+            path, **{column: getattr(self, column) for column in self._COLUMNS}
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ColormapIndex":
+        """
+        Load an index saved with :meth:`save`.
+
+        Parameters
+        ----------
+        path : str or Path
+            Path to the ``.npz`` file.
+
+        Returns
+        -------
+        ColormapIndex
+            Loaded index.
+        """
+        with np.load(path) as data:
+            return cls(**{column: data[column] for column in cls._COLUMNS})
+
+
+_INDEX: ColormapIndex | None = None
+
+
+def colormap_index(rebuild: bool = False) -> ColormapIndex:
+    """
+    Return the feature index of all registered ``dm.*`` colormaps.
+
+    The index is built on first use and reused for the rest of the
+    process.
+
+    Parameters
+    ----------
+    rebuild : bool, optional
+        If True, recompute the index, e.g. after registering new
+        colormaps. Default is False.
+
+    Returns
+    -------
+    ColormapIndex
+        Shared colormap feature index.
+    """
+    global _INDEX
+    if _INDEX is None or rebuild:
+        _INDEX = ColormapIndex.build()
+    return _INDEX
+
+
+def analyze_uniformity(
+    cmaps: "list[Colormap] | list[str] | None" = None,
+    n_samples: int = _N_SAMPLES,
+) -> dict[str, dict[str, float]]:
+    """
+    Measure the perceptual non-uniformity of colormaps.
+
+    ΔE_OK between consecutive samples is computed for all colormaps in one
+    vectorized pass over an (n_cmaps, n_samples, 3) OKLab array.
+
+    Parameters
+    ----------
+    cmaps : list of matplotlib.colors.Colormap or str, optional
+        Colormaps to analyze. If None, every registered colormap except
+        reversed (``*_r``) duplicates is analyzed.
+    n_samples : int, optional
+        Number of samples per colormap. Default is 256.
+
+    Returns
+    -------
+    dict[str, dict[str, float]]
+        Mapping of colormap name to its statistics, least uniform first:
+
+        - ``'mean_step'``: mean ΔE_OK between consecutive samples.
+        - ``'max_step_ratio'``: largest step divided by the mean step.
+        - ``'cv'``: coefficient of variation of the steps.
+        - ``'lightness_cv'``: coefficient of variation of the absolute
+          lightness steps.
+        - ``'uniformity'``: score ``1 / (1 + cv)``, 1 being uniform.
+
+    Examples
+    --------
+    >>> import dartwork_mpl as dm
+    >>> report = dm.analyze_uniformity(["jet", "viridis"])
+    >>> list(report)
+    ['jet', 'viridis']
+    """
+    if cmaps is None:
+        cmaps = [name for name in mpl.colormaps if not name.endswith("_r")]
+    cmaps = [mpl.colormaps[c] if isinstance(c, str) else c for c in cmaps]
+    if not cmaps:
+        return {}
+
+    lab = _srgb_to_oklab_array(_sample_colormaps(cmaps, n_samples))
+    steps = _delta_e(lab)
+    mean = steps.mean(axis=-1)
+    cv = np.divide(
+        steps.std(axis=-1), mean, out=np.zeros_like(mean), where=mean > 0
+    )
+    max_ratio = np.divide(
+        steps.max(axis=-1), mean, out=np.ones_like(mean), where=mean > 0
+    )
+    l_steps = np.abs(np.diff(lab[..., 0], axis=-1))
+    l_mean = l_steps.mean(axis=-1)
+    l_cv = np.divide(
+        l_steps.std(axis=-1),
+        l_mean,
+        out=np.zeros_like(l_mean),
+        where=l_mean > 0,
+    )
+
+    report = {}
+    for i in np.argsort(-cv, kind="stable"):
+        report[cmaps[i].name] = {
+            "mean_step": float(mean[i]),
+            "max_step_ratio": float(max_ratio[i]),
+            "cv": float(cv[i]),
+            "lightness_cv": float(l_cv[i]),
+            "uniformity": float(1.0 / (1.0 + cv[i])),
+        }
+    return report
+
+
+# Corrected colormaps by registered name, with the hash of the source LUT
+# they were computed from, so a re-registered source is corrected again.
+_UNIFORM_CACHE: dict[str, tuple[str, mcolors.ListedColormap]] = {}
+
+# Number of samples used to measure arc length before resampling.
+_ARC_SAMPLES = 4096
+
+
+def uniform_cmap(
+    cmap: "Colormap | str", n: int = 256, register: bool = True
+) -> mcolors.ListedColormap:
+    """
+    Resample a colormap to equal perceptual steps.
+
+    The colormap is sampled densely, its cumulative ΔE_OK arc length in
+    OKLab is computed, and new colors are placed at equal arc-length
+    intervals. Lightness, chroma and hue are kept along the original path;
+    only the speed at which the path is traversed changes.
+
+    Parameters
+    ----------
+    cmap : matplotlib.colors.Colormap or str
+        Colormap (or registered colormap name) to correct.
+    n : int, optional
+        Number of colors in the corrected colormap. Default is 256.
+    register : bool, optional
+        If True, register the result and its reversed version with
+        matplotlib as ``dm.{name}_uniform`` and ``dm.{name}_uniform_r``.
+        Default is True.
+
+    Returns
+    -------
+    matplotlib.colors.ListedColormap
+        Corrected colormap named ``dm.{name}_uniform``, where ``name`` is
+        the original name without a ``dm.`` prefix. Results are cached,
+        so repeated calls return the same object.
+
+    Examples
+    --------
+    >>> import dartwork_mpl as dm
+    >>> cmap = dm.uniform_cmap("jet")
+    >>> cmap.name
+    'dm.jet_uniform'
+    """
+    if isinstance(cmap, str):
+        cmap = mpl.colormaps[cmap]
+    stem = cmap.name.removeprefix("dm.")
+    name = f"dm.{stem}_uniform"
+
+    rgb = _sample_colormaps([cmap], _ARC_SAMPLES)[0]
+    key = _lut_hash(rgb)
+    cached = _UNIFORM_CACHE.get(name)
+    if cached is None or cached[0] != key or cached[1].N != n:
+        lab = _srgb_to_oklab_array(rgb)
+        arc = np.concatenate([[0.0], np.cumsum(_delta_e(lab))])
+
+        if arc[-1] > 0:
+            # Positions along the original parameter that split the path into
+            # equal perceptual lengths.
+            targets = np.linspace(0, arc[-1], n)
+            new_lab = np.stack(
+                [np.interp(targets, arc, lab[:, k]) for k in range(3)], axis=-1
+            )
+            colors = _oklab_to_srgb_array(new_lab)
+        else:
+            colors = _sample_colormaps([cmap], n)[0]
+
+        cached = (key, mcolors.ListedColormap(colors, name=name))
+        _UNIFORM_CACHE[name] = cached
+    corrected = cached[1]
+
+    # The cached map may come from a call with register=False.
+    if register and mpl.colormaps.get(name) != corrected:
+        mpl.colormaps.register(cmap=corrected, force=True)
+        mpl.colormaps.register(
+            cmap=mcolors.ListedColormap(
+                corrected.colors[::-1], name=f"{name}_r"
+            ),
+            force=True,
+        )
+    return corrected
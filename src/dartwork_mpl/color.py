@@ -325,6 +325,53 @@ def _oklch_to_oklab(L: float, C: float, h: float) -> tuple[float, float, float]:
     return (L, a, b)
 
 
+def _srgb_to_oklab_array(rgb: np.ndarray) -> np.ndarray:
+    """
+    Convert an array of sRGB colors to OKLab.
+
+    Parameters
+    ----------
+    rgb : array
+        sRGB values in range [0, 1] with shape (..., 3).
+
+    Returns
+    -------
+    numpy.ndarray
+        OKLab coordinates with shape (..., 3).
+    """
+    linear: np.ndarray = _srgb_to_linear(np.asarray(rgb, dtype=float))
+    return np.stack(
+        _linear_srgb_to_oklab(linear[..., 0], linear[..., 1], linear[..., 2]),
+        axis=-1,
+    )
+
+
+def _oklab_to_srgb_array(lab: np.ndarray) -> np.ndarray:
+    """
+    Convert an array of OKLab colors to sRGB.
+
+    Out-of-gamut colors are clipped to [0, 1] in linear RGB.
+
+    Parameters
+    ----------
+    lab : array
+        OKLab coordinates with shape (..., 3).
+
+    Returns
+    -------
+    numpy.ndarray
+        sRGB values in range [0, 1] with shape (..., 3).
+    """
+    lab_arr: np.ndarray = np.asarray(lab, dtype=float)
+    linear: np.ndarray = np.stack(
+        _oklab_to_linear_srgb(
+            lab_arr[..., 0], lab_arr[..., 1], lab_arr[..., 2]
+        ),
+        axis=-1,
+    )
+    return _linear_to_srgb(np.clip(linear, 0.0, 1.0))
+
+
 def _parse_hex(hex_str: str) -> tuple[float, float, float]:
     """
     Parse hex color string to RGB tuple.
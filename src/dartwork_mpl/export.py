@@ -0,0 +1,474 @@
+"""Figure export to several formats at once.
+
+Saving one figure as SVG, PNG, PDF and EPS with a ``savefig`` loop repeats
+the same preparation for every file: with ``bbox_inches="tight"`` each call
+draws the whole figure once just to measure it, and every backend lays out
+the same texts again. This module measures the figure once, shares text
+layout through a ``TextExtentCache`` and writes the vector formats, whose
+backends dominate the cost on heavy figures, concurrently in worker
+processes. The same engine renders into memory for callers that serve
+images without touching the filesystem.
+"""
+
+import logging
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import BinaryIO
+
+import matplotlib as mpl
+from matplotlib.artist import Artist
+from matplotlib.collections import Collection, QuadMesh
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
+from matplotlib.transforms import Bbox
+
+from .layout import TextExtentCache
+
+_logger = logging.getLogger(__name__)
+
+# Formats written by vector backends. Their cost grows with the number of
+# path vertices, unlike raster formats, so they benefit from workers.
+_VECTOR_FORMATS = frozenset({"svg", "svgz", "pdf", "eps", "ps"})
+
+# Drawn vertices above which vector formats are written in parallel when
+# max_workers is not given. Smaller figures save faster than a worker pool
+# starts.
+_PARALLEL_MIN_VERTICES = 100_000
+
+
+def _artist_vertices(artist: Artist) -> int:
+    """Return the approximate number of vertices an artist draws."""
+    if isinstance(artist, Line2D):
+        n = len(artist.get_xydata())
+        count = n if artist.get_linestyle() not in ("None", "") else 0
+        # Every point repeats the marker path (empty without markers).
+        count += n * len(artist._marker.get_path().vertices)
+        return count
+    if isinstance(artist, QuadMesh):
+        return artist.get_coordinates()[..., 0].size
+    if isinstance(artist, Collection):
+        lengths = [len(path.vertices) for path in artist.get_paths()]
+        if not lengths:
+            return 0
+        n_offsets = len(artist.get_offsets())
+        if n_offsets > len(lengths):
+            # Markers: the paths are repeated at every offset.
+            return n_offsets * sum(lengths) // len(lengths)
+        return sum(lengths)
+    if isinstance(artist, Patch):
+        return len(artist.get_path().vertices)
+    return 0
+
+
+def _figure_vertices(fig: Figure) -> int:
+    """Return the approximate number of vertices drawn by a figure."""
+    return sum(
+        _artist_vertices(artist)
+        for artist in fig.findobj(lambda a: a.get_visible())
+    )
+
+
+def _heavy_artists(fig: Figure, threshold: int) -> list[tuple[Artist, int]]:
+    """
+    Return the visible data artists that draw more than ``threshold``
+    vertices, with their counts.
+
+    Lines, collections and patches are candidates; texts, axes, images and
+    artists that are already rasterized are left alone.
+    """
+    heavy = []
+    for artist in fig.findobj(
+        lambda a: isinstance(a, Line2D | Collection | Patch)
+    ):
+        if not artist.get_visible() or artist.get_rasterized():
+            continue
+        vertices = _artist_vertices(artist)
+        if vertices > threshold:
+            heavy.append((artist, vertices))
+    return heavy
+
+
+def _format_size(size: int) -> str:
+    """Return a byte count in kB or MB."""
+    return f"{size / 1e6:.2f} MB" if size >= 1e6 else f"{size / 1e3:.1f} kB"
+
+
+class RasterizeReport:
+    """
+    Artists rasterized by an export and the effect on file sizes.
+
+    Attributes
+    ----------
+    artists : list of tuple
+        ``(artist, vertices)`` for every rasterized artist.
+    sizes : dict[str, int]
+        Size in bytes of each written vector format.
+    baseline : dict[str, int]
+        Size in bytes each vector format would have without rasterization.
+        Only measured when requested, since it renders the heavy artists
+        as vectors once more.
+    """
+
+    def __init__(self, artists: list[tuple[Artist, int]]) -> None:
+        self.artists: list[tuple[Artist, int]] = artists
+        self.sizes: dict[str, int] = {}
+        self.baseline: dict[str, int] = {}
+
+    def summary(self) -> str:
+        """Return a short human-readable summary."""
+        lines = [f"rasterized {len(self.artists)} artist(s)"]
+        for artist, vertices in self.artists:
+            label = artist.get_label()
+            name = type(artist).__name__
+            if label and not label.startswith("_"):
+                name = f"{name} {label!r}"
+            lines.append(f"  {name}: {vertices:,} vertices")
+        for fmt, size in self.sizes.items():
+            line = f"  {fmt}: {_format_size(size)}"
+            if fmt in self.baseline:
+                before = self.baseline[fmt]
+                line = (
+                    f"  {fmt}: {_format_size(before)} -> {_format_size(size)}"
+                    f" ({(size - before) / before:+.0%})"
+                )
+            lines.append(line)
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return (
+            f"RasterizeReport(artists={len(self.artists)}, "
+            f"sizes={self.sizes}, baseline={self.baseline})"
+        )
+
+
+class _ByteCounter:
+    """Writable sink that only counts the bytes written to it."""
+
+    def __init__(self) -> None:
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        n = memoryview(data).nbytes
+        self.size += n
+        return n
+
+    def tell(self) -> int:
+        return self.size
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        # Only present so that matplotlib accepts the object as a file.
+        return self.size
+
+    def flush(self) -> None:
+        pass
+
+
+def _resolve_bbox(
+    fig: Figure,
+    bbox_inches: str | Bbox | None,
+    pad_inches: float | str | None,
+    bbox_extra_artists: list | None,
+) -> Bbox | None:
+    """
+    Turn ``bbox_inches="tight"`` into an explicit bounding box.
+
+    The figure is drawn once without rendering, as ``savefig`` does, and
+    the tight box is padded like ``savefig``. Every format then reuses the
+    box instead of measuring the figure again, so vector files get the
+    extent measured by Agg rather than by their own backend (the two differ
+    by a fraction of a point, mostly around math text).
+    """
+    if bbox_inches != "tight":
+        return bbox_inches
+
+    fig.draw_without_rendering()
+    bbox = fig.get_tightbbox(
+        fig._get_renderer(), bbox_extra_artists=bbox_extra_artists
+    )
+    if pad_inches in (None, "layout"):
+        pad_inches = mpl.rcParams["savefig.pad_inches"]
+    return bbox.padded(pad_inches)
+
+
+def _init_worker() -> None:
+    """Select the non-interactive backend in a worker process."""
+    mpl.use("agg")
+
+
+def _rc_snapshot() -> dict:
+    """Return the current rcParams, without the backend, for a worker."""
+    rc = mpl.rcParams.copy()
+    return {key: rc[key] for key in rc if key != "backend"}
+
+
+def _save_copy(
+    payload: bytes, rc: dict, path: str | None, kwargs: dict
+) -> bytes | None:
+    """
+    Unpickle a figure and save it, in a worker process.
+
+    The figure is loaded and saved under the rcParams ``rc`` of the calling
+    process, since savefig reads some of them (e.g. ``svg.fonttype``). With
+    ``path=None`` the file is rendered in memory and its bytes are returned
+    to the calling process.
+    """
+    with mpl.rc_context(rc):
+        fig = pickle.loads(payload)
+        if path is not None:
+            fig.savefig(path, **kwargs)
+            return None
+        buffer = BytesIO()
+        fig.savefig(buffer, **kwargs)
+        return buffer.getvalue()
+
+
+class _RGBABuffer:
+    """
+    Writable target that keeps the Agg pixels with their shape.
+
+    ``savefig(format="rgba")`` hands the renderer's ``buffer_rgba()``
+    memoryview to ``write``. The canvas reuses that renderer for its next
+    draw, so the pixels are copied once into memory owned by the result
+    and kept shaped (height, width, 4), instead of re-encoded.
+    """
+
+    def __init__(self) -> None:
+        self.view: memoryview | None = None
+
+    def write(self, data: memoryview | bytes) -> int:
+        view = memoryview(data)
+        self.view = memoryview(bytearray(view)).cast("B", view.shape)
+        return self.view.nbytes
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        # Only present so that matplotlib accepts the object as a file.
+        return 0
+
+    def getvalue(self) -> memoryview | None:
+        return self.view
+
+
+def _write_formats(
+    fig: Figure,
+    targets: dict[str, str | os.PathLike | BinaryIO],
+    bbox_inches: str | Bbox | None = None,
+    max_workers: int | None = None,
+    vector_kwargs: dict | None = None,
+    **kwargs,
+) -> None:
+    """
+    Write a figure once per format.
+
+    Parameters
+    ----------
+    fig : matplotlib.figure.Figure
+        Figure to save.
+    targets : dict[str, str or file-like]
+        Destination path or binary file object of each format, keyed by
+        format name.
+    bbox_inches : str or Bbox, optional
+        Forwarded to ``savefig``. ``"tight"`` is measured only once.
+    max_workers : int, optional
+        Number of worker processes for vector formats. ``0`` or ``1``
+        writes every format in this process. Default uses up to one
+        worker per vector format when the figure draws more than
+        ``_PARALLEL_MIN_VERTICES`` vertices, several CPUs are available
+        and processes start by fork. Other start methods re-import the
+        caller's ``__main__``, which needs an ``if __name__ ==
+        "__main__":`` guard, so they are only used when asked for.
+    vector_kwargs : dict, optional
+        Arguments passed to savefig for vector formats only, overriding
+        ``kwargs`` (e.g. the dpi of rasterized artists).
+    **kwargs
+        Additional arguments passed to savefig.
+    """
+    kwargs["bbox_inches"] = _resolve_bbox(
+        fig,
+        bbox_inches,
+        kwargs.pop("pad_inches", None),
+        kwargs.pop("bbox_extra_artists", None),
+    )
+
+    options = {
+        fmt: {**kwargs, **vector_kwargs}
+        if vector_kwargs and fmt in _VECTOR_FORMATS
+        else kwargs
+        for fmt in targets
+    }
+    vector = [fmt for fmt in targets if fmt in _VECTOR_FORMATS]
+    # The platform's default start method, as for any ProcessPoolExecutor.
+    context = multiprocessing.get_context()
+    if max_workers is None:
+        heavy = (
+            len(vector) > 1
+            and context.get_start_method() == "fork"
+            and _figure_vertices(fig) > _PARALLEL_MIN_VERTICES
+        )
+        max_workers = min(len(vector), os.cpu_count() or 1) if heavy else 0
+
+    payload = None
+    if max_workers > 1 and len(vector) > 1:
+        try:
+            payload = pickle.dumps(fig)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # Figures holding unpicklable state (lambdas in formatters,
+            # open files) are written sequentially.
+            payload = None
+
+    if payload is None:
+        with TextExtentCache():
+            for fmt, target in targets.items():
+                fig.savefig(target, format=fmt, **options[fmt])
+        return
+
+    rc = _rc_snapshot()
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers, len(vector)),
+        mp_context=context,
+        initializer=_init_worker,
+    ) as pool:
+        # File objects cannot cross processes; workers return their bytes.
+        futures = {
+            fmt: pool.submit(
+                _save_copy,
+                payload,
+                rc,
+                targets[fmt]
+                if isinstance(targets[fmt], (str, os.PathLike))
+                else None,
+                {**options[fmt], "format": fmt},
+            )
+            for fmt in vector
+        }
+        # Raster formats are written here while the workers run.
+        with TextExtentCache():
+            for fmt, target in targets.items():
+                if fmt not in _VECTOR_FORMATS:
+                    fig.savefig(target, format=fmt, **options[fmt])
+        for fmt, future in futures.items():
+            data = future.result()
+            if data is not None:
+                targets[fmt].write(data)
+
+
+def _write_rasterized(
+    fig: Figure,
+    targets: dict[str, str | os.PathLike | BinaryIO],
+    threshold: int,
+    raster_dpi: float | None = None,
+    compare_sizes: bool = False,
+    bbox_inches: str | Bbox | None = None,
+    **kwargs,
+) -> RasterizeReport:
+    """
+    Write a figure once per format with its heavy artists rasterized.
+
+    Artists drawing more than ``threshold`` vertices are rasterized for
+    the duration of the export and restored afterwards. Arguments are as
+    in ``_write_formats``.
+
+    Returns
+    -------
+    RasterizeReport
+        Rasterized artists and the size of every vector format, plus
+        their size without rasterization when ``compare_sizes`` is True.
+    """
+    report = RasterizeReport(_heavy_artists(fig, threshold))
+    vector = [fmt for fmt in targets if fmt in _VECTOR_FORMATS]
+
+    if compare_sizes and report.artists:
+        options = {k: v for k, v in kwargs.items() if k != "max_workers"}
+        for fmt in vector:
+            counter = _ByteCounter()
+            fig.savefig(counter, format=fmt, bbox_inches=bbox_inches, **options)
+            report.baseline[fmt] = counter.size
+
+    for artist, _ in report.artists:
+        artist.set_rasterized(True)
+    try:
+        _write_formats(
+            fig,
+            targets,
+            bbox_inches=bbox_inches,
+            vector_kwargs=None if raster_dpi is None else {"dpi": raster_dpi},
+            **kwargs,
+        )
+    finally:
+        for artist, _ in report.artists:
+            artist.set_rasterized(False)
+
+    for fmt in vector:
+        target = targets[fmt]
+        if isinstance(target, (str, os.PathLike)):
+            report.sizes[fmt] = os.path.getsize(target)
+        else:
+            report.sizes[fmt] = target.tell()
+    if compare_sizes and not report.artists:
+        report.baseline = dict(report.sizes)
+
+    _logger.debug("%s", report.summary())
+    return report
+
+
+def export_bytes(
+    fig: Figure,
+    formats: tuple[str, ...] = ("svg", "png"),
+    bbox_inches: str | Bbox | None = None,
+    max_workers: int | None = None,
+    **kwargs,
+) -> dict[str, bytes | memoryview]:
+    """
+    Render a figure to in-memory files, one per format.
+
+    Nothing touches the filesystem, so the result can be returned directly
+    by a web service. The figure is prepared once for all formats, as in
+    ``save_formats``, and heavy figures write their vector formats in
+    worker processes.
+
+    Parameters
+    ----------
+    fig : matplotlib.figure.Figure
+        Figure to render.
+    formats : tuple of str, optional
+        Formats to render, e.g. 'svg', 'png', 'pdf'. The format 'rgba'
+        returns the raw Agg pixel buffer instead of an encoded file.
+        Default is ('svg', 'png').
+    bbox_inches : str or Bbox, optional
+        Bounding box in inches, as in ``savefig``.
+    max_workers : int, optional
+        Number of worker processes for vector formats, as in
+        ``save_formats``.
+    **kwargs
+        Additional arguments passed to savefig.
+
+    Returns
+    -------
+    dict[str, bytes or memoryview]
+        Encoded file contents keyed by format. The 'rgba' entry is a
+        memoryview of shape (height, width, 4) over a copy of the rendered
+        pixels, so later draws of the figure leave it unchanged. It can be
+        wrapped by ``numpy.asarray`` or handed to an encoder without
+        another copy.
+
+    Examples
+    --------
+    >>> import dartwork_mpl as dm
+    >>> files = dm.export_bytes(fig, formats=("svg", "rgba"), dpi=200)
+    >>> files["svg"][:5]
+    b'<?xml'
+    >>> np.asarray(files["rgba"]).shape
+    (960, 1280, 4)
+    """
+    targets = {
+        fmt: _RGBABuffer() if fmt in ("rgba", "raw") else BytesIO()
+        for fmt in formats
+    }
+    _write_formats(
+        fig, targets, bbox_inches=bbox_inches, max_workers=max_workers, **kwargs
+    )
+    # getvalue() hands over the BytesIO storage without copying it.
+    return {fmt: target.getvalue() for fmt, target in targets.items()}
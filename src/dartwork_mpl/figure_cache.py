@@ -0,0 +1,435 @@
+"""Content-addressed cache of exported figures.
+
+Batch jobs often regenerate figures whose data and styling have not
+changed. ``FigureCache`` keys each export by a hash of everything that
+determines the output files: the plotting function's source, its
+arguments (arrays hashed by their buffer), the rcParams in effect (which
+cover style presets), the export options and the package versions. On a
+hit the plotting function is not called at all and the cached files are
+copied or linked to their destination. Entries live in a directory on
+disk and are evicted least recently used first once the cache exceeds its
+size limit.
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import shutil
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+
+import matplotlib as mpl
+import matplotlib.colors as mcolors
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.scale import FuncScale
+
+from . import __version__
+from .util import save_formats
+
+# rcParams that select the interactive environment rather than the output.
+_IGNORED_RCPARAMS = frozenset({"backend", "backend_fallback", "interactive"})
+
+# Parameters of the Normalize subclasses and of the scales behind them
+# (LogNorm, SymLogNorm, AsinhNorm) that change the mapping.
+_NORM_PARAMETERS = (
+    "vmin",
+    "vmax",
+    "clip",
+    "vcenter",
+    "halfrange",
+    "gamma",
+    "boundaries",
+    "ncolors",
+    "extend",
+    "base",
+    "linthresh",
+    "linscale",
+    "linear_width",
+)
+
+
+def _default_directory() -> Path:
+    """Return the cache directory from the environment or the user cache."""
+    if "DARTWORK_MPL_CACHE_DIR" in os.environ:
+        return Path(os.environ["DARTWORK_MPL_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "dartwork_mpl" / "figures"
+
+
+def _update(h: "hashlib.blake2b", value: object) -> None:
+    """
+    Feed a value into a hash.
+
+    Every value is prefixed by its type tag, and containers by their
+    length, so different structures never produce the same byte stream.
+    """
+    if value is None or isinstance(value, bool | int | float | complex):
+        h.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, str):
+        data = value.encode()
+        h.update(b"str:%d;" % len(data))
+        h.update(data)
+    elif isinstance(value, bytes | bytearray | memoryview):
+        data = memoryview(value).cast("B")
+        h.update(b"bytes:%d;" % data.nbytes)
+        h.update(data)
+    elif isinstance(value, Path):
+        _update(h, str(value))
+    elif isinstance(value, np.ndarray | np.generic):
+        array = np.asarray(value)
+        if array.dtype.hasobject:
+            h.update(b"object-array:" + repr(array.shape).encode())
+            _update(h, array.ravel().tolist())
+            return
+        h.update(f"array:{array.dtype.str}:{array.shape};".encode())
+        # Hash the buffer itself; only non-contiguous views are copied.
+        h.update(np.ascontiguousarray(array).data.cast("B"))
+    elif isinstance(value, list | tuple):
+        h.update(f"{type(value).__name__}:{len(value)};".encode())
+        for item in value:
+            _update(h, item)
+    elif isinstance(value, dict):
+        h.update(b"dict:%d;" % len(value))
+        for key in sorted(value, key=repr):
+            _update(h, key)
+            _update(h, value[key])
+    elif isinstance(value, set | frozenset):
+        _update(h, sorted(value, key=repr))
+    elif hasattr(value, "to_numpy"):
+        # pandas objects: values plus their index and column labels.
+        h.update(f"{type(value).__name__};".encode())
+        _update(h, value.to_numpy())
+        for name in ("index", "columns"):
+            if hasattr(value, name):
+                _update(h, getattr(value, name).to_numpy())
+    elif inspect.isfunction(value) or inspect.isbuiltin(value):
+        _update(h, _function_source(value))
+    elif isinstance(value, np.ufunc):
+        _update(h, f"ufunc:{value.__name__}")
+    elif isinstance(value, functools.partial):
+        _update(h, ["partial", value.func, value.args, value.keywords])
+    elif isinstance(value, mcolors.Colormap):
+        _update(h, _colormap_state(value))
+    elif isinstance(value, mcolors.Normalize):
+        _update(h, _norm_state(value))
+    else:
+        raise TypeError(
+            f"Cannot hash argument of type {type(value).__name__}; pass "
+            "arrays, numbers, strings, functions, colormaps, norms or "
+            "containers of them"
+        )
+
+
+def _function_source(func: Callable) -> str:
+    """Return an identifier of a function that changes with its code."""
+    name = f"{func.__module__}.{func.__qualname__}"
+    try:
+        return f"{name}\n{inspect.getsource(func)}"
+    except (OSError, TypeError):
+        code = getattr(func, "__code__", None)
+        return name if code is None else f"{name}\n{code.co_code.hex()}"
+
+
+def _colormap_state(cmap: mcolors.Colormap) -> list:
+    """Return the class and colors of a colormap, including its extremes."""
+    return [
+        f"{type(cmap).__module__}.{type(cmap).__qualname__}",
+        cmap(np.arange(cmap.N)),
+        cmap.get_under(),
+        cmap.get_over(),
+        cmap.get_bad(),
+    ]
+
+
+def _norm_state(norm: mcolors.Normalize) -> list:
+    """
+    Return the class, limits and parameters of a norm.
+
+    Norms built on a ``FuncScale`` (``FuncNorm``) hold arbitrary callables
+    and raise TypeError.
+    """
+    scale = getattr(norm, "_scale", None)
+    if isinstance(scale, FuncScale):
+        raise TypeError("Cannot hash argument of type FuncNorm")
+    state: list = [f"{type(norm).__module__}.{type(norm).__qualname__}"]
+    for owner in (norm, scale):
+        for name in _NORM_PARAMETERS:
+            if owner is not None and hasattr(owner, name):
+                state.append((name, getattr(owner, name)))
+    return state
+
+
+def _rcparams_snapshot() -> list[tuple[str, str]]:
+    """Return the current rcParams as sorted (key, repr) pairs."""
+    return [
+        (key, repr(mpl.rcParams[key]))
+        for key in sorted(mpl.rcParams)
+        if key not in _IGNORED_RCPARAMS
+    ]
+
+
+def _entry_size(path: Path) -> int:
+    """Return the total size of the files in a cache entry."""
+    return sum(f.stat().st_size for f in path.iterdir() if f.is_file())
+
+
+class FigureCache:
+    """
+    On-disk cache of exported figures keyed by their inputs.
+
+    ``save_formats`` hashes the plotting function, its arguments, the
+    current rcParams and the export options. When an entry with that key
+    exists, its files are copied (or hard-linked) to the destination and
+    the plotting function is skipped. Otherwise the function is called,
+    its figure is exported into a new entry, and the figure is closed.
+
+    Only what is passed in is hashed: data read from files or globals
+    inside the plotting function is invisible to the key, so pass it as an
+    argument.
+
+    Parameters
+    ----------
+    directory : str or Path, optional
+        Cache location. Defaults to ``$DARTWORK_MPL_CACHE_DIR`` or
+        ``~/.cache/dartwork_mpl/figures``.
+    max_bytes : int, optional
+        Size limit of all entries; the least recently used entries are
+        evicted beyond it. Default is 1 GiB.
+    link : bool, optional
+        If True, hard-link cached files to their destination instead of
+        copying them (falling back to a copy across file systems). Links
+        are faster but share storage with the cache, so an output file
+        modified in place alters the cache entry too. Default is False.
+
+    Examples
+    --------
+    >>> import dartwork_mpl as dm
+    >>> cache = dm.FigureCache("build/.figcache")
+    >>> def plot(x, y, title):
+    ...     fig, ax = plt.subplots()
+    ...     ax.plot(x, y)
+    ...     ax.set_title(title)
+    ...     return fig
+    >>> cache.save_formats(plot, "out/trend", plot_args=(x, y, "Trend"))
+    False
+    >>> cache.save_formats(plot, "out/trend", plot_args=(x, y, "Trend"))
+    True
+    >>> cache.stats()["hit_rate"]
+    0.5
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_bytes: int = 2**30,
+        link: bool = False,
+    ) -> None:
+        self.directory: Path = (
+            _default_directory() if directory is None else Path(directory)
+        )
+        self.max_bytes: int = max_bytes
+        self.link: bool = link
+        self.hits: int = 0
+        self.misses: int = 0
+        # Entry sizes and last use, loaded from disk on first access.
+        self._index: dict[str, tuple[int, float]] | None = None
+
+    def _entries(self) -> dict[str, tuple[int, float]]:
+        """Return the entry index, scanning the directory once."""
+        if self._index is None:
+            self._index = {}
+            if self.directory.is_dir():
+                for path in self.directory.iterdir():
+                    if path.is_dir() and not path.name.startswith("tmp-"):
+                        self._index[path.name] = (
+                            _entry_size(path),
+                            path.stat().st_mtime,
+                        )
+        return self._index
+
+    def key(
+        self,
+        plot: Callable[..., Figure],
+        plot_args: tuple = (),
+        plot_kwargs: dict | None = None,
+        formats: tuple[str, ...] = ("svg", "png", "pdf", "eps"),
+        **kwargs,
+    ) -> str:
+        """
+        Return the cache key of an export.
+
+        Parameters
+        ----------
+        plot : callable
+            Plotting function returning a figure.
+        plot_args, plot_kwargs : tuple and dict, optional
+            Arguments the function is called with.
+        formats : tuple of str, optional
+            Exported formats.
+        **kwargs
+            Export options, as passed to ``save_formats``.
+
+        Returns
+        -------
+        str
+            Hexadecimal digest.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        _update(
+            h,
+            [
+                __version__,
+                mpl.__version__,
+                np.__version__,
+                plot,
+                _rcparams_snapshot(),
+                list(formats),
+                kwargs,
+            ],
+        )
+        _update(h, tuple(plot_args))
+        _update(h, plot_kwargs or {})
+        return h.hexdigest()
+
+    def save_formats(
+        self,
+        plot: Callable[..., Figure],
+        image_stem: str | Path,
+        formats: tuple[str, ...] = ("svg", "png", "pdf", "eps"),
+        plot_args: tuple = (),
+        plot_kwargs: dict | None = None,
+        **kwargs,
+    ) -> bool:
+        """
+        Export the figure of a plotting function, reusing cached files.
+
+        Parameters
+        ----------
+        plot : callable
+            Function returning a figure, or a tuple starting with one (as
+            ``plt.subplots`` does). It is only called on a cache miss.
+        image_stem : str or Path
+            Base filename without extension; parent folders are created.
+        formats : tuple of str, optional
+            Formats to write.
+        plot_args, plot_kwargs : tuple and dict, optional
+            Arguments of ``plot``. They are part of the key, so they must
+            be arrays, numbers, strings, functions (hashed by their
+            source), colormaps and norms (hashed by their colors and
+            parameters) or containers of them. Other callables raise
+            TypeError.
+        **kwargs
+            Additional arguments passed to ``dm.save_formats`` (e.g.
+            ``bbox_inches``, ``dpi``).
+
+        Returns
+        -------
+        bool
+            True if the files came from the cache.
+        """
+        plot_kwargs = plot_kwargs or {}
+        options = {k: v for k, v in kwargs.items() if k != "max_workers"}
+        key = self.key(plot, plot_args, plot_kwargs, formats, **options)
+        entries = self._entries()
+        entry = self.directory / key
+        image_stem = Path(image_stem)
+        image_stem.parent.mkdir(parents=True, exist_ok=True)
+
+        if entry.is_dir():
+            self.hits += 1
+            now = time.time()
+            os.utime(entry, (now, now))
+            # The entry may come from another process sharing the cache.
+            size = entries[key][0] if key in entries else _entry_size(entry)
+            entries[key] = (size, now)
+            self._export(entry, image_stem, formats)
+            return True
+
+        self.misses += 1
+        fig = plot(*plot_args, **plot_kwargs)
+        if isinstance(fig, tuple):
+            fig = fig[0]
+
+        # Render into a private directory and publish it atomically, so
+        # concurrent jobs never see a partial entry.
+        tmp = self.directory / f"tmp-{uuid.uuid4().hex}"
+        tmp.mkdir(parents=True)
+        try:
+            save_formats(fig, str(tmp / "figure"), formats, **kwargs)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        finally:
+            plt.close(fig)
+        try:
+            tmp.rename(entry)
+        except OSError:
+            # Another process stored the same key first; use its entry.
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        entries[key] = (_entry_size(entry), time.time())
+        self._export(entry, image_stem, formats)
+        self._evict()
+        return False
+
+    def _export(
+        self, entry: Path, image_stem: Path, formats: tuple[str, ...]
+    ) -> None:
+        """Copy or link the files of an entry to their destination."""
+        for fmt in formats:
+            src = entry / f"figure.{fmt}"
+            dst = Path(f"{image_stem}.{fmt}")
+            if self.link:
+                dst.unlink(missing_ok=True)
+                try:
+                    os.link(src, dst)
+                    continue
+                except OSError:
+                    pass
+            shutil.copyfile(src, dst)
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until under max_bytes."""
+        entries = self._entries()
+        total = sum(size for size, _ in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k][1]):
+            if total <= self.max_bytes:
+                break
+            total -= entries.pop(key)[0]
+            shutil.rmtree(self.directory / key, ignore_errors=True)
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def clear(self) -> None:
+        """Remove all entries and reset the statistics."""
+        for key in list(self._entries()):
+            shutil.rmtree(self.directory / key, ignore_errors=True)
+        self._index = {}
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, float]:
+        """
+        Return cache statistics.
+
+        Returns
+        -------
+        dict[str, float]
+            ``hits``, ``misses``, ``size`` (number of entries), ``bytes``
+            (total size of the entries) and ``hit_rate`` (0 when the cache
+            has not been used).
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self),
+            "bytes": sum(size for size, _ in self._entries().values()),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
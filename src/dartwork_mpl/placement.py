@@ -0,0 +1,829 @@
+"""Automatic placement of annotation labels and legends.
+
+This module places many text labels next to their data points without
+overlaps, and legends in the emptiest part of an axes. Text extents are
+measured once in display units. Every label then chooses among a ring of
+candidate positions around its point, scored by their overlap with other
+labels, data points and the axes bounds. Overlapping pairs come from a
+uniform grid index, so each step costs O(n) instead of O(n^2) and no
+redraw is involved. Labels are returned as offsets in points, the unit
+of ``make_offset``, so they stay next to their points when the layout
+changes. Legends are placed from a coarse occupancy grid of the data and
+a summed-area table, so their cost does not grow with the number of
+points.
+"""
+
+import matplotlib as mpl
+import numpy as np
+from matplotlib import cbook
+from matplotlib.axes import Axes
+from matplotlib.backend_bases import RendererBase
+from matplotlib.collections import PathCollection, QuadMesh
+from matplotlib.font_manager import FontProperties, findfont, get_font
+from matplotlib.legend import Legend
+from matplotlib.path import Path
+from matplotlib.text import Annotation
+from matplotlib.transforms import Affine2D, Bbox
+
+# Default number of placement steps.
+_MAX_STEPS = 50
+
+# Candidate directions in order of preference: above, right, left, below,
+# then the diagonals.
+_DIRECTIONS = np.array(
+    [[0, 1], [1, 0], [-1, 0], [0, -1], [1, 1], [-1, 1], [1, -1], [-1, -1]],
+    dtype=float,
+)
+
+# Number of steps without a 1% drop in total overlap before giving up.
+_PATIENCE = 3
+
+# Default number of candidate rings around each point.
+_RINGS = 3
+
+# Cost of a legend outside the axes, as a fraction of its area covered
+# by data, so that a legend only leaves crowded axes.
+_OUTSIDE_COST = 0.05
+
+# Cost per unit distance of a legend from the nearest axes corner.
+_CORNER_PREFERENCE = 1e-6
+
+# Cost per candidate rank in square pixels, small enough that any
+# overlap outweighs the preference.
+_PREFERENCE = 1e-3
+
+
+def _text_extents(
+    labels: list[str], prop: FontProperties, renderer: RendererBase
+) -> np.ndarray:
+    """
+    Measure the width and height of labels in pixels.
+
+    Plain text is measured from the glyph advances of the font, looked
+    up once per character, so thousands of distinct labels cost a few
+    dictionary lookups each. Kerning is ignored, which the label padding
+    absorbs. Math text is measured with the renderer, once per distinct
+    string.
+
+    Parameters
+    ----------
+    labels : list[str]
+        Label strings; newlines start new lines.
+    prop : matplotlib.font_manager.FontProperties
+        Font of the labels.
+    renderer : matplotlib.backend_bases.RendererBase
+        Renderer used for measurement.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (n, 2) with (width, height) in pixels.
+    """
+    font = get_font(findfont(prop))
+    font.set_size(prop.get_size_in_points(), renderer.points_to_pixels(72))
+    # Line height of matplotlib text layout, from the "lp" reference.
+    _, line_height, _ = renderer.get_text_width_height_descent(
+        "lp", prop, False
+    )
+    line_step = line_height * 1.2
+
+    advances: dict[str, float] = {}
+    extents: dict[str, tuple[float, float]] = {}
+    out = np.empty((len(labels), 2))
+    for i, label in enumerate(labels):
+        extent = extents.get(label)
+        if extent is None:
+            lines = label.split("\n")
+            width = 0.0
+            tallest = line_height
+            for line in lines:
+                if cbook.is_math_text(line):
+                    w, h, _ = renderer.get_text_width_height_descent(
+                        line, prop, ismath=True
+                    )
+                    tallest = max(tallest, h)
+                else:
+                    w = 0.0
+                    for char in line:
+                        advance = advances.get(char)
+                        if advance is None:
+                            glyph = font.load_char(ord(char))
+                            advance = advances[char] = (
+                                glyph.linearHoriAdvance / 65536
+                            )
+                        w += advance
+                width = max(width, w)
+            height = tallest + line_step * (len(lines) - 1)
+            extent = extents[label] = (width, height)
+        out[i] = extent
+    return out
+
+
+def _grid_pairs(
+    centers_a: np.ndarray, centers_b: np.ndarray, cell: np.ndarray, same: bool
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return candidate pairs of boxes from a uniform grid index.
+
+    Boxes are binned by center into cells at least as large as the sum
+    of any two half sizes, so overlapping boxes always lie in the same
+    or adjacent cells. The second set is counting-sorted by cell, and
+    the neighboring cells of every box in the first set are looked up
+    in the resulting table, without Python loops over boxes.
+
+    Parameters
+    ----------
+    centers_a, centers_b : numpy.ndarray
+        Box centers of shape (n, 2) and (m, 2).
+    cell : numpy.ndarray
+        Cell (width, height).
+    same : bool
+        True when both arrays hold the same boxes; each pair is then
+        returned once with ``i < j``.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        Indices into ``centers_a`` and ``centers_b``.
+    """
+    empty = np.empty(0, dtype=np.intp)
+    if len(centers_a) == 0 or len(centers_b) == 0:
+        return empty, empty
+
+    # Cells are offset by one so that neighbors of edge cells exist.
+    origin = np.minimum(centers_a.min(axis=0), centers_b.min(axis=0))
+    cells_a = ((centers_a - origin) // cell).astype(np.intp) + 1
+    cells_b = ((centers_b - origin) // cell).astype(np.intp) + 1
+    shape = np.maximum(cells_a.max(axis=0), cells_b.max(axis=0)) + 2
+    keys_b = cells_b[:, 0] * shape[1] + cells_b[:, 1]
+
+    counts = np.bincount(keys_b, minlength=shape[0] * shape[1])
+    starts = np.cumsum(counts) - counts
+    order = np.argsort(keys_b, kind="stable")
+
+    pairs_i = []
+    pairs_j = []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            query = (cells_a[:, 0] + dx) * shape[1] + cells_a[:, 1] + dy
+            n_found = counts[query]
+            total = int(n_found.sum())
+            if total == 0:
+                continue
+            first = np.cumsum(n_found) - n_found
+            rank = np.arange(total) - np.repeat(first, n_found)
+            pairs_i.append(np.repeat(np.arange(len(centers_a)), n_found))
+            pairs_j.append(order[np.repeat(starts[query], n_found) + rank])
+
+    if not pairs_i:
+        return empty, empty
+    i = np.concatenate(pairs_i)
+    j = np.concatenate(pairs_j)
+    if same:
+        keep = i < j
+        i, j = i[keep], j[keep]
+    return i, j
+
+
+def _overlap_area(delta: np.ndarray, reach: np.ndarray) -> np.ndarray:
+    """
+    Return the overlap area of box pairs.
+
+    Parameters
+    ----------
+    delta : numpy.ndarray
+        Center differences of shape (k, 2).
+    reach : numpy.ndarray
+        Sums of half sizes of shape (k, 2).
+
+    Returns
+    -------
+    numpy.ndarray
+        Overlap areas of shape (k,), zero for disjoint pairs.
+    """
+    overlap = np.clip(reach - np.abs(delta), 0.0, None)
+    return overlap[:, 0] * overlap[:, 1]
+
+
+def _candidate_offsets(
+    half: np.ndarray, reach: float, gap: float, rings: int
+) -> np.ndarray:
+    """
+    Return candidate label center offsets around each point.
+
+    Candidates sit on ``rings`` rings in eight directions, each just
+    clear of the point and of the previous ring, in the order of
+    preference: above, right, left, below, then the diagonals, inner
+    rings first.
+
+    Parameters
+    ----------
+    half : numpy.ndarray
+        Label half sizes of shape (n, 2) in pixels.
+    reach : float
+        Half size of the square kept free around each point, in pixels.
+    gap : float
+        Gap between the point square and the label, in pixels.
+    rings : int
+        Number of rings.
+
+    Returns
+    -------
+    numpy.ndarray
+        Offsets of shape (n, 8 * rings, 2) in pixels.
+    """
+    offsets = []
+    for ring in range(rings):
+        # Each ring is one label height further out.
+        distance = half + reach + gap + ring * 2 * half[:, 1:]
+        for direction in _DIRECTIONS:
+            offsets.append(distance * direction)
+    return np.stack(offsets, axis=1)
+
+
+def _place(
+    ax: Axes,
+    x: np.ndarray,
+    y: np.ndarray,
+    labels: list[str],
+    fontsize: float | str | None,
+    gap: float,
+    padding: float,
+    point_size: float,
+    avoid: np.ndarray | None,
+    rings: int,
+    max_steps: int,
+    seed: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return label offsets in points and the chosen candidate indices."""
+    fig = ax.get_figure(root=True)
+    renderer = fig._get_renderer()
+    px_per_pt = fig.dpi / 72
+    prop = FontProperties(
+        size=mpl.rcParams["font.size"] if fontsize is None else fontsize
+    )
+
+    anchors = ax.transData.transform(
+        np.column_stack([np.asarray(x, float), np.asarray(y, float)])
+    )
+    n = len(anchors)
+    if len(labels) != n:
+        raise ValueError(
+            f"Expected {n} labels for {n} points, got {len(labels)}"
+        )
+    if n == 0:
+        return np.empty((0, 2)), np.empty(0, dtype=np.intp)
+
+    half = _text_extents(list(labels), prop, renderer) / 2
+    half += padding * px_per_pt / 2
+    reach = point_size * px_per_pt / 2
+    candidates = anchors[:, None, :] + _candidate_offsets(
+        half, reach, gap * px_per_pt, rings
+    )
+    k = candidates.shape[1]
+    flat = candidates.reshape(-1, 2)
+    owner = np.repeat(np.arange(n), k)
+
+    # Costs that do not depend on the other labels: covered points, the
+    # part outside the axes and a small preference for early candidates.
+    obstacles = anchors
+    if avoid is not None:
+        obstacles = np.vstack([anchors, ax.transData.transform(avoid)])
+    q, j = _grid_pairs(flat, obstacles, half.max(axis=0) + reach, same=False)
+    area = _overlap_area(flat[q] - obstacles[j], half[owner[q]] + reach)
+    static = np.bincount(q, area, minlength=n * k).reshape(n, k)
+
+    bounds = ax.bbox
+    lo = np.clip(candidates - half[:, None], [bounds.x0, bounds.y0], None)
+    hi = np.clip(candidates + half[:, None], None, [bounds.x1, bounds.y1])
+    inside = np.clip(hi - lo, 0.0, None).prod(axis=-1)
+    static += 4 * half.prod(axis=1)[:, None] - inside
+    static += np.arange(k) * _PREFERENCE
+
+    # Start from the best position ignoring the other labels.
+    rng = np.random.default_rng(seed)
+    choice = np.argmin(static, axis=1)
+    centers = candidates[np.arange(n), choice]
+    cell = 2 * half.max(axis=0)
+    lowest = np.inf
+    stalled = 0
+    for _ in range(max_steps):
+        # Only labels overlapping another label are worth moving.
+        i, j = _grid_pairs(centers, centers, cell, same=True)
+        area = _overlap_area(centers[i] - centers[j], half[i] + half[j])
+        hit = area > _PREFERENCE
+        active = np.unique(np.concatenate([i[hit], j[hit]]))
+        if active.size == 0:
+            break
+
+        # Layouts too dense to resolve stop once the overlap stagnates.
+        total = area[hit].sum()
+        stalled = stalled + 1 if total > 0.99 * lowest else 0
+        if stalled == _PATIENCE:
+            break
+        lowest = min(lowest, total)
+
+        flat = candidates[active].reshape(-1, 2)
+        owner = np.repeat(active, k)
+        q, j = _grid_pairs(flat, centers, cell, same=False)
+        keep = owner[q] != j
+        q, j = q[keep], j[keep]
+        area = _overlap_area(flat[q] - centers[j], half[owner[q]] + half[j])
+        cost = static[active] + np.bincount(
+            q, area, minlength=flat.shape[0]
+        ).reshape(-1, k)
+
+        rows = np.arange(active.size)
+        best = np.argmin(cost, axis=1)
+        better = cost[rows, best] < cost[rows, choice[active]] - _PREFERENCE
+        if not better.any():
+            break
+        # Moving only some labels keeps neighbors from swapping in step.
+        move = better & (rng.random(active.size) < 0.5)
+        if not move.any():
+            move = better
+        moved = active[move]
+        choice[moved] = best[move]
+        centers[moved] = candidates[moved, best[move]]
+
+    return (centers - anchors) / px_per_pt, choice
+
+
+def place_labels(
+    ax: Axes,
+    x: np.ndarray,
+    y: np.ndarray,
+    labels: list[str],
+    fontsize: float | str | None = None,
+    gap: float = 1.5,
+    padding: float = 1.0,
+    point_size: float = 3.0,
+    avoid: np.ndarray | None = None,
+    rings: int = _RINGS,
+    max_steps: int = _MAX_STEPS,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Compute non-overlapping label offsets for data points.
+
+    Every label picks one of ``8 * rings`` candidate positions around
+    its point. Each step scores the candidates of all labels by their
+    overlap with the current positions of the other labels, with the
+    data points and with the outside of the axes, and moves a random
+    half of the labels that can improve to their best candidate. Among
+    equally free positions, labels prefer the inner ring and the
+    position above the point. Everything happens in display units on
+    arrays; nothing is drawn.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        Axes holding the points. Set its limits before placing labels.
+    x, y : array-like
+        Data coordinates of the labeled points.
+    labels : list[str]
+        Label text of each point.
+    fontsize : float or str, optional
+        Font size of the labels. Default is ``rcParams['font.size']``.
+    gap : float, optional
+        Gap between a point and its label, in points. Default is 1.5.
+    padding : float, optional
+        Minimum gap between labels, in points. Default is 1.
+    point_size : float, optional
+        Size of the square kept free around each point, in points.
+        Default is 3.
+    avoid : array-like, optional
+        Additional (m, 2) data coordinates that labels must not cover,
+        e.g. unlabeled points of a scatter.
+    rings : int, optional
+        Number of candidate rings around each point. Default is 3.
+    max_steps : int, optional
+        Maximum number of steps. Default is 50.
+    seed : int, optional
+        Seed of the random choice of labels moved per step, for
+        reproducible placement. Default is 0.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (n, 2) with the offsets of the label centers from
+        their points, in points. Labels that found no free position keep
+        the least overlapping one.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import dartwork_mpl as dm
+    >>> x, y = np.random.rand(2, 500)
+    >>> ax.scatter(x, y, s=2)
+    >>> offsets = dm.place_labels(ax, x, y, [f"P{i}" for i in range(500)])
+    """
+    offsets, _ = _place(
+        ax,
+        x,
+        y,
+        labels,
+        fontsize,
+        gap,
+        padding,
+        point_size,
+        avoid,
+        rings,
+        max_steps,
+        seed,
+    )
+    return offsets
+
+
+def repel_labels(
+    ax: Axes,
+    x: np.ndarray,
+    y: np.ndarray,
+    labels: list[str],
+    fontsize: float | str | None = None,
+    gap: float = 1.5,
+    padding: float = 1.0,
+    point_size: float = 3.0,
+    avoid: np.ndarray | None = None,
+    arrowprops: dict | None = None,
+    **kwargs: object,
+) -> list[Annotation]:
+    """
+    Annotate data points with labels placed without overlaps.
+
+    Offsets come from ``place_labels``; each label is added with
+    ``ax.annotate`` in offset points, so it stays attached to its point
+    when the figure is laid out again.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        Axes holding the points. Set its limits before placing labels.
+    x, y : array-like
+        Data coordinates of the labeled points.
+    labels : list[str]
+        Label text of each point.
+    fontsize, gap, padding, point_size, avoid
+        See ``place_labels``.
+    arrowprops : dict, optional
+        Arrow properties (see ``Axes.annotate``) for labels placed beyond
+        the inner ring of candidates. Default draws no arrows.
+    **kwargs
+        Text properties passed to ``ax.annotate`` (e.g. ``color``).
+
+    Returns
+    -------
+    list[matplotlib.text.Annotation]
+        The added annotations.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import dartwork_mpl as dm
+    >>> x, y = np.random.rand(2, 200)
+    >>> ax.scatter(x, y, s=2)
+    >>> texts = dm.repel_labels(
+    ...     ax, x, y, [f"P{i}" for i in range(200)],
+    ...     fontsize=dm.fs(-1), arrowprops={"arrowstyle": "-", "lw": 0.3},
+    ... )
+    """
+    offsets, choice = _place(
+        ax,
+        x,
+        y,
+        labels,
+        fontsize,
+        gap,
+        padding,
+        point_size,
+        avoid,
+        _RINGS,
+        _MAX_STEPS,
+        0,
+    )
+    if fontsize is not None:
+        kwargs["fontsize"] = fontsize
+    kwargs.setdefault("ha", "center")
+    kwargs.setdefault("va", "center")
+
+    # Labels beyond the inner ring of candidates get an arrow.
+    far = choice >= len(_DIRECTIONS)
+
+    texts = []
+    for xi, yi, label, offset, arrow in zip(
+        x, y, labels, offsets, far, strict=True
+    ):
+        texts.append(
+            ax.annotate(
+                label,
+                (xi, yi),
+                xytext=tuple(offset),
+                textcoords="offset points",
+                arrowprops=arrowprops if arrow else None,
+                **kwargs,
+            )
+        )
+    return texts
+
+
+def _sample_segments(verts: np.ndarray, codes: np.ndarray | None) -> np.ndarray:
+    """
+    Return points along the segments of a path in grid cell units.
+
+    Every segment is sampled at least once per cell it crosses, so long
+    segments leave no gaps in the occupancy grid.
+
+    Parameters
+    ----------
+    verts : numpy.ndarray
+        Vertices of shape (n, 2) in cell units.
+    codes : numpy.ndarray or None
+        Path codes; segments ending in ``MOVETO`` are skipped.
+
+    Returns
+    -------
+    numpy.ndarray
+        Sample points of shape (m, 2).
+    """
+    if len(verts) < 2:
+        return verts
+    start, end = verts[:-1], verts[1:]
+    if codes is not None:
+        drawn = (codes[1:] != Path.MOVETO) & (codes[1:] != Path.STOP)
+        start, end = start[drawn], end[drawn]
+    steps = np.ceil(np.abs(end - start).max(axis=1)).astype(np.intp) + 1
+    first = np.cumsum(steps) - steps
+    t = (np.arange(steps.sum()) - np.repeat(first, steps)) / np.repeat(
+        steps, steps
+    )
+    start = np.repeat(start, steps, axis=0)
+    return start + (np.repeat(end, steps, axis=0) - start) * t[:, None]
+
+
+def _occupancy(
+    ax: Axes, shape: tuple[int, int], exclude: tuple = ()
+) -> np.ndarray:
+    """
+    Rasterize the data of an axes into a coarse occupancy grid.
+
+    Lines and path edges are sampled per cell after matplotlib's path
+    simplification at cell resolution, markers and scatter offsets are
+    binned as points, filled paths are tested at cell centers, and
+    patches, images and texts fill their extents. Each artist is visited
+    once, so the grid costs a single pass over the data.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        Axes to rasterize.
+    shape : tuple[int, int]
+        Grid size (nx, ny) over the axes bounding box.
+    exclude : tuple, optional
+        Artists to leave out, e.g. the legend being placed.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (ny, nx) counting the samples in each cell.
+    """
+    nx, ny = shape
+    bounds = ax.bbox
+    to_cells = (
+        Affine2D()
+        .translate(-bounds.x0, -bounds.y0)
+        .scale(nx / bounds.width, ny / bounds.height)
+    )
+    points = []
+    filled = np.zeros((ny + 1, nx + 1))
+
+    def fill(extent: Bbox) -> None:
+        (x0, y0), (x1, y1) = to_cells.transform(extent.get_points())
+        x0, x1 = np.clip([np.floor(x0), np.ceil(x1)], 0, nx).astype(int)
+        y0, y1 = np.clip([np.floor(y0), np.ceil(y1)], 0, ny).astype(int)
+        filled[y0, x0] += 1
+        filled[y0, x1] -= 1
+        filled[y1, x0] -= 1
+        filled[y1, x1] += 1
+
+    def add_path(path: Path, transform, face: bool, edge: bool) -> None:
+        path = path.cleaned(
+            transform + to_cells, remove_nans=True, simplify=edge
+        )
+        verts, codes = path.vertices, path.codes
+        if edge:
+            points.append(_sample_segments(verts, codes))
+        else:
+            points.append(verts)
+        if face and len(verts) > 2:
+            lo = np.clip(np.floor(verts.min(axis=0)), 0, [nx, ny]).astype(int)
+            hi = np.clip(np.ceil(verts.max(axis=0)), 0, [nx, ny]).astype(int)
+            cx, cy = np.meshgrid(
+                np.arange(lo[0], hi[0]) + 0.5, np.arange(lo[1], hi[1]) + 0.5
+            )
+            centers = np.column_stack([cx.ravel(), cy.ravel()])
+            inside = path.contains_points(centers)
+            points.append(centers[inside])
+
+    for line in ax.lines:
+        if not line.get_visible() or line in exclude:
+            continue
+        drawn = line.get_linestyle() not in ("None", "none", " ", "")
+        add_path(line.get_path(), line.get_transform(), False, drawn)
+    for collection in ax.collections:
+        if not collection.get_visible() or collection in exclude:
+            continue
+        if isinstance(collection, PathCollection):
+            # Scatter: one marker per offset.
+            offset_trans = collection.get_offset_transform() + to_cells
+            points.append(offset_trans.transform(collection.get_offsets()))
+            continue
+        if isinstance(collection, QuadMesh):
+            fill(collection.get_window_extent())
+            continue
+        face = len(collection.get_facecolor()) > 0
+        edge = not face or len(collection.get_edgecolor()) > 0
+        for path in collection.get_paths():
+            add_path(path, collection.get_transform(), face, edge)
+    for artist in (*ax.patches, *ax.images, *ax.texts):
+        if artist.get_visible() and artist not in exclude:
+            fill(artist.get_window_extent())
+
+    counts = np.cumsum(np.cumsum(filled, axis=0), axis=1)[:ny, :nx]
+    if points:
+        cells = np.floor(np.concatenate(points)).astype(np.intp)
+        valid = (
+            (cells[:, 0] >= 0)
+            & (cells[:, 0] < nx)
+            & (cells[:, 1] >= 0)
+            & (cells[:, 1] < ny)
+        )
+        keys = cells[valid, 1] * nx + cells[valid, 0]
+        counts += np.bincount(keys, minlength=nx * ny).reshape(ny, nx)
+    return counts
+
+
+def place_legend(
+    ax: Axes,
+    legend: Legend | None = None,
+    outside: bool = True,
+    resolution: int = 64,
+    **kwargs: object,
+) -> Legend:
+    """
+    Move a legend to the emptiest position inside or outside an axes.
+
+    The data of the axes is rasterized once into a ``resolution`` x
+    ``resolution`` occupancy grid. Every position of the legend box on
+    the grid is then scored at once with a summed-area table, weighting
+    dense cells more than sparse ones, so scoring does not depend on the
+    number of data points. Among equally empty positions the corners
+    win. With ``outside``, positions next to the axes compete as well;
+    they cost as much as a lightly covered position inside plus any
+    overlap with other axes, so crowded axes push the legend out.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        Axes the legend belongs to.
+    legend : matplotlib.legend.Legend, optional
+        Legend to move. Default creates one with ``ax.legend(**kwargs)``.
+    outside : bool, optional
+        Whether positions outside the axes are allowed. Default is True.
+        Run a layout afterwards (e.g. ``dm.simple_layout``) to make room
+        for a legend placed outside.
+    resolution : int, optional
+        Number of grid cells along each side of the axes. Default is 64.
+    **kwargs
+        Arguments of ``ax.legend`` when ``legend`` is not given.
+
+    Returns
+    -------
+    matplotlib.legend.Legend
+        The placed legend.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import dartwork_mpl as dm
+    >>> x = np.linspace(0, 10, 1_000_000)
+    >>> ax.plot(x, np.sin(x), label="sin")
+    >>> ax.plot(x, np.cos(x), label="cos")
+    >>> legend = dm.place_legend(ax, fontsize=dm.fs(-1))
+    """
+    if legend is None:
+        legend = ax.legend(**kwargs)
+    # A fixed location keeps loc="best" from scanning the data when the
+    # legend is measured.
+    legend.set_loc("upper right")
+    fig = ax.get_figure(root=True)
+    renderer = fig._get_renderer()
+    bounds = ax.bbox
+    extent = legend.get_window_extent(renderer)
+    pad = legend.borderaxespad * legend.prop.get_size_in_points()
+    pad *= fig.dpi / 72
+
+    # Summed-area table of the occupancy, weighted so that dense cells
+    # count more than sparse ones without letting them dominate.
+    nx = ny = resolution
+    weight = np.log1p(_occupancy(ax, (nx, ny), exclude=(legend,)))
+    weight /= max(weight.max(), 1.0)
+    table = np.zeros((ny + 1, nx + 1))
+    table[1:, 1:] = weight.cumsum(axis=0).cumsum(axis=1)
+
+    # Lower-left corners of every legend position inside the axes.
+    cell = np.array([bounds.width / nx, bounds.height / ny])
+    size = np.array([extent.width, extent.height])
+    span = np.minimum(np.ceil(size / cell).astype(int), [nx, ny])
+    x0 = np.clip(np.arange(nx - span[0] + 1) * cell[0], pad, None)
+    y0 = np.clip(np.arange(ny - span[1] + 1) * cell[1], pad, None)
+    x0 = np.minimum(x0, bounds.width - pad - size[0])
+    y0 = np.minimum(y0, bounds.height - pad - size[1])
+    i = np.arange(len(x0))[None, :]
+    j = np.arange(len(y0))[:, None]
+    covered = (
+        table[j + span[1], i + span[0]]
+        - table[j, i + span[0]]
+        - table[j + span[1], i]
+        + table[j, i]
+    ) / (span[0] * span[1])
+
+    # Corners first, then edges, as with loc="best".
+    free = bounds.size - size - 2 * pad
+    fx = np.minimum(x0 - pad, free[0] - x0 + pad)[None, :] / max(free[0], 1)
+    fy = np.minimum(y0 - pad, free[1] - y0 + pad)[:, None] / max(free[1], 1)
+    cost = covered + _CORNER_PREFERENCE * (fx + fy)
+    j, i = np.unravel_index(np.argmin(cost), cost.shape)
+    best = float(cost[j, i])
+    corner = np.array([bounds.x0 + x0[i], bounds.y0 + y0[j]])
+
+    if outside and best > 0:
+        for candidate, overlap in _outside_candidates(ax, legend, size, pad):
+            if _OUTSIDE_COST + overlap < best:
+                best = _OUTSIDE_COST + overlap
+                corner = candidate
+
+    legend.set_loc(tuple(ax.transAxes.inverted().transform(corner)))
+    return legend
+
+
+def _outside_candidates(
+    ax: Axes, legend: Legend, size: np.ndarray, pad: float
+) -> list[tuple[np.ndarray, float]]:
+    """
+    Return legend positions next to an axes with their overlap cost.
+
+    Positions lie to the right of the axes decorations (top, center,
+    bottom) and above them (right, center, left). The cost is the
+    fraction of the legend covering the other axes of the figure.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        Axes the legend belongs to.
+    legend : matplotlib.legend.Legend
+        Legend being placed; it is left out of the measurement.
+    size : numpy.ndarray
+        Legend (width, height) in pixels.
+    pad : float
+        Gap between the axes decorations and the legend in pixels.
+
+    Returns
+    -------
+    list[tuple[numpy.ndarray, float]]
+        Lower-left legend corners in pixels and their costs.
+    """
+    fig = ax.get_figure(root=True)
+    renderer = fig._get_renderer()
+    visible = legend.get_visible()
+    legend.set_visible(False)
+    try:
+        tight = ax.get_tightbbox(renderer)
+        others = [
+            other.get_tightbbox(renderer)
+            for other in fig.axes
+            if other is not ax and other.get_visible()
+        ]
+    finally:
+        legend.set_visible(visible)
+
+    bounds = ax.bbox
+    right = tight.x1 + pad
+    top = tight.y1 + pad
+    corners = [
+        (right, bounds.y1 - size[1]),
+        (right, bounds.y0 + (bounds.height - size[1]) / 2),
+        (right, bounds.y0),
+        (bounds.x1 - size[0], top),
+        (bounds.x0 + (bounds.width - size[0]) / 2, top),
+        (bounds.x0, top),
+    ]
+    candidates = []
+    for corner in corners:
+        corner = np.asarray(corner)
+        overlap = 0.0
+        for box in others:
+            lo = np.maximum(corner, box.p0)
+            hi = np.minimum(corner + size, box.p1)
+            overlap += np.clip(hi - lo, 0.0, None).prod()
+        candidates.append((corner, overlap / size.prod()))
+    return candidates
@@ -0,0 +1,402 @@
+"""Size optimization of Matplotlib SVG output.
+
+Matplotlib writes SVG coordinates with six decimals, an inline ``style``
+attribute on every element (the same one on each of thousands of scatter
+markers), one path command per line, indentation, and comments naming
+each text. ``optimize_svg`` shrinks such documents without building a
+DOM. The document is streamed: it is read in chunks, split into tags and
+text with a single regular expression, and processed in two linear
+passes that each read it again:
+
+1. Identical ``<defs>`` children and repeated styles are counted. Only
+   the definitions and the style counts are kept.
+2. Tags are rewritten (coordinates rounded, path data compacted) and
+   written out one by one. Duplicate definitions are dropped and their
+   references redirected, repeated styles become CSS classes, and
+   whitespace between tags and comments are removed.
+
+Files optimized in place (``save_formats(svg_precision=...)``) are
+written through a temporary file, so the document is never held in
+memory.
+"""
+
+import functools
+import itertools
+import logging
+import os
+import re
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+
+_logger = logging.getLogger(__name__)
+
+# Characters read from a file at a time.
+_CHUNK_SIZE = 1 << 16
+
+# Tokens of an XML document: comments, CDATA, declarations, processing
+# instructions, tags, and the text between them.
+_TOKEN = re.compile(
+    r"<!--.*?-->|<!\[CDATA\[.*?\]\]>|<![^>]*>|<\?.*?\?>|<[^>]*>|[^<]+", re.S
+)
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_REFERENCE = re.compile(r"""(url\(#|href=["']#)([^)"']+)""")
+_STYLE = re.compile(r"""\sstyle=(["'])(.*?)\1""", re.S)
+_ID = re.compile(r"""\sid=(["'])(.*?)\1""")
+
+# Attributes holding coordinates in user units, and the style attribute.
+# ``transform`` is left alone: rounding a scale factor would resize
+# everything inside it.
+_REWRITTEN_ATTR = re.compile(
+    r"""\s(d|points|x|y|x1|y1|x2|y2|cx|cy|r|rx|ry|width|height|style)"""
+    r"""\s*=\s*(["'])(.*?)\2""",
+    re.S,
+)
+
+# Elements whose text content is significant.
+_TEXT_ELEMENTS = frozenset({"text", "style", "script", "title", "desc"})
+
+
+def _format_number(match: re.Match, precision: int) -> str:
+    """Return a number rounded to ``precision`` decimals, trimmed."""
+    text = f"{float(match.group()):.{precision}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def _compact_path(d: str) -> str:
+    """Remove the whitespace path data does not need."""
+    d = " ".join(d.split())
+    d = re.sub(r" ?([A-Za-z]) ?", r"\1", d)
+    return d.replace(" -", "-")
+
+
+@functools.lru_cache(maxsize=1024)
+def _compact_style(style: str) -> str:
+    """Remove the whitespace around style declarations."""
+    style = re.sub(r"\s*([:;])\s*", r"\1", style.strip())
+    return style.rstrip(";")
+
+
+def _rewrite_tag(token: str, precision: int) -> str:
+    """Round the coordinates and compact the path data and style of a tag."""
+
+    def number(match: re.Match) -> str:
+        return _format_number(match, precision)
+
+    def attr(match: re.Match) -> str:
+        name, quote, value = match.groups()
+        if name == "style":
+            value = _compact_style(value)
+        elif name == "d" or name == "points":
+            value = _NUMBER.sub(number, value)
+            if name == "d":
+                value = _compact_path(value)
+        else:
+            # Single lengths; units such as "pt" or "%" are kept.
+            value = _NUMBER.sub(number, value, count=1)
+        return f" {name}={quote}{value}{quote}"
+
+    return _REWRITTEN_ATTR.sub(attr, token)
+
+
+def _definition_key(tokens: list[str]) -> str:
+    """Return the content of a definition without its id."""
+    first = _ID.sub("", tokens[0], count=1)
+    return first + "".join(tokens[1:])
+
+
+def _read_chunks(path: str | os.PathLike) -> Iterator[str]:
+    """Yield the text of a file in chunks of ``_CHUNK_SIZE`` characters."""
+    with open(path, encoding="utf-8") as file:
+        while chunk := file.read(_CHUNK_SIZE):
+            yield chunk
+
+
+def _complete(token: str) -> bool:
+    """
+    Return whether a comment, CDATA section or instruction is complete.
+
+    Without their ending these tokens still match a shorter alternative
+    of ``_TOKEN`` when a ``>`` follows in the text read so far.
+    """
+    if token.startswith("<!--"):
+        return token.endswith("-->")
+    if token.startswith("<![CDATA["):
+        return token.endswith("]]>")
+    return not token.startswith("<?") or token.endswith("?>")
+
+
+def _tokenize(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Split a document arriving in chunks into tokens.
+
+    A token reaching the end of the text read so far may continue in the
+    next chunk, so it is kept back until more text arrives. So is a ``<``
+    that starts no token yet (``_TOKEN`` skips it).
+    """
+    buffer = ""
+    for chunk in itertools.chain(chunks, (None,)):
+        end = chunk is None
+        if not end:
+            buffer += chunk
+        pos = 0
+        size = len(buffer)
+        for match in _TOKEN.finditer(buffer):
+            token = match.group()
+            start, stop = match.span()
+            if not end and (
+                start != pos
+                or stop == size
+                or (
+                    token[0] == "<"
+                    and token[1] in "!?"
+                    and not _complete(token)
+                )
+            ):
+                break
+            yield token
+            pos = stop
+        buffer = buffer[pos:]
+
+
+def _elements(
+    tokens: Iterable[str], precision: int, rewrite: bool = True
+) -> Iterator[tuple[list[str], str | None]]:
+    """
+    Rewrite the tags of a token stream and group the children of <defs>.
+
+    Comments and whitespace between tags are dropped, except inside text
+    elements. Each item is a direct child of ``<defs>`` as a list of
+    tokens with its id, or a single other token with None. With
+    ``rewrite=False`` only the tags of definitions are rewritten.
+    """
+    stack: list[str] = []
+    # Number of open elements whose text content is significant.
+    in_text = 0
+    definition: list[str] | None = None
+    for token in tokens:
+        if token[0] == "<" and token[1] not in "!?":
+            closing = token[1] == "/"
+            empty = token.endswith("/>")
+            name = token[1 + closing :].split(None, 1)[0].rstrip("/>")
+            if not closing:
+                if stack and stack[-1] == "defs" and definition is None:
+                    definition = []
+                if (
+                    (rewrite or definition is not None)
+                    and name != "svg"
+                    and "=" in token
+                ):
+                    token = _rewrite_tag(token, precision)
+                if not empty:
+                    stack.append(name)
+                    in_text += name in _TEXT_ELEMENTS
+            else:
+                in_text -= stack.pop() in _TEXT_ELEMENTS
+
+            if definition is None:
+                yield [token], None
+                continue
+            definition.append(token)
+            # A direct child of <defs> just ended.
+            if (closing or empty) and stack and stack[-1] == "defs":
+                ident = _ID.search(definition[0])
+                yield definition, None if ident is None else ident.group(2)
+                definition = None
+            continue
+
+        if token.startswith("<!--") or (not in_text and token.isspace()):
+            continue
+        if definition is None:
+            yield [token], None
+        else:
+            definition.append(token)
+
+
+def _optimize(
+    read: Callable[[], Iterable[str]],
+    write: Callable[[str], object],
+    precision: int,
+) -> tuple[int, int]:
+    """
+    Optimize a document read in chunks and write it token by token.
+
+    ``read`` is called once per pass and returns the chunks of the
+    document. Only the style counts and the definitions are kept between
+    the passes.
+
+    Returns
+    -------
+    tuple[int, int]
+        Number of duplicate definitions removed and of classes.
+    """
+    # Pass 1: find duplicate definitions and count styles. Tags outside
+    # definitions are rewritten in pass 2 only, so their styles are
+    # compacted here.
+    aliases: dict[str, str] = {}
+    definitions: dict[str, str] = {}
+    style_counts: dict[str, int] = {}
+    has_style = False
+    for group, ident in _elements(_tokenize(read()), precision, False):
+        for token in group:
+            if token[0] != "<" or token[1] in "!?/":
+                continue
+            style = _STYLE.search(token) if "style=" in token else None
+            if style is not None and " class=" not in token:
+                value = _compact_style(style.group(2))
+                style_counts[value] = style_counts.get(value, 0) + 1
+        has_style = has_style or "</style>" in group
+        if ident is not None:
+            kept = definitions.setdefault(_definition_key(group), ident)
+            if kept != ident:
+                aliases[ident] = kept
+
+    # Pass 2: write the kept tokens with classes and redirected references.
+    classes = {
+        style: f"s{i}"
+        for i, style in enumerate(
+            s for s, count in style_counts.items() if count > 1
+        )
+    }
+    rules = "".join(f".{name}{{{style}}}" for style, name in classes.items())
+
+    def reference(match: re.Match) -> str:
+        return match.group(1) + aliases.get(match.group(2), match.group(2))
+
+    def styled(match: re.Match) -> str:
+        name = classes.get(match.group(2))
+        return match.group() if name is None else f' class="{name}"'
+
+    # The rules go into the first <style> element, which Matplotlib writes
+    # at the top of the document, or into a new one after the root tag.
+    inserted = not rules
+    for group, ident in _elements(_tokenize(read()), precision):
+        if ident in aliases:
+            continue
+        for token in group:
+            if token[0] == "<" and token[1] not in "!?/":
+                if aliases and "#" in token:
+                    token = _REFERENCE.sub(reference, token)
+                if classes and "style=" in token and " class=" not in token:
+                    token = _STYLE.sub(styled, token, count=1)
+            elif token == "</style>" and not inserted:
+                write(rules)
+                inserted = True
+            write(token)
+            if not inserted and not has_style and token.startswith("<svg"):
+                write(f'<defs><style type="text/css">{rules}</style></defs>')
+                inserted = True
+    return len(aliases), len(classes)
+
+
+def _report(
+    before: int, after: int, definitions: int, classes: int
+) -> dict[str, float]:
+    """Return the size report of an optimization."""
+    return {
+        "before": before,
+        "after": after,
+        "saved": 1 - after / before if before else 0.0,
+        "definitions": definitions,
+        "classes": classes,
+    }
+
+
+def optimize_svg(
+    svg: str | bytes | os.PathLike, precision: int = 2
+) -> tuple[bytes, dict[str, float]]:
+    """
+    Shrink a Matplotlib SVG document.
+
+    The optimized document draws the same picture: coordinates move by
+    at most half a unit in the last kept decimal (in user units, i.e.
+    points for Matplotlib output), and everything else is only rewritten
+    into an equivalent, shorter form:
+
+    - coordinates in path data and positions are rounded to ``precision``
+      decimals and path data loses its redundant whitespace;
+    - identical children of ``<defs>`` (marker paths, clip paths) are kept
+      once and every reference is redirected to the kept copy;
+    - ``style`` attributes used more than once become CSS classes in the
+      document's ``<style>`` element;
+    - comments and whitespace between tags are removed, except inside
+      text elements.
+
+    Parameters
+    ----------
+    svg : str, bytes or path-like
+        SVG document, as text or bytes (e.g. from ``export_bytes``), or
+        the path of an SVG file, which is read in chunks.
+    precision : int, optional
+        Decimals kept in coordinates. Default is 2, i.e. 0.01 pt.
+
+    Returns
+    -------
+    bytes
+        Optimized SVG document, UTF-8 encoded.
+    dict[str, float]
+        ``before`` and ``after`` sizes in bytes, ``saved`` (fraction of
+        the original size removed), ``definitions`` (duplicate definitions
+        removed) and ``classes`` (styles turned into classes).
+
+    Examples
+    --------
+    >>> import dartwork_mpl as dm
+    >>> svg = dm.export_bytes(fig, ("svg",))["svg"]
+    >>> small, report = dm.optimize_svg(svg)
+    >>> report["before"], report["after"]
+    (2418734, 726105)
+    """
+    if isinstance(svg, bytes | bytearray | memoryview):
+        text = str(svg, "utf-8")
+    elif isinstance(svg, str) and svg.lstrip().startswith("<"):
+        text = svg
+    else:
+        text = None
+    if text is None:
+        before = os.path.getsize(svg)
+        read = functools.partial(_read_chunks, svg)
+    else:
+        before = len(text.encode())
+
+        def read() -> tuple[str]:
+            return (text,)
+
+    out: list[str] = []
+    counts = _optimize(read, out.append, precision)
+    optimized = "".join(out).encode()
+    return optimized, _report(before, len(optimized), *counts)
+
+
+def _optimize_file(path: str | os.PathLike, precision: int) -> int:
+    """
+    Optimize an SVG file in place and return its new size.
+
+    The file is read in chunks and the result is written to a temporary
+    file next to it, so the document is never held in memory.
+    """
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.tmp")
+    before = path.stat().st_size
+    try:
+        with open(tmp, "w", encoding="utf-8", newline="") as file:
+            counts = _optimize(
+                functools.partial(_read_chunks, path), file.write, precision
+            )
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    report = _report(before, path.stat().st_size, *counts)
+    _logger.debug(
+        "optimized %s: %d -> %d bytes (-%.0f%%), %d definition(s) merged, "
+        "%d class(es)",
+        path,
+        report["before"],
+        report["after"],
+        100 * report["saved"],
+        report["definitions"],
+        report["classes"],
+    )
+    return report["after"]
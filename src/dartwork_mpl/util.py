@@ -1,18 +1,37 @@
+import re
+import time
 from pathlib import Path
 from shutil import copy2
-from tempfile import NamedTemporaryFile
-from xml.dom import minidom
 
 import matplotlib.colors as mcolors
 import matplotlib.pyplot as plt
 import numpy as np
-from IPython.display import HTML, SVG, display
+from IPython.display import HTML, display
 from matplotlib.axes import Axes
 from matplotlib.figure import Figure
 from matplotlib.gridspec import GridSpec
 from matplotlib.transforms import ScaledTranslation
 from scipy.optimize import OptimizeResult, minimize
 
+from .export import (
+    RasterizeReport,
+    _write_formats,
+    _write_rasterized,
+    export_bytes,
+)
+from .layout import (
+    LayoutStats,
+    TextExtentCache,
+    _default_gridspec,
+    _fixed_targets,
+    _report_stats,
+    _resolve_text_cache,
+    _shift_bounds,
+    _targets,
+    _topmost_gridspec,
+)
+from .svg import _optimize_file
+
 
 def _create_parent_path_if_not_exists(path: str | Path) -> None:
     """
@@ -99,101 +118,180 @@ def simple_layout(
     bound_margin: float = 0.2,
     use_all_axes: bool = True,
     importance_weights: tuple[float, float, float, float] = (1, 1, 1, 1),
+    text_cache: TextExtentCache | bool | None = None,
 ) -> OptimizeResult:
     """Apply simple layout to figure for given grid spec.
 
+    Figure-level texts (``suptitle``, ``supxlabel``, ``supylabel``,
+    ``fig.text``) and figure legends are constraints: the decorations keep
+    the margin to them on the side they sit on, within the same
+    optimization. Axes at fixed positions such as a colorbar ``cax`` are
+    part of the fitted box when ``use_all_axes`` is True and constraints
+    like the texts otherwise.
+
+    The fitted width and height subtract twice the right and top margins,
+    so the left and bottom margins only shift the box; pass symmetric
+    margins for the same spacing on every side.
+
     Parameters
     ----------
     fig : matplotlib.figure.Figure
         Figure object.
     gs : matplotlib.gridspec.GridSpec, optional(default=None)
-        Grid spec object. If None, use the first grid spec.
+        Grid spec object. If None, use the outermost grid spec of the
+        first axes placed by one.
     margins : tuple(float, float, float, float), optional(default=(0.05, 0.05, 0.05, 0.05))
         Margins in inches, (left, right, bottom, top).
     bbox : tuple(float, float, float, float), optional(default=(0, 1, 0, 1))
         Bounding box in figure coordinates, (left, right, bottom, top).
-    verbose : bool, optional(default=True)
-        Print verbose.
+    verbose : bool, optional(default=False)
+        Print the loss of each evaluation and a ``LayoutStats`` summary.
     gtol : float, optional(default=1e-2)
         Gradient tolerance. If the maximum change in the objective function is
         less than gtol, the optimization will stop.
     bound_margin : float, optional(default=0.1)
         Margin for bounds generation.
     use_all_axes : bool, optional(default=True)
-        Use all axes in the figure. If False, use only axes in the given grid spec.
-        IF True, use all axes in the figure.
+        Use all axes in the figure, including axes from ``fig.add_axes``.
+        If False, use only axes in the given grid spec.
     importance_weights : tuple(float, float, float, float), optional(default=(1, 1, 1, 1))
         Importance weights for each target. (left, right, bottom, top).
+    text_cache : TextExtentCache or bool, optional(default=None)
+        Cache for text measurements shared by all evaluations. None or True
+        uses a fresh cache for this call; pass a ``TextExtentCache`` (e.g.
+        ``text_extent_cache()``) to share it across figures, or False to
+        disable caching.
 
     Returns
     -------
     result : scipy.optimize.OptimizeResult
-        Optimization result.
+        Optimization result. ``result.text_cache`` holds the text cache
+        statistics and ``result.stats`` the ``LayoutStats`` (evaluations,
+        ``get_tightbbox`` calls, measuring vs. optimizer time, final
+        residuals per side and the slowest axes).
 
     TODO
     ----
     - Upgrade bounds generation algorithm.
     - Readable code.
     """
+    start = time.perf_counter()
+    stats = LayoutStats("simple_layout")
     if gs is None:
-        gs = fig.axes[0].get_gridspec()
+        gs = _default_gridspec(fig)
 
     importance_weights = np.array(importance_weights)
-    margins = np.array(margins) * fig.get_dpi()
+    fbox = fig.bbox
+    scales = np.array([fbox.width, fbox.height, fbox.width, fbox.height])
+
+    # One renderer for all evaluations; text extents go through the cache.
+    renderer = fig._get_renderer()
+    cache = _resolve_text_cache(text_cache)
+
+    # Point and bounding box of the latest evaluation.
+    last: dict = {}
 
     def fun(x: np.ndarray) -> float:
         gs.update(left=x[0], right=x[1], bottom=x[2], top=x[3])
+        stats.nfev += 1
 
-        if use_all_axes:
-            ax_bboxes = [ax.get_tightbbox() for ax in fig.axes]
-        else:
-            ax_bboxes = [
-                ax.get_tightbbox()
-                for ax in fig.axes
-                if id(ax.get_gridspec()) == id(gs)
-            ]
+        ax_bboxes = [
+            stats.tightbbox(ax, renderer)
+            for ax in fig.axes
+            if use_all_axes or _topmost_gridspec(ax) is gs
+        ]
 
         all_bbox = get_bounding_box(ax_bboxes)
+        last["x"] = np.array(x)
+        last["bbox"] = all_bbox
 
         values = np.array(all_bbox)
-
-        # Targets.
-        fbox = fig.bbox
-        targets = np.array(
-            [
-                fbox.width * bbox[0] + margins[0],
-                fbox.height * bbox[2] + margins[2],
-                fbox.width * (bbox[1] - bbox[0]) - 2 * margins[1],
-                fbox.height * (bbox[3] - bbox[2]) - 2 * margins[3],
-            ]
-        )
-
-        scales = np.array([fbox.width, fbox.height, fbox.width, fbox.height])
-
         loss = np.square((values - targets) / scales * importance_weights).sum()
 
+        if verbose:
+            print(f"simple_layout evaluation {stats.nfev}: loss {loss:.4e}")
         return loss
 
     # Order: left, right, bottom, top.
-    bounds = [
-        (bbox[0], bbox[0] + bound_margin),
-        (bbox[1] - bound_margin, bbox[1]),
-        (bbox[2], bbox[2] + bound_margin),
-        (bbox[3] - bound_margin, bbox[3]),
-    ]
-
-    result = minimize(
-        fun,
-        x0=np.array(bounds).mean(axis=1),
-        bounds=bounds,
-        # # Gradient-free optimization.
-        # method='Nelder-Mead',
-        # # Relax convergence criteria.
-        # options=dict(xatol=1e-3),
-        method="L-BFGS-B",
-        options={"gtol": gtol},
+    bounds = np.array(
+        [
+            (bbox[0], bbox[0] + bound_margin),
+            (bbox[1] - bound_margin, bbox[1]),
+            (bbox[2], bbox[2] + bound_margin),
+            (bbox[3] - bound_margin, bbox[3]),
+        ]
+    )
+
+    with cache:
+        # Figure-level texts and legends are constraints that move the
+        # targets inward, so one optimization accounts for them. With
+        # use_all_axes, axes at fixed figure positions (e.g. a colorbar cax)
+        # stay in the union box as before; otherwise they are constraints
+        # too.
+        plain = _targets(fig, margins, bbox)
+        side_targets = _fixed_targets(
+            fig,
+            gs,
+            plain,
+            margins,
+            renderer,
+            stats,
+            fixed_axes=not use_all_axes,
+        )
+        shift = (side_targets - plain) / np.repeat([fbox.width, fbox.height], 2)
+        bounds = _shift_bounds(bounds, shift)
+
+        # Targets: (x0, y0, width, height) of the decorated area. The width
+        # and height keep subtracting twice the right and top margins, as
+        # simple_layout always has; fast_layout uses each side's margin.
+        margins_px = np.asarray(margins, dtype=float) * fig.dpi
+        targets = np.array(
+            [
+                side_targets[0],
+                side_targets[2],
+                side_targets[1]
+                - side_targets[0]
+                + margins_px[0]
+                - margins_px[1],
+                side_targets[3]
+                - side_targets[2]
+                + margins_px[2]
+                - margins_px[3],
+            ]
+        )
+        result = minimize(
+            fun,
+            x0=bounds.mean(axis=1),
+            bounds=bounds,
+            # # Gradient-free optimization.
+            # method='Nelder-Mead',
+            # # Relax convergence criteria.
+            # options=dict(xatol=1e-3),
+            method="L-BFGS-B",
+            options={"gtol": gtol},
+        )
+        # Leave the figure at the optimum, not at the last evaluated point.
+        if not np.array_equal(last["x"], result.x):
+            fun(result.x)
+
+    x0, y0, width, height = last["bbox"]
+    stats.set_residuals(
+        np.array([x0, x0 + width, y0, y0 + height])
+        - np.array(
+            [
+                targets[0],
+                targets[0] + targets[2],
+                targets[1],
+                targets[1] + targets[3],
+            ]
+        )
     )
+    stats.text_cache = cache.stats() if text_cache is not False else None
+    stats.total_time = time.perf_counter() - start
+    _report_stats(stats, verbose)
 
+    result.text_cache = stats.text_cache
+    result.stats = stats
     return result
 
 
@@ -351,11 +449,23 @@ def save_formats(
     image_stem: str,
     formats: tuple[str, ...] = ("svg", "png", "pdf", "eps"),
     bbox_inches: str | None = None,
+    max_workers: int | None = None,
+    rasterize: int | None = None,
+    raster_dpi: float | None = None,
+    compare_sizes: bool = False,
+    svg_precision: int | None = None,
     **kwargs,
-) -> None:
+) -> RasterizeReport | None:
     """
     Save a figure in multiple formats.
 
+    The figure is prepared once for all formats: ``bbox_inches="tight"``
+    is measured a single time, with the Agg renderer, so every file has
+    the same extent, and text layout is shared between files.
+    On heavy figures the vector formats (svg, pdf, eps, ps) are written
+    concurrently by worker processes, each from a pickled copy of the
+    figure.
+
     Parameters
     ----------
     fig : matplotlib.figure.Figure
@@ -366,66 +476,156 @@ def save_formats(
         Tuple of format extensions to save.
     bbox_inches : str or Bbox, optional
         Bounding box in inches.
+    max_workers : int, optional
+        Number of worker processes for vector formats. ``0`` or ``1``
+        saves every format in this process. Default uses one worker per
+        vector format on figures that draw more than about 100k vertices,
+        when several CPUs are available and processes start by fork (the
+        Linux default). Elsewhere workers are only used when requested,
+        and the calling script needs an ``if __name__ == "__main__":``
+        guard.
+    rasterize : int, optional
+        Vertex threshold above which lines, collections and patches are
+        rasterized in vector formats (markers count once per point, times
+        the vertices of the marker). Texts, axes and lighter artists stay
+        vector. The artists are restored after saving. Default keeps
+        everything vector.
+    raster_dpi : float, optional
+        Resolution of the rasterized artists in vector formats. Default is
+        the ``dpi`` used for the other formats.
+    compare_sizes : bool, optional
+        With ``rasterize``, also measure each vector format without
+        rasterization (rendered in memory) to report the size reduction.
+        Default is False.
+    svg_precision : int, optional
+        If given, the SVG file is shrunk with ``optimize_svg`` after
+        saving, keeping this many decimals in coordinates. Default writes
+        Matplotlib's SVG unchanged.
     **kwargs
         Additional arguments passed to savefig.
+
+    Returns
+    -------
+    RasterizeReport or None
+        With ``rasterize``, the rasterized artists and the file sizes.
+        Otherwise None.
+
+    Examples
+    --------
+    >>> report = dm.save_formats(fig, "out/scatter", rasterize=50_000,
+    ...                          raster_dpi=300, compare_sizes=True)
+    >>> print(report.summary())
+    rasterized 1 artist(s)
+      PathCollection: 1,000,000 vertices
+      svg: 81.23 MB -> 0.41 MB (-99%)
+      ...
     """
     _create_parent_path_if_not_exists(image_stem)
-    for fmt in formats:
-        fig.savefig(f"{image_stem}.{fmt}", bbox_inches=bbox_inches, **kwargs)
+    paths = {fmt: f"{image_stem}.{fmt}" for fmt in formats}
+    report = None
+    if rasterize is not None:
+        report = _write_rasterized(
+            fig,
+            paths,
+            rasterize,
+            raster_dpi=raster_dpi,
+            compare_sizes=compare_sizes,
+            bbox_inches=bbox_inches,
+            max_workers=max_workers,
+            **kwargs,
+        )
+    else:
+        _write_formats(
+            fig,
+            paths,
+            bbox_inches=bbox_inches,
+            max_workers=max_workers,
+            **kwargs,
+        )
+    if svg_precision is not None and "svg" in paths:
+        size = _optimize_file(paths["svg"], svg_precision)
+        if report is not None:
+            report.sizes["svg"] = size
+    return report
+
 
+# Root <svg> start tag, and its attributes. Only the document head up to
+# this tag is scanned; the rest of the SVG is copied unchanged.
+_SVG_ROOT = re.compile(r"<svg\b[^>]*>")
+_SVG_ATTR = re.compile(r"""\s(width|height|viewBox)\s*=\s*(["'])(.*?)\2""")
+_SVG_LENGTH = re.compile(r"\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)")
 
-def show(image_path: str, size: int = 600, unit: str = "pt") -> None:
+
+def _resize_svg(svg: str, size: float, unit: str = "pt") -> str:
+    """
+    Return the root ``<svg>`` element resized to a width.
+
+    Only the root start tag is parsed. Its ``width`` and ``height`` are
+    rewritten (the height keeps the aspect ratio) and the XML prolog
+    before the tag is dropped. The rest of the document is copied once,
+    without further passes.
+    """
+    root = _SVG_ROOT.search(svg)
+    if root is None:
+        raise ValueError("No <svg> element found")
+
+    tag = root.group()
+    attrs = {m.group(1): m for m in _SVG_ATTR.finditer(tag)}
+    if "width" in attrs and "height" in attrs:
+        width = float(_SVG_LENGTH.match(attrs["width"].group(3)).group(1))
+        height = float(_SVG_LENGTH.match(attrs["height"].group(3)).group(1))
+    elif "viewBox" in attrs:
+        _, _, width, height = map(float, attrs["viewBox"].group(3).split())
+    else:
+        raise ValueError("The <svg> element has no size or viewBox")
+
+    values = {
+        "width": f"{size}{unit}",
+        "height": f"{int(size * height / width)}{unit}",
+    }
+    parts, pos = [], 0
+    for name, m in attrs.items():
+        if name not in values:
+            continue
+        parts += [tag[pos : m.start(3)], values[name]]
+        pos = m.end(3)
+    parts.append(tag[pos:])
+    tag = "".join(parts)
+    missing = "".join(
+        f' {n}="{v}"' for n, v in values.items() if n not in attrs
+    )
+    tag = tag[:4] + missing + tag[4:]
+    return tag + svg[root.end() :]
+
+
+def show(
+    image_path: str | Path | bytes, size: int = 600, unit: str = "pt"
+) -> None:
     """
     Display an SVG image with specified size.
 
+    Only the root ``<svg>`` tag is parsed to read and rewrite the size, so
+    large SVGs (e.g. scatter plots with millions of markers) display
+    without building a DOM.
+
     Parameters
     ----------
-    image_path : str
-        Path to the SVG image.
+    image_path : str, Path or bytes
+        Path to the SVG image, or the SVG document itself as bytes (as
+        returned by ``export_bytes``) or as a string.
     size : int, optional
         Desired width in specified units.
     unit : str, optional
         Unit for size ('pt', 'px', etc.).
     """
-    # SVG 객체 생성
-    svg_obj = SVG(data=image_path)
-
-    # 원하는 가로 폭 또는 세로 높이 설정
-    desired_width = size
-
-    # SVG 코드에서 현재 가로 폭과 세로 높이 가져오기
-    dom = minidom.parseString(svg_obj.data)
-    width = float(dom.documentElement.getAttribute("width")[: -len(unit)])
-    height = float(dom.documentElement.getAttribute("height")[: -len(unit)])
-
-    # 비율 계산
-    aspect_ratio = height / width
-    desired_height = int(desired_width * aspect_ratio)
-
-    # 가로 폭과 세로 높이 설정
-    if f'width="{width}{unit}"' in svg_obj.data:
-        svg_obj.data = svg_obj.data.replace(
-            f'width="{width}{unit}"', f'width="{desired_width}{unit}"'
-        )
+    if isinstance(image_path, bytes | bytearray | memoryview):
+        svg = str(image_path, "utf-8")
+    elif isinstance(image_path, str) and image_path.lstrip().startswith("<"):
+        svg = image_path
     else:
-        width = int(width)
-        svg_obj.data = svg_obj.data.replace(
-            f'width="{width}{unit}"', f'width="{desired_width}{unit}"'
-        )
+        svg = Path(image_path).read_text(encoding="utf-8")
 
-    if f'height="{height}{unit}"' in svg_obj.data:
-        svg_obj.data = svg_obj.data.replace(
-            f'height="{height}{unit}"', f'height="{desired_height}{unit}"'
-        )
-    else:
-        height = int(height)
-        svg_obj.data = svg_obj.data.replace(
-            f'height="{height}{unit}"', f'height="{desired_height}{unit}"'
-        )
-
-    # HTML을 사용하여 SVG 이미지 표시
-    svg_code = svg_obj.data
-    display(HTML(svg_code))
+    display(HTML(_resize_svg(svg, size, unit)))
 
 
 def save_and_show(
@@ -443,7 +643,7 @@ def save_and_show(
     fig : matplotlib.figure.Figure
         Figure to save and display.
     image_path : str, optional
-        Path to save the image. If None, uses a temporary file.
+        Path to save the image. If None, the SVG is rendered in memory.
     size : int, optional
         Display size.
     unit : str, optional
@@ -452,14 +652,10 @@ def save_and_show(
         Additional arguments passed to savefig.
     """
     if image_path is None:
-        with NamedTemporaryFile(suffix=".svg") as f:
-            f.close()
-            image_path = f.name
-
-            fig.savefig(image_path, bbox_inches=None, **kwargs)
-            plt.close(fig)
+        data = export_bytes(fig, ("svg",), bbox_inches=None, **kwargs)["svg"]
+        plt.close(fig)
 
-            show(image_path, size=size, unit=unit)
+        show(data, size=size, unit=unit)
     else:
         _create_parent_path_if_not_exists(image_path)
         fig.savefig(image_path, bbox_inches=None, **kwargs)
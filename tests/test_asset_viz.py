@@ -0,0 +1,131 @@
+"""Tests for colormap classification and gallery helpers."""
+
+import json
+import subprocess
+import sys
+
+import matplotlib as mpl
+import matplotlib.colors as mcolors
+import matplotlib.pyplot as plt
+import numpy as np
+
+from dartwork_mpl import asset_viz
+from dartwork_mpl.asset_viz import (
+    classify_colormap,
+    classify_colormaps,
+    plot_colormaps,
+)
+
+
+class TestClassifyColormaps:
+    """Tests for batch colormap classification."""
+
+    def test_matches_single_classification(self) -> None:
+        """Test that batch results match per-colormap classification."""
+        names = ["viridis", "dm.Blues", "coolwarm", "twilight", "tab10"]
+        batch = classify_colormaps(names)
+
+        assert batch == [classify_colormap(mpl.colormaps[n]) for n in names]
+
+    def test_known_categories(self) -> None:
+        """Test categories of well-known colormaps."""
+        assert classify_colormaps(["tab10", "twilight", "RdBu"]) == [
+            "Categorical",
+            "Cyclical",
+            "Diverging",
+        ]
+
+    def test_cache_keyed_by_lut(self) -> None:
+        """Test that identical LUTs under different names share an entry."""
+        colors = mcolors.to_rgba_array(["#102030", "#f0e0d0"])
+        first = mcolors.LinearSegmentedColormap.from_list("first", colors)
+        second = mcolors.LinearSegmentedColormap.from_list("second", colors)
+
+        classify_colormaps([first])
+        n_cached = len(asset_viz._classify_cache())
+        classify_colormaps([second])
+
+        assert len(asset_viz._classify_cache()) == n_cached
+
+    def test_cache_persists(self, tmp_path, monkeypatch) -> None:
+        """Test that categories are stored on disk for later runs."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        monkeypatch.setattr(asset_viz, "_CLASSIFY_CACHE", None)
+        cmap = mcolors.LinearSegmentedColormap.from_list(
+            "persisted", ["#203040", "#e0d0c0"]
+        )
+        key = asset_viz._lut_hash(asset_viz._sample_colormaps([cmap])[0])
+        (category,) = classify_colormaps([cmap])
+
+        # A new process loads the stored categories.
+        monkeypatch.setattr(asset_viz, "_CLASSIFY_CACHE", None)
+        assert asset_viz._classify_cache()[key] == category
+
+        # The version is stable across processes.
+        version = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "from dartwork_mpl import asset_viz; "
+                "print(asset_viz._classifier_version())",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        assert version == asset_viz._classifier_version()
+
+        # Categories of another classifier version are ignored.
+        path = asset_viz._classify_cache_path()
+        data = json.loads(path.read_text())
+        path.write_text(json.dumps({**data, "version": "old"}))
+        monkeypatch.setattr(asset_viz, "_CLASSIFY_CACHE", None)
+        assert key not in asset_viz._classify_cache()
+
+    def test_empty(self) -> None:
+        """Test that an empty input returns an empty list."""
+        assert classify_colormaps([]) == []
+
+
+class TestColormapAtlas:
+    """Tests for atlas rendering of colormap galleries."""
+
+    def test_atlas_uses_single_axes_and_image(self) -> None:
+        """Test that atlas mode draws one axes with one image."""
+        names = ["viridis", "dm.vik", "dm.Blues", "magma", "tab10"]
+        fig, axs = plot_colormaps(
+            names, ncols=2, group_by_type=False, atlas=True
+        )
+
+        assert len(fig.axes) == 1
+        assert len(axs[0].images) == 1
+        assert sorted(t.get_text() for t in axs[0].texts) == sorted(names)
+        plt.close(fig)
+
+    def test_atlas_pixels_and_cache(self) -> None:
+        """Test that atlas rows hold the colormap gradients and are cached."""
+        cmaps = [mpl.colormaps[n] for n in ["viridis", "dm.vik", "magma"]]
+        atlas = asset_viz._colormap_atlas(cmaps, nrows=2, ncols=2)
+
+        # Second colormap sits in the second row of the first column.
+        row = 2 * asset_viz._ATLAS_ROW_HEIGHT - 1
+        left = asset_viz._ATLAS_LABEL_WIDTH
+        np.testing.assert_allclose(atlas[row, left, :3], cmaps[1](0.0)[:3])
+        assert atlas[row, 0, 3] == 0
+        assert asset_viz._colormap_atlas(cmaps, nrows=2, ncols=2) is atlas
+
+    def test_atlas_cache_follows_luts(self) -> None:
+        """Test that a re-registered colormap gets a new, bounded entry."""
+        name = "test_atlas_reregistered"
+        atlases = []
+        for colors in (["black", "white"], ["navy", "gold"]):
+            cmap = mcolors.LinearSegmentedColormap.from_list(name, colors)
+            atlases.append(asset_viz._colormap_atlas([cmap], 1, 1))
+
+        left = asset_viz._ATLAS_LABEL_WIDTH
+        np.testing.assert_allclose(
+            atlases[1][-1, left, :3], mcolors.to_rgb("navy")
+        )
+        for n in range(asset_viz._ATLAS_CACHE_SIZE + 1):
+            asset_viz._colormap_atlas([mpl.colormaps["viridis"]], 1, n + 1)
+        assert len(asset_viz._ATLAS_CACHE) == asset_viz._ATLAS_CACHE_SIZE
@@ -0,0 +1,91 @@
+"""Tests for bivariate colormaps."""
+
+import matplotlib.colors as mcolors
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from dartwork_mpl.bivariate import BivariateColormap
+
+
+class TestBivariateColormap:
+    """Tests for construction and application of bivariate colormaps."""
+
+    def test_from_corners(self) -> None:
+        """Test that grid corners reproduce the corner colors."""
+        corners = ["#e8e8e8", "#1f78b4", "#e31a1c", "#3b2a50"]
+        bcmap = BivariateColormap.from_corners(corners, n=5, m=3)
+        expected = mcolors.to_rgba_array(corners)
+
+        assert bcmap.shape == (5, 3)
+        for (i, j), color in zip(
+            [(0, 0), (-1, 0), (0, -1), (-1, -1)], expected, strict=True
+        ):
+            np.testing.assert_allclose(bcmap.colors[i, j], color, atol=1e-6)
+
+    def test_from_cmaps_edges(self) -> None:
+        """Test that the grid edges follow the source colormaps."""
+        bcmap = BivariateColormap.from_cmaps("dm.Blues", "dm.Reds", n=8)
+
+        assert bcmap.name == "dm.Blues+dm.Reds"
+        # Far ends along each axis are dominated by the source colormap.
+        assert bcmap.colors[-1, 0, 2] > bcmap.colors[-1, 0, 0]
+        assert bcmap.colors[0, -1, 0] > bcmap.colors[0, -1, 2]
+
+    def test_apply(self) -> None:
+        """Test index lookup, clipping and bad values."""
+        bcmap = BivariateColormap.from_corners(
+            ["white", "blue", "red", "black"], n=4
+        )
+        lut = (bcmap.colors * 255).astype(np.uint8)
+        x = np.array([0.0, 1.0, 0.5, -5.0, np.nan])
+        y = np.array([0.0, 1.0, 0.9, 0.0, 0.5])
+
+        rgba = bcmap.apply(x, y, xlim=(0, 1), ylim=(0, 1))
+
+        np.testing.assert_array_equal(rgba[0], lut[0, 0])
+        np.testing.assert_array_equal(rgba[1], lut[3, 3])
+        np.testing.assert_array_equal(rgba[2], lut[2, 3])
+        np.testing.assert_array_equal(rgba[3], lut[0, 0])
+        np.testing.assert_array_equal(rgba[4], [0, 0, 0, 0])
+
+    def test_input_stays_writable(self) -> None:
+        """Test that the caller's color array is copied, not frozen."""
+        colors = np.random.default_rng(0).random((3, 3, 4))
+        bcmap = BivariateColormap(colors)
+
+        assert colors.flags.writeable
+        assert not bcmap.colors.flags.writeable
+        colors[0, 0] = 0
+        assert bcmap.colors[0, 0, 0] != 0
+
+    def test_autoscale_ignores_infinities(self) -> None:
+        """Test that ±inf do not enter the automatic limits."""
+        bcmap = BivariateColormap.from_corners(["w", "b", "r", "k"], n=4)
+        x = np.array([0.0, 1.0, np.inf, -np.inf])
+        y = np.array([0.0, 1.0, 0.5, 0.5])
+
+        rgba = bcmap.apply(x, y)
+
+        np.testing.assert_array_equal(
+            rgba[:2], bcmap.apply(x[:2], y[:2], xlim=(0, 1), ylim=(0, 1))
+        )
+        assert (rgba[:, 3] > 0).all()
+
+    def test_apply_shape_mismatch(self) -> None:
+        """Test that mismatched inputs raise ValueError."""
+        bcmap = BivariateColormap.from_corners(["w", "b", "r", "k"])
+        with pytest.raises(ValueError):
+            bcmap.apply(np.zeros(3), np.zeros(4))
+
+    def test_legend(self) -> None:
+        """Test that the legend is a square inset axes."""
+        bcmap = BivariateColormap.from_cmaps("dm.Blues", "dm.Reds")
+        fig, ax = plt.subplots()
+
+        lax = bcmap.legend(ax, xlabel="value", ylabel="uncertainty")
+
+        assert lax.get_box_aspect() == 1
+        assert len(lax.images) == 1
+        assert lax.get_xlabel() == "value"
+        plt.close(fig)
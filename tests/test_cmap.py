@@ -0,0 +1,248 @@
+"""Tests for colormap registration and application helpers."""
+
+from pathlib import Path
+
+import matplotlib as mpl
+import matplotlib.colors as mcolors
+import numpy as np
+import pytest
+
+from dartwork_mpl import cmap as cmap_module
+from dartwork_mpl.cmap import (
+    ControlPointColormap,
+    CyclicNorm,
+    apply_cmap,
+    cmap_lut,
+    discrete_cmap,
+    fit_control_points,
+    map_angles,
+    save_control_points,
+)
+from dartwork_mpl.color import _srgb_to_oklab_array
+
+
+class TestApplyCmap:
+    """Tests for uint8 colormap application."""
+
+    def test_matches_matplotlib(self) -> None:
+        """Test equality with cmap(norm(data), bytes=True)."""
+        rng = np.random.default_rng(0)
+        data = rng.normal(size=(64, 80))
+        data[::7, ::5] = np.nan
+        cmap = mpl.colormaps["dm.vik"].with_extremes(
+            under="black", over="white", bad=(0, 1, 0, 0.5)
+        )
+        expected = cmap(mcolors.Normalize(-1, 1)(data), bytes=True)
+
+        result = apply_cmap(data, cmap, -1, 1, chunk_size=500, workers=3)
+
+        np.testing.assert_array_equal(result, expected)
+
+    def test_float32_and_autoscale(self) -> None:
+        """Test float32 input with vmin/vmax taken from the data."""
+        data = np.linspace(-3, 5, 1000, dtype=np.float32).reshape(10, 100)
+        norm = mcolors.Normalize(data.min(), data.max())
+        expected = mpl.colormaps["viridis"](norm(data), bytes=True)
+
+        np.testing.assert_array_equal(apply_cmap(data, "viridis"), expected)
+
+    def test_autoscale_ignores_infinities(self) -> None:
+        """Test that ±inf do not enter the range and map to under/over."""
+        data = np.array([[-np.inf, 0.0, 1.0], [2.0, np.nan, np.inf]])
+        cmap = mpl.colormaps["dm.vik"].with_extremes(under="k", over="w")
+        expected = cmap(mcolors.Normalize(0, 2)(data), bytes=True)
+
+        result = apply_cmap(data, cmap, chunk_size=3)
+
+        np.testing.assert_array_equal(result, expected)
+        assert len({tuple(c) for c in result[np.isfinite(data)]}) == 3
+
+    def test_masked_values_use_bad_color(self) -> None:
+        """Test that masked values map to the bad color."""
+        data = np.ma.masked_greater(np.linspace(0, 1, 50), 0.8)
+        cmap = mpl.colormaps["dm.Blues"].with_extremes(bad="red")
+        result = apply_cmap(data, cmap, 0, 1)
+
+        assert (result[data.mask] == [255, 0, 0, 255]).all()
+        assert (result[~data.mask] != [255, 0, 0, 255]).any(axis=-1).all()
+
+    def test_rgb_into_memmap(self, tmp_path) -> None:
+        """Test writing RGB output into a memory-mapped array."""
+        data = np.random.default_rng(1).random((40, 30))
+        out = np.lib.format.open_memmap(
+            tmp_path / "out.npy", mode="w+", dtype=np.uint8, shape=(40, 30, 3)
+        )
+
+        result = apply_cmap(data, "dm.vik", 0, 1, out=out, channels=3)
+
+        assert result is out
+        np.testing.assert_array_equal(
+            out, apply_cmap(data, "dm.vik", 0, 1)[..., :3]
+        )
+
+    def test_invalid_out(self) -> None:
+        """Test that a mismatched output array raises ValueError."""
+        with pytest.raises(ValueError):
+            apply_cmap(np.zeros((4, 4)), "viridis", out=np.zeros((4, 4, 3)))
+
+
+class TestControlPointColormap:
+    """Tests for control-point colormaps and LUT synthesis."""
+
+    def test_fit_reproduces_colormap(self) -> None:
+        """Test that fitted control points stay within tolerance."""
+        positions, values = fit_control_points("dm.vik", tol=2e-3)
+        cmap = ControlPointColormap("fit", positions, values)
+        x = np.arange(256)
+
+        error = np.linalg.norm(
+            _srgb_to_oklab_array(cmap(x)[:, :3])
+            - _srgb_to_oklab_array(mpl.colormaps["dm.vik"](x)[:, :3]),
+            axis=-1,
+        )
+
+        assert len(positions) < 64
+        assert error.max() < 3e-3
+
+    def test_resampled_and_memoized(self) -> None:
+        """Test synthesis at other resolutions and LUT memoization."""
+        cmap = ControlPointColormap(
+            "ramp", [0, 1], [[0.3, 0.1, 350], [0.9, 0.1, 10]], space="oklch"
+        )
+        big = cmap.resampled(4096)
+
+        assert big.N == 4096
+        np.testing.assert_allclose(big(0.0), cmap(0.0))
+        cmap_lut(cmap, 4096)
+        n_cached = cmap_module._cached_lut.cache_info().currsize
+        lut = cmap_lut(big, 4096, dtype=np.uint16)
+        assert cmap_module._cached_lut.cache_info().currsize == n_cached
+        assert cmap_module._cached_lut.cache_info().maxsize is not None
+        assert lut.dtype == np.uint16 and lut.shape == (4096, 3)
+
+        # Hue takes the short arc through red rather than through green.
+        mid = _srgb_to_oklab_array(cmap(0.5)[:3])
+        assert mid[1] > 0.05
+
+    def test_file_round_trip(self, tmp_path) -> None:
+        """Test saving and parsing an .okl file, including reversal."""
+        path = save_control_points("dm.vik", tmp_path / "vik.okl")
+        cmap_r = cmap_module._parse_control_points(path, reverse=True)
+        x = np.arange(256)
+
+        assert cmap_r.name == "dm.vik_r"
+        np.testing.assert_allclose(
+            cmap_r(x), mpl.colormaps["dm.vik_r"](x), atol=0.02
+        )
+
+    def test_bundled_control_points(self) -> None:
+        """Test that bundled .okl maps register beside the listed ones."""
+        root = Path(cmap_module.__file__).parent / "asset/cmap"
+        vik = mpl.colormaps["dm.vik"]
+
+        assert (root / "vik.okl").exists() and not (root / "vik.txt").exists()
+        assert isinstance(vik, ControlPointColormap)
+        assert isinstance(vik, mcolors.ListedColormap)
+        assert isinstance(mpl.colormaps["dm.vik_r"], ControlPointColormap)
+        np.testing.assert_allclose(
+            np.asarray(vik.colors), vik(np.arange(vik.N))[:, :3]
+        )
+        assert len(vik.resampled(16).colors) == 16
+        assert isinstance(mpl.colormaps["dm.tab10"], mcolors.ListedColormap)
+        np.testing.assert_allclose(
+            cmap_lut(vik, 4096)[[0, -1]], cmap_lut(vik, 256)[[0, -1]]
+        )
+
+    def test_invalid_control_points(self) -> None:
+        """Test that malformed control points raise ValueError."""
+        with pytest.raises(ValueError):
+            ControlPointColormap("bad", [0, 0.5], [[0.5, 0, 0]] * 2)
+        with pytest.raises(ValueError):
+            ControlPointColormap("bad", [0, 1], [[0.5, 0, 0]] * 2, "hsv")
+
+
+class TestDiscreteCmap:
+    """Tests for the cached discrete colormap factory."""
+
+    def test_cached_and_read_only(self) -> None:
+        """Test that identical requests share one read-only colormap."""
+        cmap, norm = discrete_cmap("dm.vik", 7)
+        again, _ = discrete_cmap("dm.vik", 7)
+
+        assert again is cmap
+        assert norm is None
+        assert cmap.N == 7 and cmap.name == "dm.vik_7"
+        with pytest.raises(ValueError):
+            cmap.set_under("black")
+        np.testing.assert_array_equal(
+            cmap.with_extremes(under="black").get_under(), [0, 0, 0, 1]
+        )
+
+    def test_boundaries_and_extend(self) -> None:
+        """Test BoundaryNorm construction and the default color count."""
+        boundaries = [-2, -1, 0, 1, 2]
+        cmap, norm = discrete_cmap(
+            "dm.vik", boundaries=boundaries, extend="both"
+        )
+        base = mpl.colormaps["dm.vik"]
+
+        assert isinstance(norm, mcolors.BoundaryNorm)
+        assert cmap.N == 6
+        np.testing.assert_allclose(cmap(norm(-3.0)), base(0.0))
+        np.testing.assert_allclose(cmap(norm(3.0)), base(1.0))
+        assert (
+            discrete_cmap(
+                "dm.vik", boundaries=np.array(boundaries), extend="both"
+            )[0]
+            is cmap
+        )
+
+    def test_requires_n_or_boundaries(self) -> None:
+        """Test that a missing size raises ValueError."""
+        with pytest.raises(ValueError):
+            discrete_cmap("dm.vik")
+
+
+class TestCyclic:
+    """Tests for cyclic angle mapping."""
+
+    def test_map_angles_matches_lut_and_wraps(self) -> None:
+        """Test LUT agreement at entry angles and wrapping of any range."""
+        cmap = mpl.colormaps["dm.romaO"]
+        angles = np.arange(cmap.N) / cmap.N * 2 * np.pi
+
+        np.testing.assert_allclose(
+            map_angles(angles, cmap), cmap(np.arange(cmap.N)), atol=1e-12
+        )
+        np.testing.assert_allclose(
+            map_angles(angles + 4 * np.pi, cmap), map_angles(angles, cmap)
+        )
+        np.testing.assert_allclose(
+            map_angles(np.degrees(angles) - 90, cmap, degrees=True, offset=-90),
+            map_angles(angles, cmap),
+            atol=1e-12,
+        )
+
+    def test_seam_is_continuous(self) -> None:
+        """Test that colors just below and above the seam agree."""
+        eps = 1e-9
+        for name in ["dm.romaO", "dm.Phase"]:
+            below, above = map_angles([2 * np.pi - eps, eps], name)
+            np.testing.assert_allclose(below, above, atol=1e-6)
+
+    def test_bad_values_and_bytes(self) -> None:
+        """Test bad colors and uint8 output."""
+        cmap = mpl.colormaps["dm.romaO"].with_extremes(bad="red")
+        result = map_angles([np.nan, 0.0], cmap, bytes=True)
+
+        assert result.dtype == np.uint8
+        np.testing.assert_array_equal(result[0], [255, 0, 0, 255])
+
+    def test_cyclic_norm(self) -> None:
+        """Test angle normalization with offset and masking."""
+        norm = CyclicNorm(degrees=True, offset=-180)
+        result = norm(np.array([-180.0, 0.0, 180.0, 270.0, np.nan]))
+
+        np.testing.assert_allclose(result[:4], [0.0, 0.5, 1.0, 0.25])
+        assert result.mask[4]
+        np.testing.assert_allclose(norm.inverse(0.5), 0.0)
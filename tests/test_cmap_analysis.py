@@ -0,0 +1,145 @@
+"""Tests for colormap perceptual analysis."""
+
+import matplotlib as mpl
+import matplotlib.colors as mcolors
+import numpy as np
+import pytest
+
+from dartwork_mpl.cmap_analysis import (
+    ColormapIndex,
+    analyze_uniformity,
+    colormap_index,
+    uniform_cmap,
+)
+
+
+class TestColormapIndex:
+    """Tests for the colormap feature index."""
+
+    def test_default_index_covers_dm_colormaps(self) -> None:
+        """Test that the shared index holds every dm colormap once."""
+        index = colormap_index()
+
+        assert "dm.vik" in index.names
+        assert "dm.vik_r" in index.names
+        assert len(set(index.names)) == len(index)
+        assert colormap_index() is index
+
+    def test_features_of_gray_ramp(self) -> None:
+        """Test features of a linear gray ramp."""
+        gray = mcolors.LinearSegmentedColormap.from_list(
+            "gray_ramp", ["black", "white"]
+        )
+        features = ColormapIndex.build([gray]).features("gray_ramp")
+
+        assert features["monotonic"]
+        assert not features["monotonic_halves"]
+        assert features["hue_span"] == 0
+        assert features["lightness"][0] < features["lightness"][-1]
+        assert features["cvd_distinctness"] == pytest.approx(1, abs=1e-3)
+
+    def test_query(self) -> None:
+        """Test combined queries against the stored columns."""
+        index = colormap_index()
+        names = index.query(
+            "Diverging", monotonic_halves=True, starts="dark", cvd_safe=True
+        )
+
+        assert names
+        for name in names:
+            features = index.features(name)
+            assert features["category"] == "Diverging"
+            assert features["monotonic_halves"]
+            assert features["lightness"][0] < 0.5
+            assert features["cvd_distinctness"] >= 0.5
+
+        uniformity = [index.features(n)["uniformity"] for n in names]
+        assert uniformity == sorted(uniformity, reverse=True)
+
+    def test_query_invalid_starts(self) -> None:
+        """Test that an unknown starts value raises ValueError."""
+        with pytest.raises(ValueError):
+            colormap_index().query(starts="middle")
+
+    def test_save_load_roundtrip(self, tmp_path) -> None:
+        """Test saving and loading the index."""
+        index = ColormapIndex.build(["dm.vik", "dm.Blues"])
+        path = tmp_path / "index.npz"
+        index.save(path)
+        loaded = ColormapIndex.load(path)
+
+        assert loaded.names.tolist() == index.names.tolist()
+        np.testing.assert_array_equal(loaded.lightness, index.lightness)
+        assert loaded.query("Diverging") == index.query("Diverging")
+
+
+class TestUniformity:
+    """Tests for the uniformity analyzer and corrector."""
+
+    def test_analyze_orders_least_uniform_first(self) -> None:
+        """Test that jet is reported as less uniform than viridis."""
+        report = analyze_uniformity(["viridis", "jet"])
+
+        assert list(report) == ["jet", "viridis"]
+        assert report["jet"]["cv"] > report["viridis"]["cv"]
+        assert report["viridis"]["uniformity"] > 0.9
+
+    def test_analyze_defaults_skip_reversed(self) -> None:
+        """Test that reversed duplicates are skipped by default."""
+        report = analyze_uniformity()
+
+        assert "jet" in report
+        assert not any(name.endswith("_r") for name in report)
+
+    def test_uniform_cmap_equalizes_steps(self) -> None:
+        """Test that the corrected colormap has nearly equal steps."""
+        corrected = uniform_cmap("jet")
+        stats = analyze_uniformity([corrected])[corrected.name]
+
+        assert corrected.name == "dm.jet_uniform"
+        assert stats["cv"] < 0.05
+        assert mpl.colormaps["dm.jet_uniform_r"].N == corrected.N
+
+    def test_uniform_cmap_is_cached(self) -> None:
+        """Test that repeated corrections return the cached colormap."""
+        assert uniform_cmap("dm.Blues3") is uniform_cmap("dm.Blues3")
+        assert uniform_cmap("dm.Blues3").name == "dm.Blues3_uniform"
+
+    def test_uniform_cmap_registers_cached(self) -> None:
+        """Test that a map first built unregistered is registered later."""
+        name = "dm.test_late_uniform"
+        mpl.colormaps.register(
+            mcolors.LinearSegmentedColormap.from_list(name, ["navy", "gold"])
+        )
+        corrected = uniform_cmap(name, register=False)
+        assert f"{name}_uniform" not in mpl.colormaps
+
+        assert uniform_cmap(name) is corrected
+        assert mpl.colormaps[f"{name}_uniform"] == corrected
+        assert f"{name}_uniform_r" in mpl.colormaps
+        for registered in (name, f"{name}_uniform", f"{name}_uniform_r"):
+            mpl.colormaps.unregister(registered)
+
+    def test_uniform_cmap_follows_reregistration(self) -> None:
+        """Test that a colormap re-registered under its name is redone."""
+        name = "dm.test_reregistered"
+        for colors in (["black", "white"], ["navy", "gold"]):
+            mpl.colormaps.register(
+                mcolors.LinearSegmentedColormap.from_list(name, colors)
+            )
+            corrected = uniform_cmap(name, register=False)
+            mpl.colormaps.unregister(name)
+            np.testing.assert_allclose(
+                corrected(1.0), mcolors.to_rgba(colors[-1]), atol=1e-3
+            )
+
+    def test_uniform_cmap_keeps_endpoints(self) -> None:
+        """Test that the corrected colormap keeps its end colors."""
+        corrected = uniform_cmap("viridis", register=False)
+
+        np.testing.assert_allclose(
+            corrected(0.0), mpl.colormaps["viridis"](0.0), atol=1e-3
+        )
+        np.testing.assert_allclose(
+            corrected(1.0), mpl.colormaps["viridis"](1.0), atol=1e-3
+        )
@@ -0,0 +1,343 @@
+"""Tests for multi-format figure export and SVG display."""
+
+import multiprocessing
+import re
+import subprocess
+import sys
+import textwrap
+from io import BytesIO
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.ticker import FuncFormatter
+from PIL import Image
+
+import dartwork_mpl as dm
+from dartwork_mpl import util
+from dartwork_mpl.export import _artist_vertices, _figure_vertices
+
+
+def _figure() -> tuple:
+    """Create a small figure with a scatter, a line and a math title."""
+    fig, ax = plt.subplots(figsize=(3, 2), dpi=100)
+    x, y = np.random.default_rng(0).random((2, 500))
+    ax.scatter(x, y, s=2)
+    ax.plot(np.sort(x), y)
+    ax.set_title("Title $x^2$")
+    return fig, ax
+
+
+def _svg_size(path) -> tuple[float, float]:
+    """Return the width and height of an SVG file in points."""
+    text = path.read_text()
+    width = re.search(r'width="([\d.]+)pt"', text).group(1)
+    height = re.search(r'height="([\d.]+)pt"', text).group(1)
+    return float(width), float(height)
+
+
+class TestSaveFormats:
+    """Tests for save_formats."""
+
+    def test_writes_every_format(self, tmp_path) -> None:
+        """Test that one file is written per format, in nested folders."""
+        fig, _ = _figure()
+        stem = tmp_path / "out" / "figure"
+        dm.save_formats(fig, str(stem), max_workers=0)
+
+        for fmt in ("svg", "png", "pdf", "eps"):
+            assert (tmp_path / "out" / f"figure.{fmt}").stat().st_size > 0
+        plt.close(fig)
+
+    def test_workers_match_sequential(self, tmp_path) -> None:
+        """Test that worker processes write the same files."""
+        fig, _ = _figure()
+        dm.save_formats(
+            fig, str(tmp_path / "seq"), ("svg", "png", "pdf"), max_workers=0
+        )
+        dm.save_formats(
+            fig, str(tmp_path / "par"), ("svg", "png", "pdf"), max_workers=2
+        )
+
+        seq_svg = (tmp_path / "seq.svg").read_text()
+        par_svg = (tmp_path / "par.svg").read_text()
+        # Only the embedded date differs.
+        assert len(seq_svg) == len(par_svg)
+        assert (tmp_path / "seq.png").read_bytes() == (
+            tmp_path / "par.png"
+        ).read_bytes()
+        plt.close(fig)
+
+    def test_workers_use_rcparams(self, tmp_path, monkeypatch) -> None:
+        """Test that spawned workers save under the caller's rcParams."""
+        spawn = multiprocessing.get_context("spawn")
+        monkeypatch.setattr(multiprocessing, "get_context", lambda: spawn)
+        fig, _ = _figure()
+        with mpl.rc_context({"svg.fonttype": "none"}):
+            dm.save_formats(
+                fig, str(tmp_path / "f"), ("svg", "pdf"), max_workers=2
+            )
+
+        assert "<text" in (tmp_path / "f.svg").read_text()
+        plt.close(fig)
+
+    def test_unguarded_spawn_script(self, tmp_path) -> None:
+        """Test that a script without a main guard saves sequentially."""
+        script = tmp_path / "plot.py"
+        script.write_text(
+            textwrap.dedent(
+                f"""
+                import multiprocessing
+                import os
+                import matplotlib.pyplot as plt
+                import numpy as np
+                import dartwork_mpl as dm
+
+                multiprocessing.set_start_method("spawn")
+                # Workers would be used by default with several CPUs.
+                os.cpu_count = lambda: 4
+                print("run")
+                fig, ax = plt.subplots()
+                ax.scatter(*np.random.default_rng(0).random((2, 30_000)))
+                dm.save_formats(fig, {str(tmp_path / "f")!r}, ("svg", "pdf"))
+                """
+            )
+        )
+        result = subprocess.run(
+            [sys.executable, str(script)],
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "run\n"
+        assert (tmp_path / "f.pdf").exists()
+
+    def test_tight_box_shared(self, tmp_path) -> None:
+        """Test that a tight box gives every format the same extent."""
+        fig, _ = _figure()
+        dm.save_formats(
+            fig, str(tmp_path / "f"), ("svg", "png"), bbox_inches="tight"
+        )
+
+        width, height = _svg_size(tmp_path / "f.svg")
+        with Image.open(tmp_path / "f.png") as image:
+            size = np.array(image.size)
+        np.testing.assert_allclose(
+            size, np.array([width, height]) * 100 / 72, atol=1
+        )
+        assert width < 3 * 72
+        plt.close(fig)
+
+    def test_unpicklable_figure(self, tmp_path) -> None:
+        """Test that figures that cannot be pickled are saved in-process."""
+        fig, ax = _figure()
+        ax.xaxis.set_major_formatter(FuncFormatter(lambda v, _: f"{v:.1f}"))
+        dm.save_formats(fig, str(tmp_path / "f"), ("svg", "pdf"), max_workers=2)
+
+        assert (tmp_path / "f.svg").exists()
+        assert (tmp_path / "f.pdf").exists()
+        plt.close(fig)
+
+
+class TestFigureVertices:
+    """Tests for the drawn vertex estimate."""
+
+    def test_counts_markers_and_lines(self) -> None:
+        """Test that markers count once per offset and lines per point."""
+        fig, ax = plt.subplots()
+        scatter = ax.scatter(np.arange(1000), np.arange(1000), marker="s")
+        (line,) = ax.plot(np.arange(500))
+
+        # A square marker path has 5 vertices.
+        assert _artist_vertices(scatter) == 1000 * 5
+        assert _artist_vertices(line) == 500
+        assert _figure_vertices(fig) > 1000 * 5 + 500
+        plt.close(fig)
+
+
+class TestExportBytes:
+    """Tests for in-memory export."""
+
+    def test_encoded_formats(self) -> None:
+        """Test that each format is returned as encoded bytes."""
+        fig, _ = _figure()
+        files = dm.export_bytes(fig, ("svg", "png", "pdf"))
+
+        assert files["svg"].startswith(b"<?xml")
+        assert files["png"].startswith(b"\x89PNG")
+        assert files["pdf"].startswith(b"%PDF")
+        plt.close(fig)
+
+    def test_rgba_view(self) -> None:
+        """Test that the raw buffer is a shaped view of the rendered pixels."""
+        fig, _ = _figure()
+        files = dm.export_bytes(fig, ("png", "rgba"), dpi=50)
+
+        pixels = np.asarray(files["rgba"])
+        assert isinstance(files["rgba"], memoryview)
+        assert pixels.shape == (100, 150, 4)
+        with Image.open(BytesIO(files["png"])) as image:
+            np.testing.assert_array_equal(np.asarray(image), pixels)
+        plt.close(fig)
+
+    def test_rgba_survives_redraw(self) -> None:
+        """Test that drawing the figure again leaves the raw pixels alone."""
+        fig, ax = _figure()
+        files = dm.export_bytes(fig, ("rgba",))
+        before = np.asarray(files["rgba"]).copy()
+
+        ax.set_facecolor("black")
+        fig.canvas.draw()
+        dm.export_bytes(fig, ("rgba",))
+
+        np.testing.assert_array_equal(np.asarray(files["rgba"]), before)
+        plt.close(fig)
+
+    def test_workers_return_bytes(self) -> None:
+        """Test that worker processes hand their files back in memory."""
+        fig, _ = _figure()
+        seq = dm.export_bytes(fig, ("svg", "pdf"), max_workers=0)
+        par = dm.export_bytes(fig, ("svg", "pdf"), max_workers=2)
+
+        assert len(seq["svg"]) == len(par["svg"])
+        assert par["pdf"].startswith(b"%PDF")
+        plt.close(fig)
+
+    def test_save_and_show_in_memory(self, monkeypatch, tmp_path) -> None:
+        """Test that save_and_show without a path writes no file."""
+        shown = []
+        monkeypatch.setattr(util, "display", shown.append)
+        monkeypatch.chdir(tmp_path)
+        fig, _ = _figure()
+        dm.save_and_show(fig, size=300)
+
+        assert 'width="300pt"' in shown[0].data
+        assert list(tmp_path.iterdir()) == []
+        assert not plt.fignum_exists(fig.number)
+
+
+class TestShow:
+    """Tests for SVG display and resizing."""
+
+    def test_resize_root_only(self) -> None:
+        """Test that only the root size changes and the prolog is dropped."""
+        fig, _ = _figure()
+        svg = dm.export_bytes(fig, ("svg",))["svg"].decode()
+        resized = util._resize_svg(svg, 300)
+
+        head = resized[: resized.index(">") + 1]
+        assert resized.startswith("<svg")
+        assert 'width="300pt"' in head
+        assert 'height="200pt"' in head
+        root_end = svg.index(">", svg.index("<svg")) + 1
+        assert resized[len(head) :] == svg[root_end:]
+        plt.close(fig)
+
+    def test_resize_quotes_and_viewbox(self) -> None:
+        """Test single-quoted sizes and SVGs sized only by a viewBox."""
+        quoted = "<svg width='40px' height='10px'><path d='M0 0'/></svg>"
+        assert util._resize_svg(quoted, 80, "px").startswith(
+            "<svg width='80px' height='20px'>"
+        )
+        boxed = '<svg viewBox="0 0 40 30"><rect width="5"/></svg>'
+        assert util._resize_svg(boxed, 8, "in") == (
+            '<svg width="8in" height="6in" viewBox="0 0 40 30">'
+            '<rect width="5"/></svg>'
+        )
+
+    def test_accepts_bytes_and_paths(self, monkeypatch, tmp_path) -> None:
+        """Test that show takes bytes, SVG text and file paths alike."""
+        shown = []
+        monkeypatch.setattr(
+            util, "display", lambda html: shown.append(html.data)
+        )
+        svg = '<?xml version="1.0"?>\n<svg width="10pt" height="5pt"></svg>'
+        path = tmp_path / "f.svg"
+        path.write_text(svg)
+
+        dm.show(svg.encode(), size=20)
+        dm.show(svg, size=20)
+        dm.show(str(path), size=20)
+        dm.show(path, size=20)
+
+        assert set(shown) == {'<svg width="20pt" height="10pt"></svg>'}
+
+
+class TestRasterize:
+    """Tests for automatic rasterization of heavy artists."""
+
+    def _heavy(self) -> tuple:
+        """Create a figure with a heavy scatter and a light line."""
+        fig, ax = plt.subplots(figsize=(3, 2), dpi=100)
+        x, y = np.random.default_rng(0).random((2, 20000))
+        scatter = ax.scatter(x, y, s=1, label="points")
+        (line,) = ax.plot([0, 1], [0, 1])
+        return fig, scatter, line
+
+    def test_rasterizes_heavy_artists(self, tmp_path) -> None:
+        """Test that only heavy artists are embedded as images."""
+        fig, scatter, line = self._heavy()
+        report = dm.save_formats(
+            fig, str(tmp_path / "f"), ("svg", "png"), rasterize=10_000
+        )
+
+        assert [artist for artist, _ in report.artists] == [scatter]
+        assert set(report.sizes) == {"svg"}
+        svg = (tmp_path / "f.svg").read_text()
+        assert svg.count("<image") == 1
+        assert "PathCollection 'points'" in report.summary()
+        assert not scatter.get_rasterized()
+        assert not line.get_rasterized()
+        plt.close(fig)
+
+    def test_compare_sizes(self, tmp_path) -> None:
+        """Test that the baseline measures the all-vector files."""
+        fig, _, _ = self._heavy()
+        report = dm.save_formats(
+            fig,
+            str(tmp_path / "f"),
+            ("svg", "pdf"),
+            rasterize=10_000,
+            compare_sizes=True,
+        )
+
+        for fmt in ("svg", "pdf"):
+            assert report.sizes[fmt] == (tmp_path / f"f.{fmt}").stat().st_size
+            assert report.baseline[fmt] > 5 * report.sizes[fmt]
+        assert "->" in report.summary()
+        plt.close(fig)
+
+    def test_raster_dpi(self, tmp_path) -> None:
+        """Test that raster_dpi sets the resolution of the embedded image."""
+        fig, _, _ = self._heavy()
+        low = dm.save_formats(
+            fig,
+            str(tmp_path / "low"),
+            ("pdf",),
+            rasterize=10_000,
+            raster_dpi=50,
+        )
+        high = dm.save_formats(
+            fig,
+            str(tmp_path / "high"),
+            ("pdf",),
+            rasterize=10_000,
+            raster_dpi=300,
+        )
+
+        assert high.sizes["pdf"] > low.sizes["pdf"]
+        plt.close(fig)
+
+    def test_light_figure(self, tmp_path) -> None:
+        """Test that light figures stay vector and need no report."""
+        fig, _ = _figure()
+        assert dm.save_formats(fig, str(tmp_path / "f"), ("svg",)) is None
+        report = dm.save_formats(
+            fig, str(tmp_path / "f"), ("svg",), rasterize=100_000
+        )
+
+        assert report.artists == []
+        assert "<image" not in (tmp_path / "f.svg").read_text()
+        plt.close(fig)
@@ -0,0 +1,174 @@
+"""Tests for the content-addressed figure cache."""
+
+import functools
+import os
+
+import matplotlib as mpl
+import matplotlib.colors as mcolors
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from dartwork_mpl import FigureCache
+
+CALLS: list[int] = []
+
+
+def _plot(y: np.ndarray, title: str = "") -> plt.Figure:
+    """Plot a line and record the call."""
+    CALLS.append(len(y))
+    fig, ax = plt.subplots(figsize=(2, 1.5))
+    ax.plot(y)
+    ax.set_title(title)
+    return fig
+
+
+class TestFigureCache:
+    """Tests for FigureCache."""
+
+    def test_hit_skips_plotting(self, tmp_path) -> None:
+        """Test that a repeated export copies the cached files."""
+        cache = FigureCache(tmp_path / "cache")
+        y = np.arange(10.0)
+        CALLS.clear()
+
+        assert not cache.save_formats(
+            _plot, tmp_path / "a", ("svg", "png"), plot_args=(y,)
+        )
+        assert cache.save_formats(
+            _plot, tmp_path / "b", ("svg", "png"), plot_args=(y,)
+        )
+
+        assert CALLS == [10]
+        for fmt in ("svg", "png"):
+            a = (tmp_path / f"a.{fmt}").read_bytes()
+            assert a == (tmp_path / f"b.{fmt}").read_bytes()
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_key_tracks_inputs(self, tmp_path) -> None:
+        """Test that data, arguments and rcParams all change the key."""
+        cache = FigureCache(tmp_path)
+        y = np.arange(10.0)
+        base = cache.key(_plot, (y,), {"title": "A"})
+
+        assert cache.key(_plot, (y.copy(),), {"title": "A"}) == base
+        assert cache.key(_plot, (y,), {"title": "B"}) != base
+        assert cache.key(_plot, (y[::-1],), {"title": "A"}) != base
+        assert cache.key(_plot, (y.astype(np.float32),), {"title": "A"}) != base
+        assert cache.key(_plot, (y,), {"title": "A"}, dpi=300) != base
+        with mpl.rc_context({"lines.linewidth": 3}):
+            assert cache.key(_plot, (y,), {"title": "A"}) != base
+
+        y[0] = 1
+        assert cache.key(_plot, (y,), {"title": "A"}) != base
+
+    def test_unhashable_argument(self, tmp_path) -> None:
+        """Test that arguments without a stable hash are rejected."""
+        cache = FigureCache(tmp_path)
+        with pytest.raises(TypeError, match="Cannot hash"):
+            cache.key(_plot, (object(),))
+
+    def test_failed_save_leaves_no_files(self, tmp_path) -> None:
+        """Test that a failing export removes its temporary directory."""
+        cache = FigureCache(tmp_path / "cache")
+        with pytest.raises(ValueError):
+            cache.save_formats(
+                _plot, tmp_path / "a", ("unknown",), plot_args=(np.ones(3),)
+            )
+
+        assert list((tmp_path / "cache").iterdir()) == []
+
+    def test_callable_arguments(self, tmp_path) -> None:
+        """Test that colormaps, norms and partials are hashed by state."""
+        cache = FigureCache(tmp_path)
+
+        def key(value: object) -> str:
+            return cache.key(_plot, (value,))
+
+        assert key(mcolors.Normalize(0, 1)) == key(mcolors.Normalize(0, 1))
+        assert key(mcolors.Normalize(0, 1)) != key(mcolors.Normalize(0, 500))
+        assert key(mcolors.LogNorm(1, 10)) != key(mcolors.Normalize(1, 10))
+        assert key(mcolors.ListedColormap(["red", "blue"])) != key(
+            mcolors.ListedColormap(["red", "green"])
+        )
+        assert key(functools.partial(_plot, title="A")) != key(
+            functools.partial(_plot, title="B")
+        )
+        assert key(np.log) != key(np.exp)
+
+    def test_unhashable_callable(self, tmp_path) -> None:
+        """Test that callables without a known state are rejected."""
+        cache = FigureCache(tmp_path)
+
+        class Transform:
+            def __call__(self, x: float) -> float:
+                return x
+
+        with pytest.raises(TypeError, match="Cannot hash"):
+            cache.key(_plot, (Transform(),))
+
+    def test_persists_and_links(self, tmp_path) -> None:
+        """Test that a new instance reuses entries and can hard-link them."""
+        y = np.arange(5.0)
+        FigureCache(tmp_path / "cache").save_formats(
+            _plot, tmp_path / "a", ("svg",), plot_args=(y,)
+        )
+        cache = FigureCache(tmp_path / "cache", link=True)
+
+        assert cache.save_formats(
+            _plot, tmp_path / "b", ("svg",), plot_args=(y,)
+        )
+        entry = tmp_path / "cache" / cache.key(_plot, (y,), formats=("svg",))
+        assert os.path.samefile(tmp_path / "b.svg", entry / "figure.svg")
+
+    def test_evicts_least_recently_used(self, tmp_path) -> None:
+        """Test that the oldest entries are removed beyond max_bytes."""
+        cache = FigureCache(tmp_path / "cache", max_bytes=0)
+        for n in (3, 4):
+            cache.save_formats(
+                _plot, tmp_path / "f", ("png",), plot_args=(np.ones(n),)
+            )
+            assert len(cache) == 0
+
+        cache.max_bytes = 10**9
+        for n in (3, 4, 5):
+            cache.save_formats(
+                _plot, tmp_path / "f", ("png",), plot_args=(np.ones(n),)
+            )
+        cache.save_formats(
+            _plot, tmp_path / "f", ("png",), plot_args=(np.ones(3),)
+        )
+        sizes = {k: size for k, (size, _) in cache._entries().items()}
+        cache.max_bytes = sum(sizes.values()) - 1
+        cache._evict()
+
+        remaining = {
+            cache.key(_plot, (np.ones(n),), formats=("png",)) for n in (3, 5)
+        }
+        assert set(cache._entries()) == remaining
+        assert sorted(os.listdir(tmp_path / "cache")) == sorted(remaining)
+
+    def test_clear(self, tmp_path) -> None:
+        """Test that clear removes entries and resets the statistics."""
+        cache = FigureCache(tmp_path / "cache")
+        cache.save_formats(
+            _plot, tmp_path / "f", ("svg",), plot_args=(np.ones(3),)
+        )
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.stats()["misses"] == 0
+        assert os.listdir(tmp_path / "cache") == []
+
+    def test_rasterize_option(self, tmp_path) -> None:
+        """Test that save_formats options such as rasterize are honored."""
+        cache = FigureCache(tmp_path / "cache")
+        cache.save_formats(
+            _plot,
+            tmp_path / "f",
+            ("svg",),
+            plot_args=(np.arange(1000.0),),
+            rasterize=100,
+        )
+
+        assert "<image" in (tmp_path / "f.svg").read_text()
@@ -0,0 +1,528 @@
+"""Tests for the fast layout engine."""
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+from matplotlib.text import Text
+from scipy.optimize import OptimizeResult
+
+from dartwork_mpl import simple_layout
+from dartwork_mpl.layout import (
+    LayoutStats,
+    LayoutTemplate,
+    TextExtentCache,
+    _layout_axes,
+    _measure,
+    _residuals,
+    add_layout_hook,
+    align_layout,
+    fast_layout,
+    joint_layout,
+    layout_fingerprint,
+    remove_layout_hook,
+    template_layout,
+)
+
+
+def _labeled_grid(
+    nrows: int = 2, ncols: int = 2, ylabel: str = "y label"
+) -> tuple:
+    """Create a figure with labeled axes on one GridSpec."""
+    fig = plt.figure(figsize=(6, 4), dpi=100)
+    gs = fig.add_gridspec(nrows, ncols)
+    for i in range(nrows):
+        for j in range(ncols):
+            ax = fig.add_subplot(gs[i, j])
+            ax.plot([0, 1000], [0, 1000])
+            ax.set_title("Title")
+            ax.set_xlabel("x label")
+            ax.set_ylabel(ylabel)
+    return fig, gs
+
+
+def _edge_residuals(fig, gs, margins, use_all_axes=True) -> np.ndarray:
+    """Return the pixel residuals of the union of tight boxes."""
+    axes, _ = _layout_axes(fig, gs, use_all_axes)
+    _, tight = _measure(fig, axes)
+    pad = np.asarray(margins) * fig.dpi
+    targets = np.array(
+        [pad[0], fig.bbox.width - pad[1], pad[2], fig.bbox.height - pad[3]]
+    )
+    return _residuals(tight, targets)
+
+
+class TestFastLayout:
+    """Tests for fast_layout."""
+
+    def test_meets_targets(self) -> None:
+        """Test that the decorations end exactly at the margins."""
+        fig, gs = _labeled_grid()
+        margins = (0.1, 0.05, 0.08, 0.02)
+
+        result = fast_layout(fig, gs, margins=margins)
+
+        assert isinstance(result, OptimizeResult)
+        assert result.success
+        assert result.nfev <= 4
+        np.testing.assert_allclose(
+            _edge_residuals(fig, gs, margins), 0, atol=0.5 * 100 / 72
+        )
+        np.testing.assert_allclose(
+            result.x, [gs.left, gs.right, gs.bottom, gs.top]
+        )
+        plt.close(fig)
+
+    def test_nested_gridspec_and_plain_figure(self) -> None:
+        """Test nested grid specs on a figure not managed by pyplot."""
+        fig = Figure(figsize=(6, 4), dpi=100)
+        gs = fig.add_gridspec(1, 2)
+        inner = gs[0, 1].subgridspec(2, 1)
+        fig.add_subplot(gs[0, 0]).set_ylabel("left")
+        fig.add_subplot(inner[0]).set_title("top")
+        fig.add_subplot(inner[1]).set_xlabel("bottom")
+
+        result = fast_layout(fig, gs)
+
+        assert result.success
+        np.testing.assert_allclose(
+            _edge_residuals(fig, gs, (0.05,) * 4), 0, atol=0.5 * 100 / 72
+        )
+
+    def test_bounds_and_other_axes(self) -> None:
+        """Test that margins stay in bounds and other axes can be ignored."""
+        fig, gs = _labeled_grid(1, 1)
+        corner = fig.add_gridspec(1, 1, left=0, right=0.1, bottom=0, top=0.1)
+        fig.add_subplot(corner[0])
+
+        # The axes of the other GridSpec fix the bottom-left corner of the
+        # union box.
+        blocked = fast_layout(fig, gs, bound_margin=0.3)
+        assert not blocked.success
+        assert 0.0 <= blocked.x[0] <= 0.3 and 0.0 <= blocked.x[2] <= 0.3
+
+        result = fast_layout(fig, gs, bound_margin=0.3, use_all_axes=False)
+        assert result.success
+        plt.close(fig)
+
+    def test_figure_level_artists(self) -> None:
+        """Test that figure texts, legends and a fixed cax bound the grid."""
+        fig, gs = _labeled_grid(1, 2)
+        fig.suptitle("Suptitle")
+        legend = fig.legend(["a", "b"], loc="lower center", ncols=2)
+        cax = fig.add_axes((0.9, 0.2, 0.02, 0.6))
+        fig.colorbar(fig.axes[0].pcolormesh(np.eye(2)), cax=cax)
+        axes = fig.axes[:2]
+
+        for layout, kwargs in (
+            (fast_layout, {}),
+            (simple_layout, {"use_all_axes": False}),
+        ):
+            result = layout(fig, gs, **kwargs)
+            assert result.success
+
+            renderer = fig._get_renderer()
+            _, tight = _measure(fig, axes)
+            top = fig._suptitle.get_window_extent(renderer).y0
+            bottom = legend.get_window_extent(renderer).y1
+            right = cax.get_tightbbox(renderer).x0
+            gaps = np.array(
+                [
+                    top - tight[:, 3].max(),
+                    tight[:, 2].min() - bottom,
+                    right - tight[:, 1].max(),
+                ]
+            )
+            # 0.05 inch margins at 100 dpi; simple_layout is approximate.
+            np.testing.assert_allclose(gaps, 5, atol=3)
+        plt.close(fig)
+
+    def test_colorbar_nested_gridspec(self) -> None:
+        """Test the default GridSpec when a colorbar steals space."""
+        fig, gs = _labeled_grid(1, 2)
+        mesh = fig.axes[0].pcolormesh(np.eye(2))
+        fig.colorbar(mesh, ax=fig.axes[0])
+
+        result = fast_layout(fig)
+
+        assert result.success
+        np.testing.assert_allclose(
+            _edge_residuals(fig, gs, (0.05,) * 4), 0, atol=0.5 * 100 / 72
+        )
+        plt.close(fig)
+
+    def test_solves_spacing(self) -> None:
+        """Test that wspace and hspace are solved with the margins."""
+        fig, gs = _labeled_grid(3, 3)
+
+        result = fast_layout(fig, gs, spacing=(0.1, 0.2))
+
+        assert result.success and result.nfev <= 4
+        assert result.residuals.shape == (6,)
+        assert (result.wspace, result.hspace) == (gs.wspace, gs.hspace)
+        np.testing.assert_allclose(
+            _edge_residuals(fig, gs, (0.05,) * 4), 0, atol=0.5 * 100 / 72
+        )
+        axes, _ = _layout_axes(fig, gs, True)
+        _, tight = _measure(fig, axes)
+        tight = tight.reshape(3, 3, 4) / fig.dpi
+        # Narrowest gaps between neighboring columns and rows.
+        wgap = (tight[:, 1:, 0] - tight[:, :-1, 1]).min()
+        hgap = (tight[:-1, :, 2] - tight[1:, :, 3]).min()
+        np.testing.assert_allclose([wgap, hgap], [0.1, 0.2], atol=0.01)
+        plt.close(fig)
+
+
+class TestSimpleLayout:
+    """Tests for simple_layout."""
+
+    def test_previous_targets(self) -> None:
+        """Test that width and height subtract twice the right/top margin."""
+        fig, gs = _labeled_grid()
+        margins = (0.05, 0.3, 0.05, 0.3)
+
+        result = simple_layout(fig, gs, margins=margins)
+
+        assert result.success
+        _, tight = _measure(fig, fig.axes)
+        union = [
+            tight[:, 0].min(),
+            tight[:, 1].max(),
+            tight[:, 2].min(),
+            tight[:, 3].max(),
+        ]
+        # 100 dpi: x0 = 5, width = 600 - 2 * 30, y0 = 5, height = 400 - 2 * 30.
+        np.testing.assert_allclose(union, [5, 545, 5, 345], atol=3)
+        plt.close(fig)
+
+    def test_use_all_axes_fits_fixed_axes(self) -> None:
+        """Test that axes from add_axes are fitted, not avoided, by default."""
+        fig, gs = _labeled_grid(1, 2)
+        cax = fig.add_axes((0.9, 0.2, 0.02, 0.6))
+        fig.colorbar(fig.axes[0].pcolormesh(np.eye(2)), cax=cax)
+        renderer = fig._get_renderer()
+
+        rights = []
+        for use_all_axes in (True, False):
+            assert simple_layout(fig, gs, use_all_axes=use_all_axes).success
+            _, tight = _measure(fig, fig.axes[:2])
+            rights.append(tight[:, 1].max() - cax.get_tightbbox(renderer).x0)
+
+        # The cax is part of the fitted box, so the grid may reach into it;
+        # as a constraint it keeps the 5 px margin.
+        assert rights[0] > 0
+        np.testing.assert_allclose(rights[1], -5, atol=3)
+        plt.close(fig)
+
+
+class TestTextExtentCache:
+    """Tests for the text extent cache."""
+
+    def test_identical_extents_and_hits(self) -> None:
+        """Test that cached extents match and repeated passes hit."""
+        fig, gs = _labeled_grid()
+        axes, _ = _layout_axes(fig, gs, True)
+        _, expected = _measure(fig, axes)
+
+        original = Text._get_layout
+        with TextExtentCache() as cache:
+            _, first = _measure(fig, axes)
+            misses = cache.misses
+            _, second = _measure(fig, axes)
+
+        assert Text._get_layout is original
+        np.testing.assert_array_equal(first, expected)
+        np.testing.assert_array_equal(second, expected)
+        assert cache.misses == misses
+        assert cache.stats()["hit_rate"] > 0.5
+        plt.close(fig)
+
+    def test_wrapped_text_not_cached(self) -> None:
+        """Test that wrapped texts bypass the cache."""
+        fig, ax = plt.subplots()
+        text = ax.text(0.5, 0.5, "a long wrapped label " * 10, wrap=True)
+        renderer = fig._get_renderer()
+
+        with TextExtentCache() as cache:
+            text.get_window_extent(renderer)
+
+        assert len(cache) == 0
+        plt.close(fig)
+
+    def test_layout_results_unchanged(self) -> None:
+        """Test that layouts agree with and without the cache."""
+        results = []
+        for text_cache in (False, None):
+            fig, gs = _labeled_grid()
+            results.append(simple_layout(fig, gs, text_cache=text_cache))
+            plt.close(fig)
+
+        np.testing.assert_allclose(results[0].x, results[1].x)
+        assert results[0].text_cache is None
+        assert results[1].text_cache["hits"] > 0
+
+    def test_shared_cache_across_figures(self) -> None:
+        """Test that a shared cache only misses on the first figure."""
+        cache = TextExtentCache()
+        for _ in range(2):
+            fig, gs = _labeled_grid()
+            fast_layout(fig, gs, text_cache=cache)
+            plt.close(fig)
+            misses = cache.misses
+
+        assert fast_layout(*_labeled_grid(), text_cache=cache).success
+        assert cache.misses == misses
+
+
+class TestLayoutTemplate:
+    """Tests for layout templates."""
+
+    def test_apply_with_single_check(self, tmp_path) -> None:
+        """Test that a saved template lays out a new figure in one pass."""
+        fig, gs = _labeled_grid()
+        template = LayoutTemplate.capture(fig, gs, margins=(0.1,) * 4)
+        template.save(tmp_path / "layout.json")
+        plt.close(fig)
+
+        other, other_gs = _labeled_grid()
+        loaded = LayoutTemplate.load(tmp_path / "layout.json")
+        result = loaded.apply(other, other_gs)
+
+        assert result.template_applied and result.nfev == 1
+        np.testing.assert_allclose(
+            [other_gs.left, other_gs.right, other_gs.bottom, other_gs.top],
+            template.margins,
+        )
+        plt.close(other)
+
+    def test_apply_reports_stats(self) -> None:
+        """Test that applying a template reports its single measurement."""
+        fig, gs = _labeled_grid()
+        template = LayoutTemplate.capture(fig, gs)
+        plt.close(fig)
+
+        records = []
+        hook = add_layout_hook(records.append)
+        other, other_gs = _labeled_grid()
+        try:
+            result = template.apply(other, other_gs)
+        finally:
+            remove_layout_hook(hook)
+
+        assert result.template_applied
+        assert records == [result.stats]
+        assert result.stats.engine == "LayoutTemplate.apply"
+        assert result.stats.nfev == 1
+        assert result.stats.tightbbox_calls == len(other.axes)
+        assert result.stats.residuals is not None
+        plt.close(other)
+
+    def test_fallback_on_overflow(self) -> None:
+        """Test that longer labels trigger a full layout."""
+        fig, gs = _labeled_grid()
+        template = LayoutTemplate.capture(fig, gs)
+        plt.close(fig)
+
+        other, other_gs = _labeled_grid(ylabel="a much longer\ny label")
+        assert layout_fingerprint(other, other_gs) == template.fingerprint
+
+        result = template.apply(other, other_gs)
+
+        assert not result.template_applied
+        assert result.success
+        assert other_gs.left > template.margins[0]
+        plt.close(other)
+
+    def test_fingerprint_mismatch(self) -> None:
+        """Test that a different grid shape is not laid out by the template."""
+        fig, gs = _labeled_grid()
+        template = LayoutTemplate.capture(fig, gs)
+        other, other_gs = _labeled_grid(1, 3)
+
+        result = template.apply(other, other_gs, fallback=False)
+
+        assert not result.success and result.nfev == 0
+        plt.close(fig)
+        plt.close(other)
+
+    def test_template_layout_creates_then_applies(self, tmp_path) -> None:
+        """Test that template_layout writes the template on first use."""
+        path = tmp_path / "panel.json"
+        results = []
+        for _ in range(2):
+            fig, gs = _labeled_grid()
+            results.append(template_layout(fig, path))
+            plt.close(fig)
+
+        assert path.exists()
+        assert not results[0].template_applied
+        assert results[1].template_applied
+
+    def test_template_with_spacing(self) -> None:
+        """Test that solved wspace/hspace are stored and reapplied."""
+        fig, gs = _labeled_grid()
+        template = LayoutTemplate.capture(fig, gs, spacing=0.1)
+        plt.close(fig)
+
+        other, other_gs = _labeled_grid()
+        result = LayoutTemplate.from_dict(template.to_dict()).apply(
+            other, other_gs
+        )
+
+        assert result.template_applied
+        np.testing.assert_allclose(
+            [other_gs.wspace, other_gs.hspace], template.spaces
+        )
+        plt.close(other)
+
+
+class TestJointLayout:
+    """Tests for the joint multi-GridSpec solver."""
+
+    def test_side_by_side_gridspecs(self) -> None:
+        """Test outer margins and the gap between two GridSpecs."""
+        fig = plt.figure(figsize=(7, 3), dpi=100)
+        left = fig.add_gridspec(2, 1, right=0.45)
+        right = fig.add_gridspec(1, 2, left=0.55)
+        axs = [fig.add_subplot(left[i]) for i in range(2)]
+        axs += [fig.add_subplot(right[i]) for i in range(2)]
+        for ax in axs:
+            ax.set_title("Title")
+            ax.set_ylabel("y label")
+
+        result = joint_layout(fig, margins=(0.1,) * 4, spacing=0.2)
+
+        assert result.success and result.nfev <= 4
+        assert result.x.shape == (2, 4)
+        _, tight = _measure(fig, axs)
+        inches = tight / fig.dpi
+        np.testing.assert_allclose(inches[:, 0].min(), 0.1, atol=0.01)
+        np.testing.assert_allclose(inches[:, 1].max(), 6.9, atol=0.01)
+        np.testing.assert_allclose(inches[:, 2].min(), 0.1, atol=0.01)
+        np.testing.assert_allclose(inches[:, 3].max(), 2.9, atol=0.01)
+        gap = inches[2:, 0].min() - inches[:2, 1].max()
+        np.testing.assert_allclose(gap, 0.2, atol=0.01)
+        plt.close(fig)
+
+    def test_subfigures(self) -> None:
+        """Test that each subfigure is laid out within its own area."""
+        fig = plt.figure(figsize=(7, 3), dpi=100)
+        subfigs = fig.subfigures(1, 2)
+        for subfig in subfigs:
+            for ax in subfig.subplots(1, 2):
+                ax.set_title("Title")
+                ax.set_ylabel("y label")
+
+        result = joint_layout(fig, margins=(0.05,) * 4)
+
+        assert result.success and len(result.gridspecs) == 2
+        for subfig in subfigs:
+            _, tight = _measure(fig, subfig.axes)
+            np.testing.assert_allclose(
+                tight[:, 0].min() - subfig.bbox.x0, 5, atol=0.5
+            )
+            np.testing.assert_allclose(
+                subfig.bbox.x1 - tight[:, 1].max(), 5, atol=0.5
+            )
+        plt.close(fig)
+
+
+class TestAlignLayout:
+    """Tests for shared margins across figures."""
+
+    def test_plot_areas_align(self) -> None:
+        """Test that figures of different widths share their insets."""
+        figs = []
+        for width, ylabel in ((3.5, "y"), (7.0, "a much longer y label")):
+            fig = plt.figure(figsize=(width, 2.5), dpi=100)
+            gs = fig.add_gridspec(1, 2)
+            for i in range(2):
+                ax = fig.add_subplot(gs[0, i])
+                ax.plot([0, 1000], [0, 1000])
+                ax.set_ylabel(ylabel)
+            figs.append(fig)
+        figs[0].axes[0].set_title("Title")
+
+        result = align_layout(figs, margins=(0.05,) * 4)
+
+        assert result.success and result.margins.shape == (2, 4)
+        for fig in figs:
+            pos = fig.axes[0].get_position()
+            width, height = fig.get_size_inches()
+            np.testing.assert_allclose(pos.x0 * width, result.x[0])
+            np.testing.assert_allclose((1 - pos.y1) * height, result.x[3])
+        # The long label sets the left inset, the title the top inset.
+        _, tight = _measure(figs[1], figs[1].axes)
+        np.testing.assert_allclose(tight[:, 0].min() / 100, 0.05, atol=0.01)
+        _, tight = _measure(figs[0], figs[0].axes)
+        np.testing.assert_allclose(
+            2.5 - tight[:, 3].max() / 100, 0.05, atol=0.01
+        )
+        for fig in figs:
+            plt.close(fig)
+
+    def test_gridspec_count_mismatch(self) -> None:
+        """Test that a gridspec per figure is required."""
+        fig, gs = _labeled_grid()
+        with pytest.raises(ValueError, match="Expected 2 gridspecs"):
+            align_layout([fig, fig], gridspecs=[gs])
+        plt.close(fig)
+
+
+class TestLayoutStats:
+    """Tests for layout instrumentation."""
+
+    def test_fast_layout_stats(self) -> None:
+        """Test the counts, residuals and slowest axes of fast_layout."""
+        fig, gs = _labeled_grid()
+
+        result = fast_layout(fig, gs)
+        stats = result.stats
+
+        assert isinstance(stats, LayoutStats)
+        assert stats.nfev == result.nfev
+        assert stats.tightbbox_calls == result.nfev * len(fig.axes)
+        assert 0 < stats.measure_time <= stats.total_time
+        np.testing.assert_allclose(
+            list(stats.residuals.values()), result.residuals
+        )
+        slowest = stats.slowest_axes(2)
+        assert len(slowest) == 2 and slowest[0][1] >= slowest[1][1]
+        assert slowest[0][0].startswith("axes[")
+        plt.close(fig)
+
+    def test_simple_layout_stats_and_verbose(self, capsys) -> None:
+        """Test that simple_layout reports stats and prints when verbose."""
+        fig, gs = _labeled_grid(1, 1)
+
+        result = simple_layout(fig, gs, verbose=True)
+        stats = result.stats
+
+        assert stats.engine == "simple_layout"
+        assert stats.nfev >= result.nfev
+        assert stats.tightbbox_calls == stats.nfev
+        assert set(stats.residuals) == {"left", "right", "bottom", "top"}
+        np.testing.assert_allclose(
+            [gs.left, gs.right, gs.bottom, gs.top], result.x
+        )
+        out = capsys.readouterr().out
+        assert "simple_layout evaluation 1" in out
+        assert "get_tightbbox calls" in out
+        plt.close(fig)
+
+    def test_hook_and_logging(self, caplog) -> None:
+        """Test that hooks and the logger receive the statistics."""
+        records = []
+        hook = add_layout_hook(lambda stats: records.append(stats.as_dict()))
+        fig, gs = _labeled_grid(1, 1)
+        try:
+            with caplog.at_level("DEBUG", logger="dartwork_mpl.layout"):
+                fast_layout(fig, gs)
+        finally:
+            remove_layout_hook(hook)
+        fast_layout(fig, gs)
+
+        assert len(records) == 1
+        assert records[0]["engine"] == "fast_layout"
+        assert "fast_layout:" in caplog.text
+        plt.close(fig)
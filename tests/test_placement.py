@@ -0,0 +1,146 @@
+"""Tests for automatic label placement."""
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from matplotlib.text import Annotation
+
+from dartwork_mpl.placement import (
+    _grid_pairs,
+    _occupancy,
+    place_labels,
+    place_legend,
+    repel_labels,
+)
+
+
+def _scatter(n: int, size: float = 6.0) -> tuple:
+    """Create an axes with n random points in the unit square."""
+    fig, ax = plt.subplots(figsize=(size, size), dpi=100)
+    x, y = np.random.default_rng(0).random((2, n))
+    ax.scatter(x, y, s=2)
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    return fig, ax, x, y
+
+
+class TestGridPairs:
+    """Tests for the uniform grid index."""
+
+    def test_matches_brute_force(self) -> None:
+        """Test that the grid finds every pair within one cell size."""
+        centers = np.random.default_rng(1).random((300, 2)) * 100
+        cell = np.array([6.0, 4.0])
+        i, j = _grid_pairs(centers, centers, cell, same=True)
+        found = {
+            (a, b)
+            for a, b in zip(i, j, strict=True)
+            if (np.abs(centers[a] - centers[b]) < cell).all()
+        }
+
+        delta = np.abs(centers[:, None] - centers[None])
+        near = (delta < cell).all(axis=-1) & np.triu(
+            np.ones((300, 300), bool), 1
+        )
+        assert found == set(zip(*np.nonzero(near), strict=True))
+
+
+class TestPlaceLabels:
+    """Tests for place_labels and repel_labels."""
+
+    def test_no_overlaps(self) -> None:
+        """Test that placed labels do not overlap each other."""
+        fig, ax, x, y = _scatter(300)
+        labels = [f"P{i}" for i in range(300)]
+        texts = repel_labels(ax, x, y, labels, fontsize=5)
+
+        fig.canvas.draw()
+        boxes = np.array(
+            [t.get_window_extent().extents for t in texts]
+        ).reshape(-1, 2, 2)
+        lo, hi = boxes[:, 0], boxes[:, 1]
+        overlap = (
+            (lo[:, None] < hi[None] - 0.5) & (hi[:, None] > lo[None] + 0.5)
+        ).all(axis=-1)
+        np.fill_diagonal(overlap, False)
+        assert not overlap.any()
+        plt.close(fig)
+
+    def test_free_labels_sit_above(self) -> None:
+        """Test that isolated labels keep the preferred position."""
+        fig, ax = plt.subplots(figsize=(4, 4), dpi=100)
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        offsets = place_labels(ax, [0.3, 0.7], [0.3, 0.7], ["a", "b"])
+
+        assert offsets.shape == (2, 2)
+        np.testing.assert_allclose(offsets[:, 0], 0.0)
+        assert (offsets[:, 1] > 0).all()
+        plt.close(fig)
+
+    def test_annotations_in_offset_points(self) -> None:
+        """Test that labels are annotations attached to their points."""
+        fig, ax, x, y = _scatter(20)
+        texts = repel_labels(ax, x, y, list("abcdefghijklmnopqrst"))
+
+        assert all(isinstance(t, Annotation) for t in texts)
+        assert texts[0].xy == (x[0], y[0])
+        assert texts[0].anncoords == "offset points"
+        plt.close(fig)
+
+    def test_label_count_mismatch(self) -> None:
+        """Test that a label count differing from the points raises."""
+        fig, ax, x, y = _scatter(5)
+        with pytest.raises(ValueError, match="Expected 5 labels"):
+            place_labels(ax, x, y, ["a", "b"])
+        plt.close(fig)
+
+
+class TestPlaceLegend:
+    """Tests for density-aware legend placement."""
+
+    def test_occupancy_of_bars_and_lines(self) -> None:
+        """Test that bars fill their cells and lines mark their path."""
+        fig, ax = plt.subplots(figsize=(4, 4), dpi=100)
+        ax.bar([0.25], [0.5], width=0.5, bottom=0.0)
+        ax.plot([0, 1], [0.75, 0.75])
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        counts = _occupancy(ax, (8, 8))
+
+        assert (counts[:4, :4] > 0).all()
+        assert (counts[:4, 4:] == 0).all()
+        assert (counts[6, :] > 0).all()
+        assert (counts[4:6] == 0).all()
+        plt.close(fig)
+
+    def test_avoids_data(self) -> None:
+        """Test that the legend lands in the empty half of the axes."""
+        fig, ax = plt.subplots(figsize=(4, 3), dpi=100)
+        x = np.linspace(0, 1, 100_000)
+        ax.plot(x, 0.8 + 0.1 * np.sin(40 * x), label="signal")
+        ax.set_ylim(0, 1)
+        legend = place_legend(ax, outside=False)
+
+        fig.canvas.draw()
+        box = legend.get_window_extent().transformed(ax.transAxes.inverted())
+        assert box.y1 < 0.7
+        plt.close(fig)
+
+    def test_crowded_axes_push_legend_out(self) -> None:
+        """Test that a fully covered axes moves the legend outside."""
+        fig, ax = plt.subplots(figsize=(4, 3), dpi=100)
+        ax.fill_between([0, 1], 0, 1, label="band")
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        legend = place_legend(ax)
+
+        fig.canvas.draw()
+        box = legend.get_window_extent().transformed(ax.transAxes.inverted())
+        assert box.x0 >= 1.0 or box.y0 >= 1.0
+
+        place_legend(ax, legend, outside=False)
+        fig.canvas.draw()
+        box = legend.get_window_extent().transformed(ax.transAxes.inverted())
+        assert box.x1 <= 1.0 and box.y1 <= 1.0
+        plt.close(fig)
@@ -0,0 +1,202 @@
+"""Tests for the SVG optimizer."""
+
+import re
+import xml.etree.ElementTree as ET
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+
+import dartwork_mpl as dm
+from dartwork_mpl import svg as svg_module
+from dartwork_mpl.svg import _NUMBER, _TOKEN, _optimize_file, _tokenize
+
+SVG_NS = "{http://www.w3.org/2000/svg}"
+XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+
+
+def _scatter_svg() -> bytes:
+    """Export a figure with markers, a line, clipping and text as SVG."""
+    rng = np.random.default_rng(0)
+    fig, axs = plt.subplots(1, 2, figsize=(4, 2))
+    for ax in axs:
+        ax.scatter(*rng.random((2, 300)), s=4, marker="o")
+        ax.plot(np.linspace(0, 1, 50), rng.random(50), "s-", ms=2)
+        ax.set_title("Scatter $x_t$")
+    svg = dm.export_bytes(fig, ("svg",))["svg"]
+    plt.close(fig)
+    return svg
+
+
+def _drawables(svg: bytes) -> list[tuple[str, str, list[float]]]:
+    """
+    Return the drawn elements of a document with resolved styles.
+
+    Each element outside ``<defs>`` gives its tag, its style (looked up
+    from its class if needed), the definition it references (content of
+    the target, so renamed duplicates compare equal) and its numbers.
+    """
+    root = ET.fromstring(svg)
+    rules = dict(re.findall(r"\.(s\d+)\{(.*?)\}", "".join(root.itertext())))
+    ids = {e.get("id"): e for e in root.iter() if e.get("id")}
+    defs = {id(e) for d in root.iter(f"{SVG_NS}defs") for e in d.iter()}
+
+    def target(value: str) -> str:
+        match = re.search(r"#([^)\"']+)", value or "")
+        if match is None:
+            return ""
+        element = ids[match.group(1)]
+        return ET.tostring(element).decode().split(">", 1)[1]
+
+    result = []
+    for element in root.iter():
+        tag = element.tag.removeprefix(SVG_NS)
+        if id(element) in defs or tag not in ("path", "use", "image"):
+            continue
+        style = element.get("style") or rules.get(element.get("class"), "")
+        style = re.sub(r"\s", "", style).rstrip(";")
+        reference = target(element.get(XLINK_HREF)) + target(
+            element.get("clip-path")
+        )
+        numbers = [
+            float(n)
+            for name in ("d", "x", "y", "width", "height")
+            for n in _NUMBER.findall(element.get(name) or "")
+        ]
+        result.append((tag, style, reference, numbers))
+    return result
+
+
+def _numbers(reference: str) -> list[float]:
+    """Return the numbers of a referenced definition."""
+    return [float(n) for n in _NUMBER.findall(reference)]
+
+
+class TestOptimizeSvg:
+    """Tests for optimize_svg."""
+
+    def test_same_drawing(self) -> None:
+        """Test that every drawn element keeps its style and geometry."""
+        svg = _scatter_svg()
+        optimized, report = dm.optimize_svg(svg)
+
+        before, after = _drawables(svg), _drawables(optimized)
+        assert len(before) == len(after)
+        for a, b in zip(before, after, strict=True):
+            assert a[:2] == b[:2]
+            assert np.allclose(a[3], b[3], atol=0.005)
+            assert np.allclose(_numbers(a[2]), _numbers(b[2]), atol=0.005)
+        assert report["before"] == len(svg)
+        assert report["after"] == len(optimized)
+        assert report["classes"] > 0
+        assert report["saved"] > 0.3
+
+    def test_keeps_text(self) -> None:
+        """Test that text content and its whitespace are kept."""
+        svg = (
+            '<svg xmlns="http://www.w3.org/2000/svg">\n'
+            "  <!-- label -->\n"
+            "  <text x='1.23456'>a <tspan> b </tspan></text>\n"
+            "</svg>\n"
+        )
+        optimized, _ = dm.optimize_svg(svg)
+
+        assert optimized == (
+            b'<svg xmlns="http://www.w3.org/2000/svg">'
+            b"<text x='1.23'>a <tspan> b </tspan></text></svg>"
+        )
+
+    def test_merges_duplicate_definitions(self, tmp_path) -> None:
+        """Test that identical defs are kept once and references follow."""
+        svg = (
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            'xmlns:xlink="http://www.w3.org/1999/xlink">'
+            "<defs>"
+            '<path id="m1" d="M 0 -1.000001 L 1 0 z" style="stroke: red"/>'
+            '<path id="m2" d="M 0 -1 L 1 0 z" style="stroke: red"/>'
+            '<clipPath id="c1"><rect width="10" height="10"/></clipPath>'
+            "</defs>"
+            '<g clip-path="url(#c1)">'
+            '<use xlink:href="#m1" x="1"/><use xlink:href="#m2" x="2"/>'
+            "</g></svg>"
+        )
+        path = tmp_path / "figure.svg"
+        path.write_text(svg)
+        optimized, report = dm.optimize_svg(path, precision=3)
+
+        text = optimized.decode()
+        assert 'id="m2"' not in text
+        assert text.count('xlink:href="#m1"') == 2
+        assert 'd="M0-1L1 0z"' in text
+        assert ".s0{stroke:red}" in text
+        assert report["definitions"] == 1
+
+    def test_chunk_boundaries(self) -> None:
+        """Test that tokens split across chunks are joined again."""
+        text = (
+            '<?xml version="1.0"?><svg><!-- a > b --><style><![CDATA['
+            "a > b]]></style><text x='1'>a &gt; b</text><path d='M 0 0'/>"
+            "</svg>\n"
+        )
+        for size in (1, 2, 3, 5, 8):
+            chunks = [text[i : i + size] for i in range(0, len(text), size)]
+            assert list(_tokenize(chunks)) == _TOKEN.findall(text)
+
+    def test_streamed_file(self, tmp_path, monkeypatch) -> None:
+        """Test that a file read in small chunks optimizes the same."""
+        svg = _scatter_svg()
+        path = tmp_path / "figure.svg"
+        path.write_bytes(svg)
+        monkeypatch.setattr(svg_module, "_CHUNK_SIZE", 97)
+
+        assert dm.optimize_svg(path)[0] == dm.optimize_svg(svg)[0]
+        size = _optimize_file(path, 2)
+        assert path.read_bytes() == dm.optimize_svg(svg)[0]
+        assert size == path.stat().st_size
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_rounding(self) -> None:
+        """Test rounding of lengths, negative zero and transforms."""
+        svg = (
+            '<svg width="100.123456pt" xmlns="http://www.w3.org/2000/svg">'
+            '<rect x="-0.0001" width="12.50000%" '
+            'transform="scale(0.123456)"/></svg>'
+        )
+        optimized, _ = dm.optimize_svg(svg, precision=1)
+
+        assert optimized == (
+            b'<svg width="100.123456pt" xmlns="http://www.w3.org/2000/svg">'
+            b'<rect x="0" width="12.5%" transform="scale(0.123456)"/></svg>'
+        )
+
+
+class TestSaveFormatsSvgPrecision:
+    """Tests for the svg_precision option of save_formats."""
+
+    def test_optimizes_svg(self, tmp_path) -> None:
+        """Test that the saved SVG is replaced by its optimized form."""
+        fig, ax = plt.subplots(figsize=(2, 1.5))
+        ax.scatter(np.arange(200.0), np.arange(200.0) ** 0.5)
+        kwargs = {"metadata": {"Date": None}}
+        with mpl.rc_context({"svg.hashsalt": "test"}):
+            dm.save_formats(fig, str(tmp_path / "a"), ("svg",), **kwargs)
+            dm.save_formats(
+                fig, str(tmp_path / "b"), ("svg",), svg_precision=2, **kwargs
+            )
+        plt.close(fig)
+
+        a = (tmp_path / "a.svg").read_bytes()
+        b = (tmp_path / "b.svg").read_bytes()
+        assert b == dm.optimize_svg(a)[0]
+        assert len(b) < len(a)
+
+    def test_updates_rasterize_report(self, tmp_path) -> None:
+        """Test that the report of a rasterized export has the new size."""
+        fig, ax = plt.subplots(figsize=(2, 1.5))
+        ax.scatter(np.arange(2000.0), np.arange(2000.0) ** 0.5)
+        report = dm.save_formats(
+            fig, str(tmp_path / "f"), ("svg",), rasterize=100, svg_precision=1
+        )
+        plt.close(fig)
+
+        assert report.sizes["svg"] == (tmp_path / "f.svg").stat().st_size